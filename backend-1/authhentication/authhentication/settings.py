@@ -229,4 +229,96 @@ except ImportError:
 # Cache TTLs
 RESOURCE_CACHE_TTL = 60 * 60 * 6
 COST_CACHE_TTL = 60 * 60
-SUMMARY_CACHE_TTL = 60 * 60 * 2
\ No newline at end of file
+SUMMARY_CACHE_TTL = 60 * 60 * 2
+# AWS client pool (shared boto3 clients per account/service/region)
+AWS_CLIENT_MAX_POOL_CONNECTIONS = 25
+AWS_CLIENT_CONNECT_TIMEOUT = 10
+AWS_CLIENT_READ_TIMEOUT = 60
+AWS_CLIENT_RETRY_MODE = 'adaptive'  # botocore retries with client-side rate limiting on throttling
+AWS_CLIENT_MAX_ATTEMPTS = 8  # including the first call
+
+# AWS API pacing (calls per second per account, region and API; see myground/api_rate_limiter.py)
+AWS_API_DEFAULT_RATE_LIMIT = 10
+AWS_API_MIN_RATE_LIMIT = 0.5  # floor after repeated throttling
+AWS_API_MAX_BUCKETS = 10000  # least recently used buckets are dropped beyond this
+AWS_API_RATE_LIMITS = {  # by service or 'service.Operation'
+    'ec2': 20,
+    'ce': 5,
+    'route53': 5,
+    'cloudfront': 5,
+    'resourcegroupstaggingapi': 5,
+    'sts': 10,
+}
+
+# STS credential broker
+STS_SESSION_DURATION_SECONDS = 60 * 60
+STS_REFRESH_WINDOW_SECONDS = 60 * 10  # refresh in the background 10 minutes before expiry
+STS_MIN_REMAINING_SECONDS = 60 * 2  # never hand out credentials about to expire
+STS_ASSUME_LOCK_TIMEOUT_SECONDS = 15
+
+# Discovery pagination
+DISCOVERY_MAX_API_CALLS_PER_SCAN = 20000  # per account scan, across all regions and services
+DISCOVERY_MAX_PAGES_PER_OPERATION = 500
+DISCOVERY_MAX_RETRIES_PER_SCAN = 1000  # throttling retries before a scan stops making new calls
+DISCOVERY_EC2_PAGE_SIZE = 1000  # MaxResults for EC2 describe calls
+
+# Discovery regions
+DISCOVERY_DEFAULT_REGIONS = ['us-east-1', 'eu-north-1']  # used when describe_regions is not permitted
+DISCOVERY_REGION_ALLOWLIST = []  # global default; empty scans every enabled region (per account: region_allowlist)
+DISCOVERY_MAX_WORKERS = 32  # threads shared by all regions and services of one scan
+DISCOVERY_REGION_INITIAL_CONCURRENCY = 4  # concurrent tasks per region before throttling feedback
+DISCOVERY_REGION_MAX_CONCURRENCY = 10
+
+# Scheduler multi-account fan-out
+SCHEDULER_SERVICE_RATE_LIMITS = {  # account jobs started per second per worker process, shared by all jobs
+    'ce': 2,  # Cost Explorer
+    'discovery': 5,
+}
+
+# Low-level services snapshot persistence
+SNAPSHOT_BULK_BATCH_SIZE = 1000
+
+# Incremental Cost Explorer sync
+COST_SYNC_BACKFILL_DAYS = 100  # history fetched on the first (or a full) sync
+COST_SYNC_RESTATEMENT_DAYS = 3  # recent days refetched every run because Cost Explorer revises them
+
+# Cost Explorer response cache (get_cost_and_usage, keyed by request fingerprint)
+CE_CACHE_OPEN_PERIOD_TTL = 60 * 15  # periods that include the last few (still revised) days
+CE_CACHE_CLOSED_PERIOD_TTL = 60 * 60 * 24 * 7
+
+# ResourceCache stale-while-revalidate
+CACHE_STALE_GRACE_SECONDS = 60 * 60  # how long an expired entry may still be served while refreshing
+CACHE_COMPUTE_LOCK_TIMEOUT = 60 * 10  # single-flight lock; longer than a full account scan
+CACHE_COMPUTE_WAIT_SECONDS = 60 * 3  # how long concurrent misses wait for the in-flight computation
+
+# Cache payload encoding (msgpack/pickle + zstd/lz4/zlib, see myground/cache_codec.py)
+CACHE_SCHEMA_VERSION = 2  # bump when the layout of cached payloads changes
+CACHE_COMPRESS_MIN_BYTES = 1024  # smaller payloads are stored uncompressed
+CACHE_COMPRESSION_LEVEL = 3
+
+# ResourceCache datasets (see DATASETS in myground/cache_utils.py)
+CACHE_DATASET_TTLS = {
+    'resources': RESOURCE_CACHE_TTL,
+    'resource_summary': RESOURCE_CACHE_TTL,
+    'cost_analytics': COST_CACHE_TTL,
+    'low_level_services': 60 * 60,
+    'low_level_services_quick': 60 * 15,  # Tagging API inventory, cheap to refresh
+    'low_level_services_config': 60 * 60,
+    'regions': 60 * 60 * 24,  # enabled regions change only when a region is opted in
+}
+
+# ResourceCache in-process L1 (per worker, in front of Redis)
+CACHE_L1_MAX_BYTES = 64 * 1024 * 1024  # serialized size of cached entries; 0 disables the L1
+
+# Durable job queue (`manage.py run_worker`)
+JOB_WORKER_CONCURRENCY = 8  # threads per worker process
+JOB_POLL_INTERVAL_SECONDS = 2
+JOB_LEASE_SECONDS = 60 * 15  # renewed while the job runs; expired leases are reclaimed
+JOB_TIMEOUT_SECONDS = 60 * 60  # leases stop being renewed after this and the job is failed
+JOB_BUSY_RETRY_SECONDS = 30  # requeue delay when the same account job still runs elsewhere
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_BACKOFF_SECONDS = 60  # doubled after every failed attempt
+JOB_RETENTION_DAYS = 7
+
+# Cluster coordination (Redis leases, see myground/locks.py)
+SCHEDULER_LEADER_LEASE_SECONDS = 30  # a crashed leader is replaced within this time
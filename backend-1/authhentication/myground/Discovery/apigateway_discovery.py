@@ -1,5 +1,6 @@
 # discovery/apigateway_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
 from datetime import datetime
 
 from datetime import timezone
@@ -11,16 +12,9 @@ def discover_apigateway_services(creds, region):
     services = []
     try:
         # ========== REST APIs ==========
-        client = boto3.client(
-            'apigateway',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('apigateway', creds, region)
         
-        rest_apis = client.get_rest_apis()
-        for api in rest_apis.get('items', []):
+        for api in paginate(client, 'get_rest_apis', 'items'):
             api_id = api['id']
             api_name = api.get('name', api_id)
             api_version = api.get('version', 'N/A')
@@ -98,8 +92,8 @@ def discover_apigateway_services(creds, region):
             
             # ========== API GATEWAY RESOURCES ==========
             try:
-                resources = client.get_resources(restApiId=api_id, limit=500)
-                resource_count = len(resources.get('items', []))
+                resources = collect(client, 'get_resources', 'items', page_size=500, restApiId=api_id)
+                resource_count = len(resources)
                 
                 services.append({
                     'service_id': 'api_resources',
@@ -117,7 +111,7 @@ def discover_apigateway_services(creds, region):
                                 'path': r.get('path'),
                                 'path_part': r.get('pathPart'),
                                 'resource_methods': list(r.get('resourceMethods', {}).keys())
-                            } for r in resources.get('items', [])[:10]  # Limit to 10 for brevity
+                            } for r in resources[:10]  # Limit to 10 for brevity
                         ]
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
@@ -127,16 +121,9 @@ def discover_apigateway_services(creds, region):
         
         # ========== HTTP APIs ==========
         try:
-            http_client = boto3.client(
-                'apigatewayv2',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name=region
-            )
+            http_client = get_client('apigatewayv2', creds, region)
             
-            http_apis = http_client.get_apis()
-            for api in http_apis.get('Items', []):
+            for api in paginate(http_client, 'get_apis', 'Items'):
                 api_id = api['ApiId']
                 api_name = api.get('Name', api_id)
                 protocol_type = api.get('ProtocolType', 'HTTP')
@@ -225,8 +212,7 @@ def discover_apigateway_services(creds, region):
         
         # ========== API GATEWAY USAGE PLANS ==========
         try:
-            usage_plans = client.get_usage_plans()
-            for plan in usage_plans.get('items', []):
+            for plan in paginate(client, 'get_usage_plans', 'items'):
                 plan_id = plan['id']
                 plan_name = plan.get('name', plan_id)
                 
@@ -255,8 +241,7 @@ def discover_apigateway_services(creds, region):
         
         # ========== API GATEWAY API KEYS ==========
         try:
-            api_keys = client.get_api_keys()
-            for key in api_keys.get('items', []):
+            for key in paginate(client, 'get_api_keys', 'items'):
                 services.append({
                     'service_id': 'api_gateway_throttling',
                     'resource_id': key['id'],
@@ -281,8 +266,7 @@ def discover_apigateway_services(creds, region):
         
         # ========== API GATEWAY DOMAIN NAMES ==========
         try:
-            domain_names = client.get_domain_names()
-            for domain in domain_names.get('items', []):
+            for domain in paginate(client, 'get_domain_names', 'items'):
                 services.append({
                     'service_id': 'api_gateway_custom_domain',
                     'resource_id': domain['domainName'],
@@ -311,8 +295,7 @@ def discover_apigateway_services(creds, region):
         
         # ========== API GATEWAY VPC LINKS ==========
         try:
-            vpc_links = client.get_vpc_links()
-            for link in vpc_links.get('items', []):
+            for link in paginate(client, 'get_vpc_links', 'items'):
                 services.append({
                     'service_id': 'api_gateway_vpc_link',
                     'resource_id': link['id'],
@@ -337,8 +320,7 @@ def discover_apigateway_services(creds, region):
         
         # ========== API GATEWAY CLIENT CERTIFICATES ==========
         try:
-            client_certs = client.get_client_certificates()
-            for cert in client_certs.get('items', []):
+            for cert in paginate(client, 'get_client_certificates', 'items'):
                 services.append({
                     'service_id': 'api_gateway_client_certificate',
                     'resource_id': cert['clientCertificateId'],
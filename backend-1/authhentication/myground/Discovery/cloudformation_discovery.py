@@ -1,5 +1,6 @@
 # discovery/cloudformation_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,23 +10,18 @@ def discover_cloudformation_services(creds, region):
     """Discover CloudFormation stacks, stack sets, and resources"""
     services = []
     try:
-        client = boto3.client(
-            'cloudformation',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('cloudformation', creds, region)
         
         # ========== CLOUDFORMATION STACKS ==========
-        stacks = client.list_stacks(
+        stacks = paginate(
+            client, 'list_stacks', 'StackSummaries',
             StackStatusFilter=[
                 'CREATE_COMPLETE', 'UPDATE_COMPLETE', 'UPDATE_ROLLBACK_COMPLETE',
                 'DELETE_FAILED', 'CREATE_FAILED', 'ROLLBACK_COMPLETE', 'IMPORT_COMPLETE'
             ]
         )
         
-        for stack_summary in stacks.get('StackSummaries', []):
+        for stack_summary in stacks:
             stack_name = stack_summary['StackName']
             stack_id = stack_summary['StackId']
             stack_status = stack_summary['StackStatus']
@@ -37,12 +33,11 @@ def discover_cloudformation_services(creds, region):
                 stack = stack_detail['Stacks'][0]
                 
                 # Get stack resources
-                resources = client.list_stack_resources(StackName=stack_name)
-                resource_count = len(resources.get('StackResourceSummaries', []))
+                resources = collect(client, 'list_stack_resources', 'StackResourceSummaries', StackName=stack_name)
+                resource_count = len(resources)
                 
                 # Get stack events (latest 10)
-                events = client.describe_stack_events(StackName=stack_name)
-                recent_events = events.get('StackEvents', [])[:10]
+                recent_events = list(paginate(client, 'describe_stack_events', 'StackEvents', max_items=10, StackName=stack_name))
                 
                 # CloudFormation is free, only resources are billed
                 services.append({
@@ -90,7 +85,7 @@ def discover_cloudformation_services(creds, region):
                 })
                 
                 # ========== STACK RESOURCES ==========
-                for resource in resources.get('StackResourceSummaries', [])[:20]:  # Limit to 20 per stack
+                for resource in resources[:20]:  # Limit to 20 per stack
                     logical_id = resource['LogicalResourceId']
                     physical_id = resource.get('PhysicalResourceId', 'N/A')
                     resource_type = resource['ResourceType']
@@ -124,8 +119,7 @@ def discover_cloudformation_services(creds, region):
         
         # ========== CLOUDFORMATION STACK SETS ==========
         try:
-            stack_sets = client.list_stack_sets()
-            for stack_set_summary in stack_sets.get('Summaries', []):
+            for stack_set_summary in paginate(client, 'list_stack_sets', 'Summaries'):
                 stack_set_name = stack_set_summary['StackSetName']
                 stack_set_id = stack_set_summary.get('StackSetId', stack_set_name)
                 stack_set_status = stack_set_summary.get('Status', 'ACTIVE')
@@ -137,8 +131,7 @@ def discover_cloudformation_services(creds, region):
                     stack_set = stack_set_detail['StackSet']
                     
                     # Get stack set operations
-                    operations = client.list_stack_set_operations(StackSetName=stack_set_name)
-                    operation_count = len(operations.get('Summaries', []))
+                    operation_count = sum(1 for _ in paginate(client, 'list_stack_set_operations', 'Summaries', StackSetName=stack_set_name))
                     
                     services.append({
                         'service_id': 'cfn_stackset',
@@ -170,8 +163,7 @@ def discover_cloudformation_services(creds, region):
                     
                     # ========== STACK SET INSTANCES ==========
                     try:
-                        instances = client.list_stack_instances(StackSetName=stack_set_name)
-                        for instance in instances.get('Summaries', []):
+                        for instance in paginate(client, 'list_stack_instances', 'Summaries', StackSetName=stack_set_name):
                             services.append({
                                 'service_id': 'cfn_stackset_instance',
                                 'resource_id': f"{stack_set_id}/{instance.get('Account')}/{instance.get('Region')}",
@@ -206,8 +198,7 @@ def discover_cloudformation_services(creds, region):
         for stack_summary in stacks.get('StackSummaries', []):
             stack_name = stack_summary['StackName']
             try:
-                change_sets = client.list_change_sets(StackName=stack_name)
-                for change_set_summary in change_sets.get('Summaries', []):
+                for change_set_summary in paginate(client, 'list_change_sets', 'Summaries', StackName=stack_name):
                     change_set_name = change_set_summary['ChangeSetName']
                     change_set_id = change_set_summary['ChangeSetId']
                     change_set_status = change_set_summary['Status']
@@ -239,8 +230,7 @@ def discover_cloudformation_services(creds, region):
         
         # ========== CLOUDFORMATION MACROS ==========
         try:
-            macros = client.list_macros()
-            for macro_summary in macros.get('MacroSummaries', []):
+            for macro_summary in paginate(client, 'list_macros', 'MacroSummaries'):
                 macro_name = macro_summary['Name']
                 macro_id = macro_summary.get('MacroId', macro_name)
                 
@@ -269,11 +259,13 @@ def discover_cloudformation_services(creds, region):
         # ========== CLOUDFORMATION REGISTRY (EXTENSIONS) ==========
         try:
             # Public extensions
-            public_extensions = client.list_types(
+            public_extensions = paginate(
+                client, 'list_types', 'TypeSummaries',
+                max_items=20,  # Limit to 20
                 Visibility='PUBLIC',
                 ProvisioningType='FULLY_MUTABLE'
             )
-            for ext in public_extensions.get('TypeSummaries', [])[:20]:  # Limit to 20
+            for ext in public_extensions:
                 services.append({
                     'service_id': 'cfn_registry',
                     'resource_id': ext.get('TypeArn', ext['TypeName']),
@@ -296,11 +288,12 @@ def discover_cloudformation_services(creds, region):
                 })
             
             # Private extensions in this account
-            private_extensions = client.list_types(
+            private_extensions = paginate(
+                client, 'list_types', 'TypeSummaries',
                 Visibility='PRIVATE',
                 ProvisioningType='FULLY_MUTABLE'
             )
-            for ext in private_extensions.get('TypeSummaries', []):
+            for ext in private_extensions:
                 services.append({
                     'service_id': 'cfn_private_registry',
                     'resource_id': ext.get('TypeArn', ext['TypeName']),
@@ -325,8 +318,7 @@ def discover_cloudformation_services(creds, region):
         
         # ========== CLOUDFORMATION GENERATED TEMPLATES ==========
         try:
-            generated_templates = client.list_generated_templates()
-            for template in generated_templates.get('GeneratedTemplates', []):
+            for template in paginate(client, 'list_generated_templates', 'GeneratedTemplates'):
                 template_name = template['GeneratedTemplateName']
                 template_id = template['GeneratedTemplateId']
                 
@@ -356,8 +348,7 @@ def discover_cloudformation_services(creds, region):
         
         # ========== CLOUDFORMATION RESOURCE SCANS ==========
         try:
-            resource_scans = client.list_resource_scans()
-            for scan in resource_scans.get('ResourceScanSummaries', []):
+            for scan in paginate(client, 'list_resource_scans', 'ResourceScanSummaries'):
                 scan_id = scan['ResourceScanId']
                 
                 services.append({
@@ -1,5 +1,6 @@
 # discovery/cloudfront_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +10,12 @@ def discover_cloudfront_distributions(creds):
     """Discover CloudFront distributions (global service)"""
     services = []
     try:
-        client = boto3.client(
-            'cloudfront',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken']
-        )
+        client = get_client('cloudfront', creds)
         
         # ========== CLOUDFRONT DISTRIBUTIONS ==========
-        distributions = client.list_distributions()
-        if 'DistributionList' in distributions and 'Items' in distributions['DistributionList']:
-            for dist in distributions['DistributionList']['Items']:
+        distributions = collect(client, 'list_distributions', 'DistributionList.Items')
+        if distributions:
+            for dist in distributions:
                 dist_id = dist['Id']
                 domain_name = dist['DomainName']
                 enabled = dist.get('Enabled', False)
@@ -59,8 +55,7 @@ def discover_cloudfront_distributions(creds):
                 
                 # ========== CLOUDFRONT FUNCTIONS ==========
                 try:
-                    functions = client.list_functions()
-                    for function in functions.get('FunctionList', {}).get('Items', []):
+                    for function in paginate(client, 'list_functions', 'FunctionList.Items'):
                         services.append({
                             'service_id': 'cloudfront_functions',
                             'resource_id': function['FunctionMetadata']['FunctionARN'],
@@ -84,8 +79,7 @@ def discover_cloudfront_distributions(creds):
                 
                 # ========== FIELD-LEVEL ENCRYPTION ==========
                 try:
-                    fle_configs = client.list_field_level_encryption_configs()
-                    for fle in fle_configs.get('FieldLevelEncryptionList', {}).get('Items', []):
+                    for fle in paginate(client, 'list_field_level_encryption_configs', 'FieldLevelEncryptionList.Items'):
                         services.append({
                             'service_id': 'field_level_encryption',
                             'resource_id': fle['Id'],
@@ -125,8 +119,7 @@ def discover_cloudfront_distributions(creds):
                 
                 # ========== REAL-TIME LOGS ==========
                 try:
-                    rt_logs = client.list_realtime_log_configs()
-                    for rt_log in rt_logs.get('RealtimeLogConfigs', {}).get('Items', []):
+                    for rt_log in paginate(client, 'list_realtime_log_configs', 'RealtimeLogConfigs.Items'):
                         services.append({
                             'service_id': 'realtime_logs',
                             'resource_id': rt_log['ARN'],
@@ -149,16 +142,9 @@ def discover_cloudfront_distributions(creds):
         
         # ========== LAMBDA@EDGE ==========
         try:
-            lambda_client = boto3.client(
-                'lambda',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name='us-east-1'  # Lambda@Edge must be in us-east-1
-            )
+            lambda_client = get_client('lambda', creds, 'us-east-1')  # Lambda@Edge must be in us-east-1
             
-            functions = lambda_client.list_functions()
-            for function in functions.get('Functions', []):
+            for function in paginate(lambda_client, 'list_functions', 'Functions'):
                 # Check if this is a Lambda@Edge function
                 tags = lambda_client.list_tags(Resource=function['FunctionArn'])
                 is_edge = False
@@ -207,8 +193,7 @@ def discover_cloudfront_distributions(creds):
         
         # ========== CLOUDFRONT KEY GROUPS ==========
         try:
-            key_groups = client.list_key_groups()
-            for key_group in key_groups.get('KeyGroupList', {}).get('Items', []):
+            for key_group in paginate(client, 'list_key_groups', 'KeyGroupList.Items'):
                 services.append({
                     'service_id': 'key_group',
                     'resource_id': key_group['KeyGroup']['Id'],
@@ -230,8 +215,7 @@ def discover_cloudfront_distributions(creds):
         
         # ========== CLOUDFRONT PUBLIC KEYS ==========
         try:
-            public_keys = client.list_public_keys()
-            for public_key in public_keys.get('PublicKeyList', {}).get('Items', []):
+            for public_key in paginate(client, 'list_public_keys', 'PublicKeyList.Items'):
                 services.append({
                     'service_id': 'public_key',
                     'resource_id': public_key['Id'],
@@ -253,8 +237,7 @@ def discover_cloudfront_distributions(creds):
         
         # ========== CLOUDFRONT ORIGIN ACCESS CONTROLS ==========
         try:
-            oacs = client.list_origin_access_controls()
-            for oac in oacs.get('OriginAccessControlList', {}).get('Items', []):
+            for oac in paginate(client, 'list_origin_access_controls', 'OriginAccessControlList.Items'):
                 services.append({
                     'service_id': 'origin_access_control',
                     'resource_id': oac['Id'],
@@ -278,7 +261,7 @@ def discover_cloudfront_distributions(creds):
         
         # ========== CLOUDFRONT MONITORING SUBSCRIPTIONS ==========
         try:
-            for dist in distributions.get('DistributionList', {}).get('Items', []):
+            for dist in distributions:
                 try:
                     monitoring = client.get_monitoring_subscription(DistributionId=dist['Id'])
                     subscription = monitoring.get('MonitoringSubscription', {})
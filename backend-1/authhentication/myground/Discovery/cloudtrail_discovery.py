@@ -1,5 +1,7 @@
 # discovery/cloudtrail_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
+from .tags import cloudtrail_tags
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +11,11 @@ def discover_cloudtrail_services(creds, region):
     """Discover CloudTrail trails, event data stores, insights, and lake resources"""
     services = []
     try:
-        client = boto3.client(
-            'cloudtrail',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('cloudtrail', creds, region)
+        trail_tags = cloudtrail_tags(client, fallback=lambda arn: get_cloudtrail_tags(client, arn))
         
         # ========== CLOUDTRAIL TRAILS ==========
-        trails = client.describe_trails()
-        for trail in trails.get('trailList', []):
+        for trail in paginate(client, 'describe_trails', 'trailList'):
             trail_name = trail['Name']
             trail_arn = trail['TrailARN']
             is_multi_region = trail.get('IsMultiRegionTrail', False)
@@ -124,7 +120,8 @@ def discover_cloudtrail_services(creds, region):
                     'event_selectors': event_selectors,
                     'advanced_event_selectors': advanced_event_selectors,
                     'insight_selectors': insight_selectors,
-                    'tags': get_cloudtrail_tags(client, trail_arn)
+                    # Shadow copies of trails from other regions are tagged by their home region
+                    'tags': trail_tags.defer(trail_arn) if home_region == region else []
                 },
                 'discovered_at': datetime.now(timezone.utc).isoformat()
             })
@@ -185,8 +182,7 @@ def discover_cloudtrail_services(creds, region):
         # ========== CLOUDTRAIL LAKE (EVENT DATA STORES) ==========
         try:
             # List all event data stores
-            event_data_stores = client.list_event_data_stores()
-            for eds in event_data_stores.get('EventDataStores', []):
+            for eds in paginate(client, 'list_event_data_stores', 'EventDataStores'):
                 eds_arn = eds['EventDataStoreArn']
                 eds_name = eds.get('Name', eds_arn.split('/')[-1])
                 eds_status = eds.get('Status', 'ENABLED')
@@ -248,7 +244,7 @@ def discover_cloudtrail_services(creds, region):
                             'billing_mode': eds_detail.get('BillingMode', 'EXTENDABLE_RETENTION_PRICING'),
                             'partition_keys': eds_detail.get('PartitionKeys', []),
                             'kms_key_id': eds_detail.get('KmsKeyId'),
-                            'tags': get_cloudtrail_event_data_store_tags(client, eds_arn)
+                            'tags': trail_tags.defer(eds_arn)
                         },
                         'discovered_at': datetime.now(timezone.utc).isoformat()
                     })
@@ -305,8 +301,7 @@ def discover_cloudtrail_services(creds, region):
         
         # ========== CLOUDTRAIL CHANNELS ==========
         try:
-            channels = client.list_channels(MaxResults=50)
-            for channel in channels.get('Channels', []):
+            for channel in paginate(client, 'list_channels', 'Channels', page_size=50):
                 channel_arn = channel['ChannelArn']
                 channel_name = channel.get('Name', channel_arn.split('/')[-1])
                 channel_source = channel.get('Source', 'UNKNOWN')
@@ -338,7 +333,7 @@ def discover_cloudtrail_services(creds, region):
                             'ingestion_status': channel_detail.get('IngestionStatus'),
                             'ingestion_count': len(ingestions),
                             'ingestions': ingestions[:5] if ingestions else [],  # Limit to 5
-                            'tags': get_cloudtrail_channel_tags(client, channel_arn)
+                            'tags': trail_tags.defer(channel_arn)
                         },
                         'discovered_at': datetime.now(timezone.utc).isoformat()
                     })
@@ -349,8 +344,7 @@ def discover_cloudtrail_services(creds, region):
         
         # ========== CLOUDTRAIL IMPORT TRACES ==========
         try:
-            imports = client.list_imports(MaxResults=50)
-            for import_summary in imports.get('Imports', []):
+            for import_summary in paginate(client, 'list_imports', 'Imports', page_size=50):
                 import_id = import_summary['ImportId']
                 import_status = import_summary.get('ImportStatus', 'UNKNOWN')
                 created_timestamp = import_summary.get('CreatedTimestamp')
@@ -395,8 +389,7 @@ def discover_cloudtrail_services(creds, region):
         
         # ========== CLOUDTRAIL DASHBOARDS ==========
         try:
-            dashboards = client.list_dashboards(MaxResults=50)
-            for dashboard in dashboards.get('Dashboards', []):
+            for dashboard in paginate(client, 'list_dashboards', 'Dashboards', page_size=50):
                 dashboard_arn = dashboard['DashboardArn']
                 dashboard_name = dashboard.get('Name', dashboard_arn.split('/')[-1])
                 dashboard_type = dashboard.get('Type', 'CUSTOM')
@@ -419,7 +412,7 @@ def discover_cloudtrail_services(creds, region):
                         'created_timestamp': created_timestamp.isoformat() if created_timestamp else None,
                         'updated_timestamp': dashboard.get('UpdatedTimestamp').isoformat() if dashboard.get('UpdatedTimestamp') else None,
                         'widgets': dashboard.get('Widgets', [])[:10],  # Limit to 10
-                        'tags': get_cloudtrail_dashboard_tags(client, dashboard_arn)
+                        'tags': trail_tags.defer(dashboard_arn)
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
@@ -429,8 +422,7 @@ def discover_cloudtrail_services(creds, region):
         # ========== CLOUDTRAIL SERVICE LINKED CHANNELS ==========
         try:
             # These are automatically created channels for AWS services
-            service_linked_channels = client.list_channels(MaxResults=100)
-            for channel in service_linked_channels.get('Channels', []):
+            for channel in paginate(client, 'list_channels', 'Channels', page_size=100):
                 if 'AWSService' in str(channel.get('Source')) or 'aws-service' in str(channel.get('Name')):
                     channel_arn = channel['ChannelArn']
                     channel_name = channel.get('Name', channel_arn.split('/')[-1])
@@ -459,8 +451,7 @@ def discover_cloudtrail_services(creds, region):
         try:
             # Check if this account is a delegated administrator
             if is_management_account(client):
-                delegated_admins = client.list_delegated_administrators()
-                for admin in delegated_admins.get('DelegatedAdministrators', []):
+                for admin in paginate(client, 'list_delegated_administrators', 'DelegatedAdministrators'):
                     admin_account_id = admin['AccountId']
                     
                     services.append({
@@ -484,8 +475,7 @@ def discover_cloudtrail_services(creds, region):
         # ========== CLOUDTRAIL PUBLIC KEYS ==========
         try:
             # For event data store encryption verification
-            public_keys = client.list_public_keys()
-            for public_key in public_keys.get('PublicKeyList', []):
+            for public_key in paginate(client, 'list_public_keys', 'PublicKeyList'):
                 key_id = public_key.get('Fingerprint', public_key.get('Value', '')[:20])
                 
                 services.append({
@@ -510,15 +500,18 @@ def discover_cloudtrail_services(creds, region):
         # ========== CLOUDTRAIL TAGS FOR ALL RESOURCES ==========
         # This is handled within each resource's tags method
         
+        # Fill in the deferred tags with batched calls
+        trail_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering CloudTrail services in {region}: {str(e)}")
     
     return services
 
-def get_cloudtrail_tags(client, trail_arn):
-    """Get tags for CloudTrail trail"""
+def get_cloudtrail_tags(client, resource_arn):
+    """Get tags for one CloudTrail trail, event data store, channel or dashboard"""
     try:
-        response = client.list_tags(ResourceIdList=[trail_arn])
+        response = client.list_tags(ResourceIdList=[resource_arn])
         if response.get('ResourceTagList'):
             return response['ResourceTagList'][0].get('TagsList', [])
         return []
@@ -526,50 +519,16 @@ def get_cloudtrail_tags(client, trail_arn):
         print(f"Error getting CloudTrail tags: {str(e)}")
         return []
 
-def get_cloudtrail_event_data_store_tags(client, eds_arn):
-    """Get tags for CloudTrail Lake event data store"""
-    try:
-        response = client.list_tags(ResourceIdList=[eds_arn])
-        if response.get('ResourceTagList'):
-            return response['ResourceTagList'][0].get('TagsList', [])
-        return []
-    except Exception as e:
-        print(f"Error getting event data store tags: {str(e)}")
-        return []
-
-def get_cloudtrail_channel_tags(client, channel_arn):
-    """Get tags for CloudTrail channel"""
-    try:
-        response = client.list_tags(ResourceIdList=[channel_arn])
-        if response.get('ResourceTagList'):
-            return response['ResourceTagList'][0].get('TagsList', [])
-        return []
-    except Exception as e:
-        print(f"Error getting channel tags: {str(e)}")
-        return []
-
-def get_cloudtrail_dashboard_tags(client, dashboard_arn):
-    """Get tags for CloudTrail dashboard"""
-    try:
-        response = client.list_tags(ResourceIdList=[dashboard_arn])
-        if response.get('ResourceTagList'):
-            return response['ResourceTagList'][0].get('TagsList', [])
-        return []
-    except Exception as e:
-        print(f"Error getting dashboard tags: {str(e)}")
-        return []
-
 def is_management_account(client):
     """Check if current account is the management account"""
     try:
         # Try to call an organization API - if it succeeds and we can see trails,
         # we might be the management account
-        sts = boto3.client('sts')
+        sts = get_client('sts')
         account_id = sts.get_caller_identity()['Account']
         
         # Simple heuristic - check if there are organization trails
-        trails = client.describe_trails()
-        for trail in trails.get('trailList', []):
+        for trail in paginate(client, 'describe_trails', 'trailList'):
             if trail.get('IsOrganizationTrail', False):
                 return True
         return False
@@ -1,5 +1,6 @@
 # discovery/cloudwatch_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import iter_pages, paginate
 from datetime import datetime, timedelta       
 from datetime import timezone
 # and then using:
@@ -10,16 +11,11 @@ def discover_cloudwatch_services(creds, region):
     services = []
     try:
         # ========== CLOUDWATCH ALARMS ==========
-        cloudwatch_client = boto3.client(
-            'cloudwatch',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        cloudwatch_client = get_client('cloudwatch', creds, region)
         
-        alarms = cloudwatch_client.describe_alarms()
-        all_alarms = alarms.get('MetricAlarms', []) + alarms.get('CompositeAlarms', [])
+        all_alarms = []
+        for page in iter_pages(cloudwatch_client, 'describe_alarms', AlarmTypes=['MetricAlarm', 'CompositeAlarm']):
+            all_alarms.extend(page.get('MetricAlarms', []) + page.get('CompositeAlarms', []))
         
         for alarm in all_alarms:
             alarm_name = alarm['AlarmName']
@@ -63,8 +59,7 @@ def discover_cloudwatch_services(creds, region):
             })
         
         # ========== CLOUDWATCH DASHBOARDS ==========
-        dashboards = cloudwatch_client.list_dashboards()
-        for dashboard in dashboards.get('DashboardEntries', []):
+        for dashboard in paginate(cloudwatch_client, 'list_dashboards', 'DashboardEntries'):
             dashboard_name = dashboard['DashboardName']
             dashboard_arn = dashboard.get('DashboardArn')
             
@@ -90,17 +85,10 @@ def discover_cloudwatch_services(creds, region):
             })
         
         # ========== CLOUDWATCH LOGS ==========
-        logs_client = boto3.client(
-            'logs',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        logs_client = get_client('logs', creds, region)
         
         # Log groups
-        log_groups = logs_client.describe_log_groups()
-        for log_group in log_groups.get('logGroups', []):
+        for log_group in paginate(logs_client, 'describe_log_groups', 'logGroups'):
             log_group_name = log_group['logGroupName']
             log_group_arn = log_group.get('arn')
             stored_bytes = log_group.get('storedBytes', 0)
@@ -179,8 +167,7 @@ def discover_cloudwatch_services(creds, region):
             
             # ========== LOG METRIC FILTERS ==========
             try:
-                metric_filters = logs_client.describe_metric_filters(logGroupName=log_group_name)
-                for filter_data in metric_filters.get('metricFilters', []):
+                for filter_data in paginate(logs_client, 'describe_metric_filters', 'metricFilters', logGroupName=log_group_name):
                     services.append({
                         'service_id': 'cloudwatch_log_metric_filter',
                         'resource_id': filter_data.get('filterName', f"{log_group_name}-filter"),
@@ -203,8 +190,7 @@ def discover_cloudwatch_services(creds, region):
         
         # ========== CLOUDWATCH INSIGHT RULES ==========
         try:
-            insight_rules = cloudwatch_client.describe_insight_rules()
-            for rule in insight_rules.get('InsightRules', []):
+            for rule in paginate(cloudwatch_client, 'describe_insight_rules', 'InsightRules'):
                 rule_name = rule['Name']
                 rule_state = rule.get('State')
                 
@@ -234,16 +220,9 @@ def discover_cloudwatch_services(creds, region):
         
         # ========== CLOUDWATCH SYNTHETICS ==========
         try:
-            synthetics_client = boto3.client(
-                'synthetics',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name=region
-            )
+            synthetics_client = get_client('synthetics', creds, region)
             
-            canaries = synthetics_client.describe_canaries()
-            for canary in canaries.get('Canaries', []):
+            for canary in paginate(synthetics_client, 'describe_canaries', 'Canaries'):
                 canary_name = canary['Name']
                 canary_arn = canary.get('Arn')
                 runtime_version = canary.get('RuntimeVersion')
@@ -288,8 +267,7 @@ def discover_cloudwatch_services(creds, region):
         
         # ========== CLOUDWATCH SERVICE LENS ==========
         try:
-            service_lens = cloudwatch_client.list_service_lens_service_insight_visualizations()
-            for insight in service_lens.get('ServiceInsightVisualizations', []):
+            for insight in paginate(cloudwatch_client, 'list_service_lens_service_insight_visualizations', 'ServiceInsightVisualizations'):
                 services.append({
                     'service_id': 'cloudwatch_service_lens',
                     'resource_id': insight.get('Arn'),
@@ -311,8 +289,7 @@ def discover_cloudwatch_services(creds, region):
         
         # ========== CLOUDWATCH CONTRIBUTOR INSIGHTS ==========
         try:
-            contributor_rules = cloudwatch_client.describe_contributor_insights()
-            for rule in contributor_rules.get('ContributorInsightRules', []):
+            for rule in paginate(cloudwatch_client, 'describe_contributor_insights', 'ContributorInsightRules'):
                 rule_name = rule['Name']
                 rule_arn = rule.get('Arn')
                 
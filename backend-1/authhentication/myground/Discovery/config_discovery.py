@@ -0,0 +1,243 @@
+# discovery/config_discovery.py
+import json
+
+from ..client_pool import get_client
+from .pagination import paginate
+from .ec2_discovery import estimate_instance_monthly_cost, estimate_volume_monthly_cost
+from .rds_discovery import estimate_db_instance_monthly_cost
+from datetime import datetime
+from datetime import timezone
+
+# Inventory from AWS Config advanced queries. Accounts that record with AWS
+# Config already hold their whole inventory there, so a few paginated
+# select_resource_config (one region) or select_aggregate_resource_config
+# (every region through an aggregator) calls replace hundreds of
+# per-service list/describe calls. Results are mapped into the same resource
+# dicts the other Discovery modules emit.
+#
+# Every function takes an optional ``client`` so it can run against a stub.
+
+# Config resource type -> (service_id, service_type)
+CONFIG_RESOURCE_TYPES = {
+    'AWS::EC2::Instance': ('ec2_instance', 'Compute'),
+    'AWS::EC2::Volume': ('ebs_volume_gp2', 'Storage'),
+    'AWS::EC2::EIP': ('elastic_ip', 'Networking'),
+    'AWS::EC2::NatGateway': ('nat_gateway', 'Networking'),
+    'AWS::EC2::VPC': ('vpc', 'Networking'),
+    'AWS::EC2::Subnet': ('subnet', 'Networking'),
+    'AWS::EC2::InternetGateway': ('internet_gateway', 'Networking'),
+    'AWS::EC2::RouteTable': ('route_table', 'Networking'),
+    'AWS::EC2::NetworkAcl': ('network_acl', 'Networking'),
+    'AWS::EC2::SecurityGroup': ('security_group', 'Networking'),
+    'AWS::EC2::VPCEndpoint': ('vpc_endpoint', 'Networking'),
+    'AWS::EC2::TransitGateway': ('transit_gateway', 'Networking'),
+    'AWS::EC2::VPNConnection': ('vpn_connection', 'Networking'),
+    'AWS::ElasticLoadBalancingV2::LoadBalancer': ('application_load_balancer', 'Networking'),
+    'AWS::ElasticLoadBalancing::LoadBalancer': ('classic_load_balancer', 'Networking'),
+    'AWS::RDS::DBInstance': ('rds_db_instance', 'Database'),
+    'AWS::RDS::DBSnapshot': ('rds_snapshot', 'Database'),
+    'AWS::DynamoDB::Table': ('dynamodb_table', 'Database'),
+    'AWS::S3::Bucket': ('s3_bucket', 'Storage'),
+    'AWS::Lambda::Function': ('lambda_execution', 'Compute'),
+    'AWS::ECS::Cluster': ('ecs_cluster', 'Compute'),
+    'AWS::ECS::TaskDefinition': ('ecs_task_definition', 'Compute'),
+    'AWS::EKS::Cluster': ('eks_control_plane', 'Compute'),
+    'AWS::CloudFront::Distribution': ('distribution', 'Networking'),
+    'AWS::WAFv2::WebACL': ('waf_acl', 'Security'),
+    'AWS::KMS::Key': ('kms_cmk', 'Security'),
+    'AWS::SNS::Topic': ('sns_topic', 'Application Integration'),
+    'AWS::SQS::Queue': ('sqs_standard_request', 'Application Integration'),
+    'AWS::StepFunctions::StateMachine': ('stepfunctions_standard', 'Application Integration'),
+    'AWS::CloudWatch::Alarm': ('cloudwatch_alarm', 'Management'),
+}
+
+# Every service_id the mapped types can produce; a Config scan is complete
+# for these (as far as the recorder records them) and blind to the rest
+CONFIG_COVERED_SERVICE_IDS = frozenset(
+    [service_id for service_id, _ in CONFIG_RESOURCE_TYPES.values()]
+    + [f"ebs_volume_{volume_type}" for volume_type in ('gp3', 'io1', 'io2', 'st1', 'sc1', 'standard')]
+    + ['network_load_balancer', 'gateway_load_balancer', 'sqs_fifo_request']
+)
+
+# Only the configuration fields pricing needs are selected, not whole items
+CONFIG_SELECT_FIELDS = [
+    'resourceId', 'resourceName', 'resourceType', 'awsRegion', 'arn', 'tags',
+    'configuration.instanceType', 'configuration.state', 'configuration.platform',
+    'configuration.volumeType', 'configuration.size', 'configuration.iops',
+    'configuration.dBInstanceClass', 'configuration.storageType', 'configuration.allocatedStorage',
+    'configuration.multiAZ', 'configuration.engine',
+    'configuration.instanceId', 'configuration.networkInterfaceId',
+    'configuration.type',
+]
+
+# Results per select call (API maximum)
+CONFIG_QUERY_PAGE_SIZE = 100
+
+
+def build_config_query(regions=None, account_id=None):
+    """Advanced query over every mapped resource type, optionally narrowed to regions/account"""
+    resource_types = ', '.join(f"'{resource_type}'" for resource_type in CONFIG_RESOURCE_TYPES)
+    query = f"SELECT {', '.join(CONFIG_SELECT_FIELDS)} WHERE resourceType IN ({resource_types})"
+    if regions:
+        query += f" AND awsRegion IN ({', '.join(repr(region) for region in regions)})"
+    if account_id:
+        query += f" AND accountId = '{account_id}'"
+    return query
+
+
+def is_config_recording(creds, region, client=None):
+    """(region, whether a Config recorder is recording there)"""
+    try:
+        client = client or get_client('config', creds, region)
+        statuses = client.describe_configuration_recorder_status().get('ConfigurationRecordersStatus', [])
+        return region, any(status.get('recording') for status in statuses)
+    except Exception as e:
+        print(f"⚠️ Could not read the Config recorder status in {region}: {str(e)}")
+        return region, False
+
+
+def has_config_aggregator(creds, aggregator_name, aggregator_region, client=None):
+    try:
+        client = client or get_client('config', creds, aggregator_region)
+        aggregators = client.describe_configuration_aggregators(
+            ConfigurationAggregatorNames=[aggregator_name]
+        ).get('ConfigurationAggregators', [])
+        return bool(aggregators)
+    except Exception as e:
+        print(f"⚠️ Config aggregator {aggregator_name} is not available: {str(e)}")
+        return False
+
+
+def discover_config_inventory(creds, region, client=None):
+    """Resources recorded by AWS Config in one region"""
+    services = []
+    try:
+        client = client or get_client('config', creds, region)
+        for result in paginate(client, 'select_resource_config', 'Results',
+                               page_size=CONFIG_QUERY_PAGE_SIZE, Expression=build_config_query()):
+            resource = config_item_to_resource(json.loads(result), region)
+            if resource:
+                services.append(resource)
+    except Exception as e:
+        print(f"Error querying AWS Config in {region}: {str(e)}")
+
+    return services
+
+
+def discover_config_aggregate_inventory(creds, aggregator_name, aggregator_region, aws_account_id, regions, client=None):
+    """Resources of one account in ``regions`` from a Config aggregator (in ``aggregator_region``), in a single query"""
+    services = []
+    try:
+        client = client or get_client('config', creds, aggregator_region)
+        for result in paginate(client, 'select_aggregate_resource_config', 'Results',
+                               page_size=CONFIG_QUERY_PAGE_SIZE,
+                               ConfigurationAggregatorName=aggregator_name,
+                               Expression=build_config_query(regions, aws_account_id)):
+            resource = config_item_to_resource(json.loads(result))
+            if resource:
+                services.append(resource)
+    except Exception as e:
+        print(f"Error querying AWS Config aggregator {aggregator_name}: {str(e)}")
+
+    return services
+
+
+def config_item_to_resource(item, region=None):
+    """Resource dict for one query result; None for unmapped or deleted resources.
+
+    ``estimated_monthly_cost`` is None for resources the caller should price
+    from the service definition (flat hourly rates).
+    """
+    known = CONFIG_RESOURCE_TYPES.get(item.get('resourceType'))
+    if known is None:
+        return None
+
+    service_id, service_type = known
+    configuration = item.get('configuration') or {}
+    tags = [{'Key': tag.get('key'), 'Value': tag.get('value')} for tag in item.get('tags') or []]
+    resource_id = item.get('resourceId')
+    resource = {
+        'service_id': service_id,
+        # Same ids as the per-service scan: EC2 ids and bucket names, ARNs otherwise
+        'resource_id': resource_id if item['resourceType'].startswith(('AWS::EC2::', 'AWS::S3::')) else item.get('arn') or resource_id,
+        'resource_name': next((tag['Value'] for tag in tags if tag['Key'] == 'Name'), None) or item.get('resourceName') or resource_id,
+        'region': item.get('awsRegion') or region or 'global',
+        'service_type': service_type,
+        'estimated_monthly_cost': None,
+        'count': 1,
+        'details': {
+            'arn': item.get('arn'),
+            'tags': tags,
+            'source': 'aws_config'
+        },
+        'discovered_at': datetime.now(timezone.utc).isoformat()
+    }
+
+    price = CONFIG_PRICERS.get(item['resourceType'])
+    if price and price(resource, configuration) is False:
+        return None
+    return resource
+
+
+def _price_instance(resource, configuration):
+    state = configuration.get('state') or {}
+    state = state.get('name', 'unknown') if isinstance(state, dict) else state
+    if state == 'terminated':
+        return False
+    instance_type = configuration.get('instanceType', 'unknown')
+    resource['estimated_monthly_cost'] = round(estimate_instance_monthly_cost(instance_type, state, configuration.get('platform')), 2)
+    resource['details'].update({'instance_type': instance_type, 'state': state})
+
+
+def _price_volume(resource, configuration):
+    volume_type = configuration.get('volumeType', 'gp2')
+    size_gb = configuration.get('size', 0)
+    iops = configuration.get('iops') or 0
+    resource['service_id'] = f"ebs_volume_{volume_type}"
+    resource['estimated_monthly_cost'] = round(estimate_volume_monthly_cost(volume_type, size_gb, iops), 2)
+    resource['details'].update({'volume_type': volume_type, 'size_gb': size_gb, 'iops': iops})
+
+
+def _price_address(resource, configuration):
+    is_attached = bool(configuration.get('instanceId') or configuration.get('networkInterfaceId'))
+    resource['estimated_monthly_cost'] = 0.00 if is_attached else round(0.005 * 730, 2)
+    resource['details']['is_attached'] = is_attached
+
+
+def _price_db_instance(resource, configuration):
+    instance_class = configuration.get('dBInstanceClass', '')
+    resource['estimated_monthly_cost'] = round(estimate_db_instance_monthly_cost(
+        instance_class,
+        configuration.get('storageType', 'gp2'),
+        configuration.get('allocatedStorage') or 0,
+        configuration.get('iops') or 0,
+        configuration.get('multiAZ', False)
+    ), 2)
+    resource['details'].update({
+        'instance_class': instance_class,
+        'engine': configuration.get('engine'),
+        'allocated_storage': configuration.get('allocatedStorage') or 0,
+        'multi_az': configuration.get('multiAZ', False)
+    })
+
+
+def _price_load_balancer(resource, configuration):
+    lb_type = configuration.get('type', 'application')
+    resource['service_id'] = f"{lb_type}_load_balancer"
+
+
+def _price_queue(resource, configuration):
+    if resource['resource_id'].endswith('.fifo'):
+        resource['service_id'] = 'sqs_fifo_request'
+
+
+# Config resource type -> fn(resource, configuration) that prices the
+# resource in place from its recorded configuration; returning False drops it
+CONFIG_PRICERS = {
+    'AWS::EC2::Instance': _price_instance,
+    'AWS::EC2::Volume': _price_volume,
+    'AWS::EC2::EIP': _price_address,
+    'AWS::RDS::DBInstance': _price_db_instance,
+    'AWS::ElasticLoadBalancingV2::LoadBalancer': _price_load_balancer,
+    'AWS::SQS::Queue': _price_queue,
+}
@@ -1,5 +1,6 @@
 # discovery/dms_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +10,10 @@ def discover_dms_services(creds, region):
     """Discover Database Migration Service resources: replication instances, tasks, endpoints"""
     services = []
     try:
-        client = boto3.client(
-            'dms',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('dms', creds, region)
         
         # ========== DMS REPLICATION INSTANCES ==========
-        replication_instances = client.describe_replication_instances()
-        for instance in replication_instances.get('ReplicationInstances', []):
+        for instance in paginate(client, 'describe_replication_instances', 'ReplicationInstances'):
             instance_id = instance['ReplicationInstanceIdentifier']
             instance_arn = instance['ReplicationInstanceArn']
             instance_class = instance.get('ReplicationInstanceClass', 'dms.t3.micro')
@@ -118,8 +112,7 @@ def discover_dms_services(creds, region):
             })
         
         # ========== DMS REPLICATION TASKS ==========
-        replication_tasks = client.describe_replication_tasks()
-        for task in replication_tasks.get('ReplicationTasks', []):
+        for task in paginate(client, 'describe_replication_tasks', 'ReplicationTasks'):
             task_id = task['ReplicationTaskIdentifier']
             task_arn = task['ReplicationTaskArn']
             task_status = task.get('Status', 'stopped')
@@ -176,8 +169,7 @@ def discover_dms_services(creds, region):
             })
         
         # ========== DMS ENDPOINTS ==========
-        endpoints = client.describe_endpoints()
-        for endpoint in endpoints.get('Endpoints', []):
+        for endpoint in paginate(client, 'describe_endpoints', 'Endpoints'):
             endpoint_id = endpoint['EndpointIdentifier']
             endpoint_arn = endpoint['EndpointArn']
             endpoint_type = endpoint.get('EndpointType', 'source')
@@ -219,8 +211,7 @@ def discover_dms_services(creds, region):
         
         # ========== DMS EVENT SUBSCRIPTIONS ==========
         try:
-            subscriptions = client.describe_event_subscriptions()
-            for sub in subscriptions.get('EventSubscriptionsList', []):
+            for sub in paginate(client, 'describe_event_subscriptions', 'EventSubscriptionsList'):
                 sub_id = sub['CustSubscriptionId']
                 sub_arn = sub.get('EventSubscriptionArn', sub_id)
                 sns_topic_arn = sub.get('SnsTopicArn', '')
@@ -253,8 +244,7 @@ def discover_dms_services(creds, region):
         
         # ========== DMS CERTIFICATES ==========
         try:
-            certificates = client.describe_certificates()
-            for cert in certificates.get('Certificates', []):
+            for cert in paginate(client, 'describe_certificates', 'Certificates'):
                 cert_id = cert['CertificateIdentifier']
                 cert_arn = cert.get('CertificateArn', cert_id)
                 
@@ -285,8 +275,7 @@ def discover_dms_services(creds, region):
         
         # ========== DMS REPLICATION SUBNET GROUPS ==========
         try:
-            subnet_groups = client.describe_replication_subnet_groups()
-            for sg in subnet_groups.get('ReplicationSubnetGroups', []):
+            for sg in paginate(client, 'describe_replication_subnet_groups', 'ReplicationSubnetGroups'):
                 sg_id = sg['ReplicationSubnetGroupIdentifier']
                 sg_arn = sg.get('ReplicationSubnetGroupArn', sg_id)
                 vpc_id = sg.get('VpcId', '')
@@ -324,8 +313,7 @@ def discover_dms_services(creds, region):
         # ========== DMS FLEET ADVISOR ==========
         try:
             # Check if Fleet Advisor has collected data
-            collector_health = client.describe_fleet_advisor_collectors()
-            collectors = collector_health.get('Collectors', [])
+            collectors = paginate(client, 'describe_fleet_advisor_collectors', 'Collectors')
             
             for collector in collectors:
                 collector_id = collector.get('CollectorReferencedId', collector.get('CollectorName', 'unknown'))
@@ -355,8 +343,7 @@ def discover_dms_services(creds, region):
         # ========== DMS DATA PROVIDERS ==========
         try:
             # For DMS Serverless
-            data_providers = client.describe_data_providers()
-            for provider in data_providers.get('DataProviders', []):
+            for provider in paginate(client, 'describe_data_providers', 'DataProviders'):
                 provider_id = provider['DataProviderIdentifier']
                 provider_name = provider.get('DataProviderName', provider_id)
                 engine = provider.get('Engine', 'mysql')
@@ -387,8 +374,7 @@ def discover_dms_services(creds, region):
         # ========== DMS MIGRATION PROJECTS ==========
         try:
             # For DMS Serverless
-            projects = client.describe_migration_projects()
-            for project in projects.get('MigrationProjects', []):
+            for project in paginate(client, 'describe_migration_projects', 'MigrationProjects'):
                 project_id = project['MigrationProjectIdentifier']
                 project_name = project.get('MigrationProjectName', project_id)
                 
@@ -420,8 +406,7 @@ def discover_dms_services(creds, region):
         
         # ========== DMS INSTANCE PROFILES ==========
         try:
-            instance_profiles = client.describe_instance_profiles()
-            for profile in instance_profiles.get('InstanceProfiles', []):
+            for profile in paginate(client, 'describe_instance_profiles', 'InstanceProfiles'):
                 profile_id = profile['InstanceProfileIdentifier']
                 profile_name = profile.get('InstanceProfileName', profile_id)
                 
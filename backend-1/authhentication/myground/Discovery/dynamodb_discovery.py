@@ -1,5 +1,7 @@
 # discovery/dynamodb_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
+from .tags import TaggingApiBatch
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +11,12 @@ def discover_dynamodb_services(creds, region):
     """Discover DynamoDB tables and related services"""
     services = []
     try:
-        client = boto3.client(
-            'dynamodb',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('dynamodb', creds, region)
+        table_tags = TaggingApiBatch(creds, region, fallback=lambda arn: get_dynamodb_tags(client, arn))
         
         # ========== DYNAMODB TABLES ==========
-        tables = client.list_tables()
-        for table_name in tables.get('TableNames', []):
+        tables = collect(client, 'list_tables', 'TableNames')
+        for table_name in tables:
             try:
                 table = client.describe_table(TableName=table_name)
                 table_info = table['Table']
@@ -77,7 +74,7 @@ def discover_dynamodb_services(creds, region):
                         'local_secondary_indexes': table_info.get('LocalSecondaryIndexes', []),
                         'stream_specification': table_info.get('StreamSpecification', {}),
                         'sse_description': table_info.get('SSEDescription', {}),
-                        'tags': get_dynamodb_tags(client, table_info['TableArn'])
+                        'tags': table_tags.defer(table_info['TableArn'])
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
@@ -136,8 +133,7 @@ def discover_dynamodb_services(creds, region):
         
         # ========== DYNAMODB BACKUPS ==========
         try:
-            backups = client.list_backups()
-            for backup in backups.get('BackupSummaries', []):
+            for backup in paginate(client, 'list_backups', 'BackupSummaries'):
                 backup_size_bytes = backup.get('BackupSizeBytes', 0)
                 backup_size_gb = backup_size_bytes / (1024 * 1024 * 1024)
                 
@@ -169,16 +165,9 @@ def discover_dynamodb_services(creds, region):
         
         # ========== DYNAMODB DAX CLUSTERS ==========
         try:
-            dax_client = boto3.client(
-                'dax',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name=region
-            )
+            dax_client = get_client('dax', creds, region)
             
-            clusters = dax_client.describe_clusters()
-            for cluster in clusters.get('Clusters', []):
+            for cluster in paginate(dax_client, 'describe_clusters', 'Clusters'):
                 node_count = len(cluster.get('Nodes', []))
                 node_type = cluster.get('NodeType', 'dax.r4.large')
                 
@@ -216,7 +205,7 @@ def discover_dynamodb_services(creds, region):
             pass
         
         # ========== DYNAMODB CONTINUOUS BACKUPS (PITR) ==========
-        for table_name in tables.get('TableNames', []):
+        for table_name in tables:
             try:
                 pitr = client.describe_continuous_backups(TableName=table_name)
                 pitr_status = pitr.get('ContinuousBackupsDescription', {}).get('PointInTimeRecoveryDescription', {}).get('PointInTimeRecoveryStatus', 'DISABLED')
@@ -256,8 +245,7 @@ def discover_dynamodb_services(creds, region):
         
         # ========== DYNAMODB GLOBAL TABLES ==========
         try:
-            global_tables = client.list_global_tables()
-            for global_table in global_tables.get('GlobalTables', []):
+            for global_table in paginate(client, 'list_global_tables', 'GlobalTables'):
                 global_table_name = global_table['GlobalTableName']
                 try:
                     table_info = client.describe_global_table(GlobalTableName=global_table_name)
@@ -284,6 +272,9 @@ def discover_dynamodb_services(creds, region):
         except:
             pass
             
+        # Fill in the deferred tags with batched calls
+        table_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering DynamoDB services in {region}: {str(e)}")
     
@@ -1,54 +1,86 @@
 # discovery/ec2_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
+from django.conf import settings
 from datetime import datetime
 from datetime import timezone
 # and then using:
 timezone.utc
 
+# Simplified on-demand pricing, shared with the quick inventory
+EC2_HOURLY_RATES = {
+    't2.nano': 0.0058, 't2.micro': 0.0116, 't2.small': 0.023,
+    't2.medium': 0.0464, 't2.large': 0.0928, 't2.xlarge': 0.1856,
+    't2.2xlarge': 0.3712,
+    't3.nano': 0.0052, 't3.micro': 0.0104, 't3.small': 0.0208,
+    't3.medium': 0.0416, 't3.large': 0.0832, 't3.xlarge': 0.1664,
+    't3.2xlarge': 0.3328,
+    'm5.large': 0.096, 'm5.xlarge': 0.192, 'm5.2xlarge': 0.384,
+    'm5.4xlarge': 0.768, 'm5.8xlarge': 1.536, 'm5.12xlarge': 2.304,
+    'm5.16xlarge': 3.072, 'm5.24xlarge': 4.608,
+    'c5.large': 0.085, 'c5.xlarge': 0.17, 'c5.2xlarge': 0.34,
+    'c5.4xlarge': 0.68, 'c5.9xlarge': 1.53, 'c5.12xlarge': 2.04,
+    'c5.18xlarge': 3.06, 'c5.24xlarge': 4.08,
+    'r5.large': 0.126, 'r5.xlarge': 0.252, 'r5.2xlarge': 0.504,
+    'r5.4xlarge': 1.008, 'r5.8xlarge': 2.016, 'r5.12xlarge': 3.024,
+    'r5.16xlarge': 4.032, 'r5.24xlarge': 6.048
+}
+
+# Pricing per GB-month
+EBS_PRICING = {
+    'gp3': {'per_gb': 0.08, 'per_iops': 0.00004 * 730},
+    'gp2': {'per_gb': 0.10, 'per_iops': 0},
+    'io1': {'per_gb': 0.125, 'per_iops': 0.065},
+    'io2': {'per_gb': 0.125, 'per_iops': 0.065},
+    'st1': {'per_gb': 0.045, 'per_iops': 0},
+    'sc1': {'per_gb': 0.025, 'per_iops': 0},
+    'standard': {'per_gb': 0.05, 'per_iops': 0}
+}
+
+def estimate_instance_monthly_cost(instance_type, state, platform=None):
+    """Monthly on-demand cost of an instance (only running instances are billed)"""
+    hourly_rate = EC2_HOURLY_RATES.get(instance_type, 0.05)  # Default to $0.05
+    monthly_cost = hourly_rate * 730 if state == 'running' else 0
+    
+    # Add Windows license cost if applicable
+    if platform == 'windows':
+        monthly_cost += 0.04 * 730  # Additional $0.04/hour for Windows
+    return monthly_cost
+
+def estimate_volume_monthly_cost(volume_type, size_gb, iops):
+    """Monthly cost of an EBS volume (storage plus provisioned IOPS)"""
+    volume_pricing = EBS_PRICING.get(volume_type, EBS_PRICING['gp2'])
+    monthly_cost = volume_pricing['per_gb'] * size_gb
+    
+    if volume_pricing['per_iops'] > 0 and iops > 0:
+        if volume_type in ['io1', 'io2']:
+            monthly_cost += volume_pricing['per_iops'] * iops
+        elif volume_type == 'gp3':
+            # First 3000 IOPS free for gp3
+            paid_iops = max(0, iops - 3000)
+            monthly_cost += volume_pricing['per_iops'] * paid_iops * 730
+    return monthly_cost
+
 def discover_ec2_services(creds, region):
     """Discover all EC2-related services and components"""
     services = []
     try:
-        client = boto3.client(
-            'ec2',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('ec2', creds, region)
         
         # ========== EC2 INSTANCES ==========
-        instances = client.describe_instances()
-        for reservation in instances.get('Reservations', []):
+        # Terminated instances are not billed, so filter them out server-side
+        reservations = paginate(
+            client, 'describe_instances', 'Reservations',
+            page_size=settings.DISCOVERY_EC2_PAGE_SIZE,
+            Filters=[{'Name': 'instance-state-name', 'Values': ['pending', 'running', 'stopping', 'stopped']}]
+        )
+        for reservation in reservations:
             for instance in reservation.get('Instances', []):
                 instance_type = instance.get('InstanceType', 'unknown')
                 state = instance.get('State', {}).get('Name', 'unknown')
                 
                 # Estimate cost based on instance type (simplified pricing)
-                hourly_rates = {
-                    't2.nano': 0.0058, 't2.micro': 0.0116, 't2.small': 0.023,
-                    't2.medium': 0.0464, 't2.large': 0.0928, 't2.xlarge': 0.1856,
-                    't2.2xlarge': 0.3712,
-                    't3.nano': 0.0052, 't3.micro': 0.0104, 't3.small': 0.0208,
-                    't3.medium': 0.0416, 't3.large': 0.0832, 't3.xlarge': 0.1664,
-                    't3.2xlarge': 0.3328,
-                    'm5.large': 0.096, 'm5.xlarge': 0.192, 'm5.2xlarge': 0.384,
-                    'm5.4xlarge': 0.768, 'm5.8xlarge': 1.536, 'm5.12xlarge': 2.304,
-                    'm5.16xlarge': 3.072, 'm5.24xlarge': 4.608,
-                    'c5.large': 0.085, 'c5.xlarge': 0.17, 'c5.2xlarge': 0.34,
-                    'c5.4xlarge': 0.68, 'c5.9xlarge': 1.53, 'c5.12xlarge': 2.04,
-                    'c5.18xlarge': 3.06, 'c5.24xlarge': 4.08,
-                    'r5.large': 0.126, 'r5.xlarge': 0.252, 'r5.2xlarge': 0.504,
-                    'r5.4xlarge': 1.008, 'r5.8xlarge': 2.016, 'r5.12xlarge': 3.024,
-                    'r5.16xlarge': 4.032, 'r5.24xlarge': 6.048
-                }
-                
-                hourly_rate = hourly_rates.get(instance_type, 0.05)  # Default to $0.05
-                monthly_cost = hourly_rate * 730 if state == 'running' else 0
-                
-                # Add Windows license cost if applicable
-                if instance.get('Platform') == 'windows':
-                    monthly_cost += 0.04 * 730  # Additional $0.04/hour for Windows
+                monthly_cost = estimate_instance_monthly_cost(instance_type, state, instance.get('Platform'))
                 
                 services.append({
                     'service_id': 'ec2_instance',
@@ -79,33 +111,12 @@ def discover_ec2_services(creds, region):
                 })
         
         # ========== EBS VOLUMES ==========
-        volumes = client.describe_volumes()
-        for volume in volumes.get('Volumes', []):
+        for volume in paginate(client, 'describe_volumes', 'Volumes', page_size=settings.DISCOVERY_EC2_PAGE_SIZE):
             volume_type = volume.get('VolumeType', 'gp2')
             size_gb = volume.get('Size', 0)
             iops = volume.get('Iops', 0)
             
-            # Pricing per GB-month
-            pricing = {
-                'gp3': {'per_gb': 0.08, 'per_iops': 0.00004 * 730},
-                'gp2': {'per_gb': 0.10, 'per_iops': 0},
-                'io1': {'per_gb': 0.125, 'per_iops': 0.065},
-                'io2': {'per_gb': 0.125, 'per_iops': 0.065},
-                'st1': {'per_gb': 0.045, 'per_iops': 0},
-                'sc1': {'per_gb': 0.025, 'per_iops': 0},
-                'standard': {'per_gb': 0.05, 'per_iops': 0}
-            }
-            
-            volume_pricing = pricing.get(volume_type, pricing['gp2'])
-            monthly_cost = volume_pricing['per_gb'] * size_gb
-            
-            if volume_pricing['per_iops'] > 0 and iops > 0:
-                if volume_type in ['io1', 'io2']:
-                    monthly_cost += volume_pricing['per_iops'] * iops
-                elif volume_type == 'gp3':
-                    # First 3000 IOPS free for gp3
-                    paid_iops = max(0, iops - 3000)
-                    monthly_cost += volume_pricing['per_iops'] * paid_iops * 730
+            monthly_cost = estimate_volume_monthly_cost(volume_type, size_gb, iops)
             
             services.append({
                 'service_id': f"ebs_volume_{volume_type}",
@@ -134,8 +145,7 @@ def discover_ec2_services(creds, region):
             })
         
         # ========== EBS SNAPSHOTS ==========
-        snapshots = client.describe_snapshots(OwnerIds=['self'])
-        for snapshot in snapshots.get('Snapshots', []):
+        for snapshot in paginate(client, 'describe_snapshots', 'Snapshots', page_size=settings.DISCOVERY_EC2_PAGE_SIZE, OwnerIds=['self']):
             size_gb = snapshot.get('VolumeSize', 0)
             monthly_cost = 0.05 * size_gb  # $0.05 per GB-month
             
@@ -164,8 +174,7 @@ def discover_ec2_services(creds, region):
             })
         
         # ========== AMIs ==========
-        images = client.describe_images(Owners=['self'])
-        for image in images.get('Images', []):
+        for image in paginate(client, 'describe_images', 'Images', Owners=['self']):
             size_gb = sum(block_device.get('Ebs', {}).get('VolumeSize', 0) 
                          for block_device in image.get('BlockDeviceMappings', []))
             monthly_cost = 0.05 * size_gb  # $0.05 per GB-month
@@ -195,8 +204,7 @@ def discover_ec2_services(creds, region):
             })
         
         # ========== DEDICATED HOSTS ==========
-        hosts = client.describe_hosts()
-        for host in hosts.get('Hosts', []):
+        for host in paginate(client, 'describe_hosts', 'Hosts'):
             host_type = host.get('HostProperties', {}).get('InstanceType', 'unknown')
             
             # Pricing for dedicated hosts (simplified)
@@ -228,8 +236,7 @@ def discover_ec2_services(creds, region):
             })
         
         # ========== PLACEMENT GROUPS ==========
-        placement_groups = client.describe_placement_groups()
-        for pg in placement_groups.get('PlacementGroups', []):
+        for pg in paginate(client, 'describe_placement_groups', 'PlacementGroups'):
             services.append({
                 'service_id': 'placement_group',
                 'resource_id': pg['GroupName'],
@@ -248,8 +255,7 @@ def discover_ec2_services(creds, region):
             })
         
         # ========== CAPACITY RESERVATIONS ==========
-        capacity_reservations = client.describe_capacity_reservations()
-        for cr in capacity_reservations.get('CapacityReservations', []):
+        for cr in paginate(client, 'describe_capacity_reservations', 'CapacityReservations'):
             services.append({
                 'service_id': 'capacity_reservation',
                 'resource_id': cr['CapacityReservationId'],
@@ -272,8 +278,7 @@ def discover_ec2_services(creds, region):
             })
         
         # ========== LAUNCH TEMPLATES ==========
-        launch_templates = client.describe_launch_templates()
-        for lt in launch_templates.get('LaunchTemplates', []):
+        for lt in paginate(client, 'describe_launch_templates', 'LaunchTemplates'):
             services.append({
                 'service_id': 'ec2_launch_template',
                 'resource_id': lt['LaunchTemplateId'],
@@ -1,5 +1,6 @@
 # discovery/eks_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +10,11 @@ def discover_eks_services(creds, region):
     """Discover EKS clusters and related resources"""
     services = []
     try:
-        client = boto3.client(
-            'eks',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('eks', creds, region)
         
         # ========== EKS CLUSTERS ==========
-        clusters = client.list_clusters()
-        for cluster_name in clusters.get('clusters', []):
+        clusters = collect(client, 'list_clusters', 'clusters')
+        for cluster_name in clusters:
             try:
                 cluster = client.describe_cluster(name=cluster_name)
                 cluster_info = cluster['cluster']
@@ -56,8 +51,7 @@ def discover_eks_services(creds, region):
                 })
                 
                 # ========== EKS NODE GROUPS ==========
-                nodegroups = client.list_nodegroups(clusterName=cluster_name)
-                for nodegroup_name in nodegroups.get('nodegroups', []):
+                for nodegroup_name in paginate(client, 'list_nodegroups', 'nodegroups', clusterName=cluster_name):
                     try:
                         ng = client.describe_nodegroup(clusterName=cluster_name, nodegroupName=nodegroup_name)
                         nodegroup = ng['nodegroup']
@@ -94,8 +88,7 @@ def discover_eks_services(creds, region):
                         })
                         
                         # ========== EKS FARGATE PROFILES ==========
-                        fargate_profiles = client.list_fargate_profiles(clusterName=cluster_name)
-                        for fargate_name in fargate_profiles.get('fargateProfileNames', []):
+                        for fargate_name in paginate(client, 'list_fargate_profiles', 'fargateProfileNames', clusterName=cluster_name):
                             try:
                                 fp = client.describe_fargate_profile(
                                     clusterName=cluster_name,
@@ -132,8 +125,7 @@ def discover_eks_services(creds, region):
                 
                 # ========== EKS ADD-ONS ==========
                 try:
-                    addons = client.list_addons(clusterName=cluster_name)
-                    for addon_name in addons.get('addons', []):
+                    for addon_name in paginate(client, 'list_addons', 'addons', clusterName=cluster_name):
                         try:
                             addon = client.describe_addon(clusterName=cluster_name, addonName=addon_name)
                             addon_info = addon['addon']
@@ -169,10 +161,9 @@ def discover_eks_services(creds, region):
                 print(f"Error describing EKS cluster {cluster_name}: {str(e)}")
         
         # ========== EKS IDENTITY PROVIDERS ==========
-        for cluster_name in clusters.get('clusters', []):
+        for cluster_name in clusters:
             try:
-                providers = client.list_identity_provider_configs(clusterName=cluster_name)
-                for provider in providers.get('identityProviderConfigs', []):
+                for provider in paginate(client, 'list_identity_provider_configs', 'identityProviderConfigs', clusterName=cluster_name):
                     provider_name = provider['name']
                     provider_type = provider['type']
                     
@@ -196,7 +187,7 @@ def discover_eks_services(creds, region):
                 pass
         
         # ========== EKS CONTROL PLANE LOGGING ==========
-        for cluster_name in clusters.get('clusters', []):
+        for cluster_name in clusters:
             try:
                 cluster = client.describe_cluster(name=cluster_name)
                 cluster_info = cluster['cluster']
@@ -1,5 +1,7 @@
 # discovery/elb_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
+from .tags import elb_tags, elbv2_tags
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -10,17 +12,11 @@ def discover_elb_services(creds, region):
     services = []
     try:
         # ========== APPLICATION LOAD BALANCERS ==========
-        elbv2_client = boto3.client(
-            'elbv2',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        elbv2_client = get_client('elbv2', creds, region)
+        lb_tags = elbv2_tags(elbv2_client, fallback=lambda arn: get_elbv2_tags(elbv2_client, arn))
         
         # ALB/NLB/GWLB
-        load_balancers = elbv2_client.describe_load_balancers()
-        for lb in load_balancers.get('LoadBalancers', []):
+        for lb in paginate(elbv2_client, 'describe_load_balancers', 'LoadBalancers'):
             lb_arn = lb['LoadBalancerArn']
             lb_name = lb['LoadBalancerName']
             lb_type = lb.get('Type', 'application')
@@ -73,15 +69,14 @@ def discover_elb_services(creds, region):
                     'security_groups': lb.get('SecurityGroups', []),
                     'ip_address_type': lb.get('IpAddressType', 'ipv4'),
                     'customer_owned_ipv4_pool': lb.get('CustomerOwnedIpv4Pool'),
-                    'tags': get_elbv2_tags(elbv2_client, lb_arn)
+                    'tags': lb_tags.defer(lb_arn)
                 },
                 'discovered_at': datetime.now(timezone.utc).isoformat()
             })
             
             # ========== LISTENERS ==========
             try:
-                listeners = elbv2_client.describe_listeners(LoadBalancerArn=lb_arn)
-                for listener in listeners.get('Listeners', []):
+                for listener in paginate(elbv2_client, 'describe_listeners', 'Listeners', LoadBalancerArn=lb_arn):
                     services.append({
                         'service_id': f"{lb_type}_listener",
                         'resource_id': listener['ListenerArn'],
@@ -107,8 +102,7 @@ def discover_elb_services(creds, region):
             
             # ========== TARGET GROUPS ==========
             try:
-                target_groups = elbv2_client.describe_target_groups(LoadBalancerArn=lb_arn)
-                for tg in target_groups.get('TargetGroups', []):
+                for tg in paginate(elbv2_client, 'describe_target_groups', 'TargetGroups', LoadBalancerArn=lb_arn):
                     # Get target health
                     try:
                         health = elbv2_client.describe_target_health(TargetGroupArn=tg['TargetGroupArn'])
@@ -146,17 +140,13 @@ def discover_elb_services(creds, region):
             except:
                 pass
         
+        lb_tags.resolve()
+        
         # ========== CLASSIC LOAD BALANCERS ==========
-        elb_client = boto3.client(
-            'elb',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        elb_client = get_client('elb', creds, region)
+        classic_lb_tags = elb_tags(elb_client, fallback=lambda name: get_elb_tags(elb_client, name))
         
-        classic_lbs = elb_client.describe_load_balancers()
-        for lb in classic_lbs.get('LoadBalancerDescriptions', []):
+        for lb in paginate(elb_client, 'describe_load_balancers', 'LoadBalancerDescriptions'):
             lb_name = lb['LoadBalancerName']
             dns_name = lb.get('DNSName')
             scheme = lb.get('Scheme', 'internet-facing')
@@ -202,11 +192,14 @@ def discover_elb_services(creds, region):
                     'cross_zone_load_balancing': lb.get('CrossZoneLoadBalancing', {}).get('Enabled', False),
                     'access_log': lb.get('AccessLog', {}).get('Enabled', False),
                     'connection_draining': lb.get('ConnectionDraining', {}).get('Enabled', False),
-                    'tags': get_elb_tags(elb_client, lb_name)
+                    'tags': classic_lb_tags.defer(lb_name)
                 },
                 'discovered_at': datetime.now(timezone.utc).isoformat()
             })
         
+        # Fill in the deferred tags with batched calls
+        classic_lb_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering ELB services in {region}: {str(e)}")
     
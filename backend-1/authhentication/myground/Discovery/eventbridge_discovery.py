@@ -1,5 +1,7 @@
 # discovery/eventbridge_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
+from .tags import TaggingApiBatch
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +11,14 @@ def discover_eventbridge_services(creds, region):
     """Discover EventBridge buses, rules, schemas, and pipes"""
     services = []
     try:
-        client = boto3.client(
-            'events',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('events', creds, region)
+        event_tags = TaggingApiBatch(creds, region, fallback=lambda arn: (
+            get_eventbridge_rule_tags(client, arn) if ':rule/' in arn else get_eventbridge_bus_tags(client, arn)
+        ))
         
         # ========== EVENT BUSES ==========
-        buses = client.list_event_buses()
-        for bus in buses.get('EventBuses', []):
+        buses = collect(client, 'list_event_buses', 'EventBuses')
+        for bus in buses:
             bus_name = bus['Name']
             bus_arn = bus['Arn']
             
@@ -40,14 +39,13 @@ def discover_eventbridge_services(creds, region):
                     'event_bus_arn': bus_arn,
                     'policy': bus.get('Policy'),
                     'creation_time': bus.get('CreationTime').isoformat() if bus.get('CreationTime') else None,
-                    'tags': get_eventbridge_bus_tags(client, bus_arn)
+                    'tags': event_tags.defer(bus_arn)
                 },
                 'discovered_at': datetime.now(timezone.utc).isoformat()
             })
             
             # ========== EVENT RULES ==========
-            rules = client.list_rules(EventBusName=bus_name)
-            for rule in rules.get('Rules', []):
+            for rule in paginate(client, 'list_rules', 'Rules', EventBusName=bus_name):
                 rule_name = rule['Name']
                 rule_arn = rule['Arn']
                 schedule = rule.get('ScheduleExpression')
@@ -74,23 +72,16 @@ def discover_eventbridge_services(creds, region):
                         'managed_by': rule.get('ManagedBy'),
                         'created_by': rule.get('CreatedBy'),
                         'targets': get_eventbridge_targets(client, rule_name, bus_name),
-                        'tags': get_eventbridge_rule_tags(client, rule_arn)
+                        'tags': event_tags.defer(rule_arn)
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
         
         # ========== EVENTBRIDGE SCHEMAS ==========
         try:
-            schemas_client = boto3.client(
-                'schemas',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name=region
-            )
+            schemas_client = get_client('schemas', creds, region)
             
-            registries = schemas_client.list_registries()
-            for registry in registries.get('Registries', []):
+            for registry in paginate(schemas_client, 'list_registries', 'Registries'):
                 registry_name = registry['RegistryName']
                 registry_arn = registry['RegistryArn']
                 
@@ -114,8 +105,7 @@ def discover_eventbridge_services(creds, region):
                 })
                 
                 # ========== SCHEMAS ==========
-                schemas_list = schemas_client.list_schemas(RegistryName=registry_name)
-                for schema in schemas_list.get('Schemas', []):
+                for schema in paginate(schemas_client, 'list_schemas', 'Schemas', RegistryName=registry_name):
                     schema_name = schema['SchemaName']
                     schema_arn = schema['SchemaArn']
                     
@@ -144,8 +134,7 @@ def discover_eventbridge_services(creds, region):
         
         # ========== EVENTBRIDGE API DESTINATIONS ==========
         try:
-            connections = client.list_connections()
-            for connection in connections.get('Connections', []):
+            for connection in paginate(client, 'list_connections', 'Connections'):
                 connection_name = connection['Name']
                 connection_arn = connection['ConnectionArn']
                 
@@ -171,8 +160,7 @@ def discover_eventbridge_services(creds, region):
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
             
-            destinations = client.list_api_destinations()
-            for dest in destinations.get('ApiDestinations', []):
+            for dest in paginate(client, 'list_api_destinations', 'ApiDestinations'):
                 dest_name = dest['Name']
                 dest_arn = dest['ApiDestinationArn']
                 
@@ -204,10 +192,9 @@ def discover_eventbridge_services(creds, region):
             pass
         
         # ========== EVENTBRIDGE ARCHIVES ==========
-        for bus in buses.get('EventBuses', []):
+        for bus in buses:
             try:
-                archives = client.list_archives(EventSourceArn=bus['Arn'])
-                for archive in archives.get('Archives', []):
+                for archive in paginate(client, 'list_archives', 'Archives', EventSourceArn=bus['Arn']):
                     archive_name = archive['ArchiveName']
                     archive_arn = archive['ArchiveArn']
                     
@@ -243,16 +230,9 @@ def discover_eventbridge_services(creds, region):
         
         # ========== EVENTBRIDGE PIPES ==========
         try:
-            pipes_client = boto3.client(
-                'pipes',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name=region
-            )
+            pipes_client = get_client('pipes', creds, region)
             
-            pipes = pipes_client.list_pipes()
-            for pipe in pipes.get('Pipes', []):
+            for pipe in paginate(pipes_client, 'list_pipes', 'Pipes'):
                 pipe_name = pipe['Name']
                 pipe_arn = pipe['Arn']
                 
@@ -282,6 +262,9 @@ def discover_eventbridge_services(creds, region):
         except:
             pass
         
+        # Fill in the deferred tags with batched calls
+        event_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering EventBridge services in {region}: {str(e)}")
     
@@ -1,5 +1,6 @@
 # discovery/guardduty_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +10,10 @@ def discover_guardduty_services(creds, region):
     """Discover GuardDuty detectors, findings, and threat detection configurations"""
     services = []
     try:
-        client = boto3.client(
-            'guardduty',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('guardduty', creds, region)
         
         # ========== GUARDDUTY DETECTORS ==========
-        detectors = client.list_detectors()
-        for detector_id in detectors.get('DetectorIds', []):
+        for detector_id in paginate(client, 'list_detectors', 'DetectorIds'):
             try:
                 detector = client.get_detector(DetectorId=detector_id)
                 status = detector.get('Status', 'ENABLED')
@@ -92,8 +86,7 @@ def discover_guardduty_services(creds, region):
                         })
                 
                 # ========== GUARDDUTY IPSETS ==========
-                ip_sets = client.list_ip_sets(DetectorId=detector_id)
-                for ip_set_id in ip_sets.get('IpSetIds', []):
+                for ip_set_id in paginate(client, 'list_ip_sets', 'IpSetIds', DetectorId=detector_id):
                     try:
                         ip_set = client.get_ip_set(DetectorId=detector_id, IpSetId=ip_set_id)
                         
@@ -119,8 +112,7 @@ def discover_guardduty_services(creds, region):
                         pass
                 
                 # ========== GUARDDUTY THREAT INTELLIGENCE SETS ==========
-                threat_sets = client.list_threat_intel_sets(DetectorId=detector_id)
-                for threat_set_id in threat_sets.get('ThreatIntelSetIds', []):
+                for threat_set_id in paginate(client, 'list_threat_intel_sets', 'ThreatIntelSetIds', DetectorId=detector_id):
                     try:
                         threat_set = client.get_threat_intel_set(DetectorId=detector_id, ThreatIntelSetId=threat_set_id)
                         
@@ -171,8 +163,7 @@ def discover_guardduty_services(creds, region):
                     pass
                 
                 # ========== GUARDDUTY MEMBERS ==========
-                members = client.list_members(DetectorId=detector_id)
-                for member in members.get('Members', []):
+                for member in paginate(client, 'list_members', 'Members', DetectorId=detector_id):
                     services.append({
                         'service_id': 'guardduty_member',
                         'resource_id': member['AccountId'],
@@ -198,8 +189,7 @@ def discover_guardduty_services(creds, region):
         
         # ========== GUARDDUTY ADMINISTRATOR ACCOUNT ==========
         try:
-            admin = client.list_organization_admin_accounts()
-            for admin_account in admin.get('AdminAccounts', []):
+            for admin_account in paginate(client, 'list_organization_admin_accounts', 'AdminAccounts'):
                 services.append({
                     'service_id': 'guardduty_admin',
                     'resource_id': admin_account['AdminAccountId'],
@@ -1,5 +1,7 @@
 # discovery/kms_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
+from .tags import TaggingApiBatch, tags_with_keys
 from datetime import datetime
 
 from datetime import timezone
@@ -10,18 +12,15 @@ def discover_kms_services(creds, region):
     """Discover KMS keys and related resources"""
     services = []
     try:
-        client = boto3.client(
-            'kms',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
+        client = get_client('kms', creds, region)
+        key_tags = TaggingApiBatch(
+            creds, region, formatter=tags_with_keys('TagKey', 'TagValue'),
+            fallback=lambda arn: get_kms_tags(client, arn)
         )
         
         # ========== CUSTOMER MASTER KEYS ==========
         # List all keys including AWS managed keys
-        keys = client.list_keys()
-        for key in keys.get('Keys', []):
+        for key in paginate(client, 'list_keys', 'Keys', page_size=1000):
             key_id = key['KeyId']
             key_arn = key['KeyArn']
             
@@ -76,7 +75,7 @@ def discover_kms_services(creds, region):
                         'encryption_algorithms': metadata.get('EncryptionAlgorithms', []),
                         'signing_algorithms': metadata.get('SigningAlgorithms', []),
                         'pending_deletion_window_in_days': metadata.get('PendingDeletionWindowInDays'),
-                        'tags': get_kms_tags(client, key_id)
+                        'tags': key_tags.defer(key_arn)
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
@@ -107,8 +106,7 @@ def discover_kms_services(creds, region):
                 
                 # ========== KEY ALIASES ==========
                 try:
-                    aliases = client.list_aliases(KeyId=key_id)
-                    for alias in aliases.get('Aliases', []):
+                    for alias in paginate(client, 'list_aliases', 'Aliases', KeyId=key_id):
                         if 'AliasArn' in alias:
                             services.append({
                                 'service_id': 'kms_alias',
@@ -132,8 +130,7 @@ def discover_kms_services(creds, region):
                 
                 # ========== KEY GRANTS ==========
                 try:
-                    grants = client.list_grants(KeyId=key_id)
-                    for grant in grants.get('Grants', []):
+                    for grant in paginate(client, 'list_grants', 'Grants', KeyId=key_id):
                         services.append({
                             'service_id': 'kms_grant',
                             'resource_id': grant['GrantId'],
@@ -162,8 +159,7 @@ def discover_kms_services(creds, region):
         
         # ========== CUSTOM KEY STORES ==========
         try:
-            custom_stores = client.describe_custom_key_stores()
-            for store in custom_stores.get('CustomKeyStores', []):
+            for store in paginate(client, 'describe_custom_key_stores', 'CustomKeyStores'):
                 store_id = store['CustomKeyStoreId']
                 store_name = store['CustomKeyStoreName']
                 
@@ -189,6 +185,9 @@ def discover_kms_services(creds, region):
         except:
             pass
         
+        # Fill in the deferred tags with batched calls
+        key_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering KMS services in {region}: {str(e)}")
     
@@ -1,5 +1,6 @@
 # discovery/lambda_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
 from datetime import datetime
 
 from datetime import timezone
@@ -10,17 +11,11 @@ def discover_lambda_services(creds, region):
     """Discover Lambda functions and related services"""
     services = []
     try:
-        client = boto3.client(
-            'lambda',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('lambda', creds, region)
         
         # ========== LAMBDA FUNCTIONS ==========
-        functions = client.list_functions()
-        for function in functions.get('Functions', []):
+        functions = collect(client, 'list_functions', 'Functions')
+        for function in functions:
             function_name = function['FunctionName']
             runtime = function.get('Runtime', 'unknown')
             memory_size = function.get('MemorySize', 128)
@@ -129,14 +124,12 @@ def discover_lambda_services(creds, region):
                 pass
         
         # ========== LAMBDA LAYERS ==========
-        layers = client.list_layers()
-        for layer in layers.get('Layers', []):
+        for layer in paginate(client, 'list_layers', 'Layers'):
             layer_name = layer['LayerName']
             layer_arn = layer['LayerArn']
             
             # Get layer versions
-            versions = client.list_layer_versions(LayerName=layer_name)
-            for version in versions.get('LayerVersions', []):
+            for version in paginate(client, 'list_layer_versions', 'LayerVersions', LayerName=layer_name):
                 version_number = version.get('Version', 1)
                 
                 services.append({
@@ -161,10 +154,9 @@ def discover_lambda_services(creds, region):
                 })
         
         # ========== EVENT SOURCE MAPPINGS ==========
-        for function in functions.get('Functions', []):
+        for function in functions:
             try:
-                event_sources = client.list_event_source_mappings(FunctionName=function['FunctionName'])
-                for source in event_sources.get('EventSourceMappings', []):
+                for source in paginate(client, 'list_event_source_mappings', 'EventSourceMappings', FunctionName=function['FunctionName']):
                     services.append({
                         'service_id': 'lambda_event_source_mapping',
                         'resource_id': source['UUID'],
@@ -191,8 +183,7 @@ def discover_lambda_services(creds, region):
         
         # ========== CODE SIGNING CONFIGS ==========
         try:
-            signing_configs = client.list_code_signing_configs()
-            for config in signing_configs.get('CodeSigningConfigs', []):
+            for config in paginate(client, 'list_code_signing_configs', 'CodeSigningConfigs'):
                 monthly_cost = 0.05  # $0.05 per signing profile-month
                 
                 services.append({
@@ -215,10 +206,9 @@ def discover_lambda_services(creds, region):
             pass
         
         # ========== ALIASES ==========
-        for function in functions.get('Functions', []):
+        for function in functions:
             try:
-                aliases = client.list_aliases(FunctionName=function['FunctionName'])
-                for alias in aliases.get('Aliases', []):
+                for alias in paginate(client, 'list_aliases', 'Aliases', FunctionName=function['FunctionName']):
                     services.append({
                         'service_id': 'lambda_aliases',
                         'resource_id': alias['AliasArn'],
@@ -0,0 +1,188 @@
+# discovery/pagination.py
+import threading
+
+from botocore.exceptions import PaginationError
+from django.conf import settings
+
+# Shared paginated-collector layer for all discovery modules.
+#
+# Every list/describe call goes through ``paginate`` so results are complete
+# (not just the first page), pages are streamed lazily, and the number of API
+# calls (and throttling retries) a single scan can make is capped by the
+# ScanBudget bound to the current discovery thread. Botocore retries seen on
+# each page are counted per thread so the region scheduler can back off
+# throttled regions.
+
+_local = threading.local()
+
+
+class ScanBudget:
+    """Caps the number of AWS API calls and throttling retries one discovery scan may make"""
+
+    def __init__(self, max_calls=None, max_retries=None):
+        self.max_calls = max_calls or settings.DISCOVERY_MAX_API_CALLS_PER_SCAN
+        self.max_retries = max_retries or settings.DISCOVERY_MAX_RETRIES_PER_SCAN
+        self.calls = 0
+        self.retries = 0
+        self.truncated = set()
+        self.throttled = set()  # operations that still failed after every retry
+        self._lock = threading.Lock()
+
+    def allow(self, operation):
+        """Whether another call may be made; records the operation as truncated if not"""
+        with self._lock:
+            if self.calls >= self.max_calls or self.retries >= self.max_retries:
+                self.truncated.add(operation)
+                return False
+            return True
+
+    def record(self):
+        with self._lock:
+            self.calls += 1
+
+    def mark_truncated(self, operation):
+        """Record that ``operation`` returned only part of its results"""
+        with self._lock:
+            self.truncated.add(operation)
+
+    def record_retry(self, operation, gave_up=False):
+        """Charge a throttling retry (see api_rate_limiter)"""
+        with self._lock:
+            self.retries += 1
+            if gave_up:
+                self.throttled.add(operation)
+
+    @property
+    def exhausted(self):
+        return self.calls >= self.max_calls or self.retries >= self.max_retries
+
+    def run(self, fn, *args, **kwargs):
+        """Call ``fn`` with this budget bound to the current thread"""
+        previous = getattr(_local, 'budget', None)
+        _local.budget = self
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.budget = previous
+
+
+def current_budget():
+    return getattr(_local, 'budget', None)
+
+
+def _allow(operation):
+    budget = current_budget()
+    if budget is None or budget.allow(operation):
+        return True
+    print(f"⚠️ API call or retry budget exhausted, skipping remaining pages of {operation}")
+    return False
+
+
+def _record(response):
+    budget = current_budget()
+    if budget is not None:
+        budget.record()
+    retries = (response.get('ResponseMetadata') or {}).get('RetryAttempts', 0)
+    if retries:
+        _local.retries = getattr(_local, 'retries', 0) + retries
+
+
+def take_retries():
+    """Botocore retries seen by this thread since the last call (and reset the count)"""
+    retries = getattr(_local, 'retries', 0)
+    _local.retries = 0
+    return retries
+
+
+def iter_pages(client, operation, page_size=None, max_items=None, **kwargs):
+    """Lazily yield raw response pages for ``operation``.
+
+    Operations without a botocore paginator are called once. Every page counts
+    against the current scan budget and at most
+    DISCOVERY_MAX_PAGES_PER_OPERATION pages are read per call.
+    """
+    if not client.can_paginate(operation):
+        if _allow(operation):
+            response = getattr(client, operation)(**kwargs)
+            _record(response)
+            yield response
+        return
+
+    config = {}
+    if page_size:
+        config['PageSize'] = page_size
+    if max_items:
+        config['MaxItems'] = max_items
+
+    paginator = client.get_paginator(operation)
+    try:
+        pages = iter(paginator.paginate(PaginationConfig=config, **kwargs))
+    except PaginationError:
+        # Operation has no page-size parameter (rejected before any call); use service defaults
+        if 'PageSize' not in config:
+            raise
+        config.pop('PageSize')
+        pages = iter(paginator.paginate(PaginationConfig=config, **kwargs))
+
+    for _ in range(settings.DISCOVERY_MAX_PAGES_PER_OPERATION):
+        if not _allow(operation):
+            return
+        try:
+            page = next(pages)
+        except StopIteration:
+            return
+        _record(page)
+        yield page
+
+    # Ending exactly on the last page makes no call here; only a real next page is reported
+    if not _allow(operation):
+        return
+    next_page = next(pages, None)
+    if next_page is not None:
+        _record(next_page)
+        budget = current_budget()
+        if budget is not None:
+            budget.mark_truncated(operation)
+        print(f"⚠️ {operation} reached the {settings.DISCOVERY_MAX_PAGES_PER_OPERATION} page limit")
+
+
+def _extract(page, result_key):
+    """Items under ``result_key``; dotted keys (e.g. 'DistributionList.Items') are nested"""
+    value = page
+    for part in result_key.split('.'):
+        value = (value or {}).get(part)
+    return value or []
+
+
+def paginate(client, operation, result_key, page_size=None, max_items=None, **kwargs):
+    """Lazily yield every item under ``result_key`` across all pages"""
+    for page in iter_pages(client, operation, page_size=page_size, max_items=max_items, **kwargs):
+        for item in _extract(page, result_key):
+            yield item
+
+
+def chunked(items, size):
+    """Split ``items`` into lists of at most ``size``"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def describe_batched(client, operation, result_key, id_param, ids, batch_size, **kwargs):
+    """Lazily yield the items of a multi-identifier describe call.
+
+    ``ids`` are passed under ``id_param`` at most ``batch_size`` per call
+    (the API limit), so N resources cost N / batch_size calls instead of N.
+    """
+    for batch in chunked(ids, batch_size):
+        yield from paginate(client, operation, result_key, **{id_param: batch}, **kwargs)
+
+
+def collect(client, operation, result_key, page_size=None, max_items=None, **kwargs):
+    """Like ``paginate`` but returns a list (for results that are iterated twice)"""
+    return list(paginate(client, operation, result_key, page_size=page_size, max_items=max_items, **kwargs))
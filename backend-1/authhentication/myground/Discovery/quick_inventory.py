@@ -0,0 +1,233 @@
+# discovery/quick_inventory.py
+from ..client_pool import get_client
+from .pagination import chunked, paginate
+from .ec2_discovery import estimate_instance_monthly_cost, estimate_volume_monthly_cost
+from .rds_discovery import estimate_db_instance_monthly_cost
+from datetime import datetime
+from datetime import timezone
+
+# Quick inventory: one Resource Groups Tagging API sweep per region returns the
+# ARN and tags of every tagged resource, instead of walking each service's
+# list/describe APIs. Only resource types whose price depends on attributes
+# (instance type, volume size, ...) are described, in batches, afterwards.
+#
+# The Tagging API only returns resources that have (or had) tags, so this is
+# a cheap refresh tier next to the full discovery scan, not a replacement.
+
+# (ARN service, resource type) -> (service_id, service_type)
+TAGGED_RESOURCE_TYPES = {
+    ('ec2', 'instance'): ('ec2_instance', 'Compute'),
+    ('ec2', 'volume'): ('ebs_volume_gp2', 'Storage'),
+    ('ec2', 'snapshot'): ('ebs_snapshot', 'Storage'),
+    ('ec2', 'natgateway'): ('nat_gateway', 'Networking'),
+    ('ec2', 'elastic-ip'): ('elastic_ip', 'Networking'),
+    ('ec2', 'vpc'): ('vpc', 'Networking'),
+    ('ec2', 'subnet'): ('subnet', 'Networking'),
+    ('ec2', 'internet-gateway'): ('internet_gateway', 'Networking'),
+    ('ec2', 'route-table'): ('route_table', 'Networking'),
+    ('ec2', 'network-acl'): ('network_acl', 'Networking'),
+    ('ec2', 'security-group'): ('security_group', 'Networking'),
+    ('ec2', 'vpc-endpoint'): ('vpc_endpoint', 'Networking'),
+    ('ec2', 'transit-gateway'): ('transit_gateway', 'Networking'),
+    ('ec2', 'vpn-connection'): ('vpn_connection', 'Networking'),
+    ('elasticloadbalancing', 'loadbalancer/app'): ('application_load_balancer', 'Networking'),
+    ('elasticloadbalancing', 'loadbalancer/net'): ('network_load_balancer', 'Networking'),
+    ('elasticloadbalancing', 'loadbalancer/gwy'): ('gateway_load_balancer', 'Networking'),
+    ('elasticloadbalancing', 'loadbalancer'): ('classic_load_balancer', 'Networking'),
+    ('elasticloadbalancing', 'targetgroup'): ('target_group', 'Networking'),
+    ('rds', 'db'): ('rds_db_instance', 'Database'),
+    ('rds', 'snapshot'): ('rds_snapshot', 'Database'),
+    ('dynamodb', 'table'): ('dynamodb_table', 'Database'),
+    ('s3', ''): ('s3_bucket', 'Storage'),
+    ('lambda', 'function'): ('lambda_execution', 'Compute'),
+    ('ecs', 'cluster'): ('ecs_cluster', 'Compute'),
+    ('ecs', 'task-definition'): ('ecs_task_definition', 'Compute'),
+    ('eks', 'cluster'): ('eks_control_plane', 'Compute'),
+    ('eks', 'nodegroup'): ('eks_managed_node_group', 'Compute'),
+    ('cloudfront', 'distribution'): ('distribution', 'Networking'),
+    ('wafv2', 'webacl'): ('waf_acl', 'Security'),
+    ('kms', 'key'): ('kms_cmk', 'Security'),
+    ('sns', ''): ('sns_topic', 'Application Integration'),
+    ('states', 'stateMachine'): ('stepfunctions_standard', 'Application Integration'),
+    ('logs', 'log-group'): ('cloudwatch_log_group', 'Management'),
+    ('cloudwatch', 'alarm'): ('cloudwatch_alarm', 'Management'),
+}
+
+# Filter values accepted per EC2/RDS describe call
+DESCRIBE_FILTER_BATCH = 200
+RDS_FILTER_BATCH = 100
+
+
+def parse_arn(arn):
+    """(service, resource type, resource id, region) of an ARN"""
+    parts = arn.split(':', 5)
+    if len(parts) < 6:
+        return None, None, arn, None
+    service, region, resource = parts[2], parts[3], parts[5]
+
+    # The type is separated by whichever of '/' or ':' comes first
+    separators = [separator for separator in ('/', ':') if separator in resource]
+    if not separators:
+        return service, '', resource, region
+
+    separator = min(separators, key=resource.index)
+    segments = resource.split(separator, 1 if separator == ':' else -1)
+    resource_type = segments[0]
+    if service == 'wafv2' and len(segments) > 1:
+        resource_type = segments[1]  # regional/webacl/... or global/webacl/...
+    elif service == 'elasticloadbalancing' and resource_type == 'loadbalancer' and segments[1] in ('app', 'net', 'gwy'):
+        resource_type = f"loadbalancer/{segments[1]}"
+    return service, resource_type, segments[-1] if separator == '/' else segments[1], region
+
+
+def discover_quick_inventory(creds, region, resource_types=None):
+    """Tagged resources of a region from one get_resources sweep, priced where it matters.
+
+    ``estimated_monthly_cost`` is None for resources the caller should price
+    from the service definition (flat hourly rates).
+    """
+    services = []
+    try:
+        client = get_client('resourcegroupstaggingapi', creds, region)
+        kwargs = {'ResourceTypeFilters': resource_types} if resource_types else {}
+
+        for mapping in paginate(client, 'get_resources', 'ResourceTagMappingList', page_size=100, **kwargs):
+            arn = mapping['ResourceARN']
+            service, resource_type, resource_id, arn_region = parse_arn(arn)
+            known = TAGGED_RESOURCE_TYPES.get((service, resource_type))
+            if known is None:
+                continue
+
+            service_id, service_type = known
+            tags = mapping.get('Tags', [])
+            services.append({
+                'service_id': service_id,
+                'resource_id': resource_id if service == 'ec2' else arn,
+                'resource_name': next((tag['Value'] for tag in tags if tag['Key'] == 'Name'), resource_id),
+                'region': arn_region or ('global' if service == 'cloudfront' else region),
+                'service_type': service_type,
+                'estimated_monthly_cost': None,
+                'count': 1,
+                'details': {
+                    'arn': arn,
+                    'tags': tags
+                },
+                'discovered_at': datetime.now(timezone.utc).isoformat()
+            })
+
+        # Describe (in batches) only what pricing needs
+        by_service_id = {}
+        for resource in services:
+            by_service_id.setdefault(resource['service_id'], []).append(resource)
+
+        ec2 = get_client('ec2', creds, region)
+        removed = set()
+        for service_id, enrich in ENRICHERS.items():
+            resources = by_service_id.get(service_id)
+            if not resources:
+                continue
+            client = get_client('rds', creds, region) if service_id == 'rds_db_instance' else ec2
+            try:
+                removed.update(enrich(client, resources))
+            except Exception as e:
+                print(f"⚠️ Could not describe {service_id} resources in {region}: {str(e)}")
+
+        services = [resource for resource in services if id(resource) not in removed]
+
+    except Exception as e:
+        print(f"Error running quick inventory in {region}: {str(e)}")
+
+    return services
+
+
+def _describe_filtered(client, operation, result_key, filter_name, values, batch_size):
+    for batch in chunked(values, batch_size):
+        yield from paginate(client, operation, result_key, Filters=[{'Name': filter_name, 'Values': batch}])
+
+
+def _enrich_instances(client, resources):
+    """Instance type and state; returns ids of resources that no longer exist"""
+    by_id = {resource['resource_id']: resource for resource in resources}
+    found = set()
+    for reservation in _describe_filtered(client, 'describe_instances', 'Reservations', 'instance-id', list(by_id), DESCRIBE_FILTER_BATCH):
+        for instance in reservation.get('Instances', []):
+            resource = by_id.get(instance['InstanceId'])
+            state = instance.get('State', {}).get('Name', 'unknown')
+            if resource is None or state == 'terminated':
+                continue
+            found.add(instance['InstanceId'])
+            instance_type = instance.get('InstanceType', 'unknown')
+            resource['estimated_monthly_cost'] = round(estimate_instance_monthly_cost(instance_type, state, instance.get('Platform')), 2)
+            resource['details'].update({'instance_type': instance_type, 'state': state})
+    return {id(resource) for resource_id, resource in by_id.items() if resource_id not in found}
+
+
+def _enrich_volumes(client, resources):
+    """Volume type, size and IOPS; returns ids of resources that no longer exist"""
+    by_id = {resource['resource_id']: resource for resource in resources}
+    found = set()
+    for volume in _describe_filtered(client, 'describe_volumes', 'Volumes', 'volume-id', list(by_id), DESCRIBE_FILTER_BATCH):
+        resource = by_id.get(volume['VolumeId'])
+        if resource is None:
+            continue
+        found.add(volume['VolumeId'])
+        volume_type = volume.get('VolumeType', 'gp2')
+        size_gb = volume.get('Size', 0)
+        iops = volume.get('Iops', 0)
+        resource['service_id'] = f"ebs_volume_{volume_type}"
+        resource['estimated_monthly_cost'] = round(estimate_volume_monthly_cost(volume_type, size_gb, iops), 2)
+        resource['details'].update({'volume_type': volume_type, 'size_gb': size_gb, 'iops': iops, 'state': volume.get('State')})
+    return {id(resource) for resource_id, resource in by_id.items() if resource_id not in found}
+
+
+def _enrich_addresses(client, resources):
+    """Only unattached Elastic IPs are billed; returns ids of released addresses"""
+    by_id = {resource['resource_id']: resource for resource in resources}
+    found = set()
+    for address in _describe_filtered(client, 'describe_addresses', 'Addresses', 'allocation-id', list(by_id), DESCRIBE_FILTER_BATCH):
+        resource = by_id.get(address.get('AllocationId'))
+        if resource is None:
+            continue
+        found.add(address['AllocationId'])
+        is_attached = 'InstanceId' in address or 'NetworkInterfaceId' in address
+        resource['estimated_monthly_cost'] = 0.00 if is_attached else round(0.005 * 730, 2)
+        resource['resource_name'] = address.get('PublicIp', resource['resource_name'])
+        resource['details'].update({'public_ip': address.get('PublicIp'), 'is_attached': is_attached})
+    return {id(resource) for resource_id, resource in by_id.items() if resource_id not in found}
+
+
+def _enrich_db_instances(client, resources):
+    """Instance class, storage and Multi-AZ; returns ids of deleted DB instances"""
+    by_arn = {resource['resource_id']: resource for resource in resources}
+    found = set()
+    for instance in _describe_filtered(client, 'describe_db_instances', 'DBInstances', 'db-instance-id', list(by_arn), RDS_FILTER_BATCH):
+        resource = by_arn.get(instance['DBInstanceArn'])
+        if resource is None:
+            continue
+        found.add(instance['DBInstanceArn'])
+        instance_class = instance.get('DBInstanceClass', '')
+        resource['estimated_monthly_cost'] = round(estimate_db_instance_monthly_cost(
+            instance_class,
+            instance.get('StorageType', 'gp2'),
+            instance.get('AllocatedStorage', 0),
+            instance.get('Iops', 0),
+            instance.get('MultiAZ', False)
+        ), 2)
+        resource['resource_name'] = instance['DBInstanceIdentifier']
+        resource['details'].update({
+            'instance_class': instance_class,
+            'engine': instance.get('Engine'),
+            'allocated_storage': instance.get('AllocatedStorage', 0),
+            'multi_az': instance.get('MultiAZ', False)
+        })
+    return {id(resource) for resource_arn, resource in by_arn.items() if resource_arn not in found}
+
+
+# service_id -> fn(client, resources) that prices resources in place with
+# batched describe calls and returns id() of resources that no longer exist
+ENRICHERS = {
+    'ec2_instance': _enrich_instances,
+    'ebs_volume_gp2': _enrich_volumes,
+    'elastic_ip': _enrich_addresses,
+    'rds_db_instance': _enrich_db_instances,
+}
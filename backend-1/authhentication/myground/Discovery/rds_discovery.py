@@ -1,26 +1,56 @@
 # discovery/rds_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
 from datetime import datetime
 
 from datetime import timezone
 # and then using:
 timezone.utc
 
+# Simplified on-demand pricing, shared with the quick inventory
+RDS_HOURLY_RATES = {
+    'db.t3.micro': 0.017, 'db.t3.small': 0.034, 'db.t3.medium': 0.068,
+    'db.t3.large': 0.136, 'db.t3.xlarge': 0.272, 'db.t3.2xlarge': 0.544,
+    'db.m5.large': 0.155, 'db.m5.xlarge': 0.31, 'db.m5.2xlarge': 0.62,
+    'db.m5.4xlarge': 1.24, 'db.m5.8xlarge': 2.48, 'db.m5.12xlarge': 3.72,
+    'db.m5.16xlarge': 4.96, 'db.m5.24xlarge': 7.44,
+    'db.r5.large': 0.24, 'db.r5.xlarge': 0.48, 'db.r5.2xlarge': 0.96,
+    'db.r5.4xlarge': 1.92, 'db.r5.8xlarge': 3.84, 'db.r5.12xlarge': 5.76,
+    'db.r5.16xlarge': 7.68, 'db.r5.24xlarge': 11.52
+}
+
+# Storage cost per GB-month
+RDS_STORAGE_PRICING = {
+    'gp2': 0.115, 'gp3': 0.108, 'io1': 0.125, 'standard': 0.115,
+    'aurora': 0.10
+}
+
+def estimate_db_instance_monthly_cost(instance_class, storage_type, allocated_storage, iops, multi_az):
+    """Monthly cost of a DB instance (instance hours, storage and io1 IOPS)"""
+    monthly_instance_cost = RDS_HOURLY_RATES.get(instance_class, 0.10) * 730
+    monthly_storage_cost = RDS_STORAGE_PRICING.get(storage_type, 0.115) * allocated_storage
+    
+    # IOPS cost for io1
+    if storage_type == 'io1' and iops > 0:
+        monthly_iops_cost = 0.10 * iops
+    else:
+        monthly_iops_cost = 0
+    
+    # Multi-AZ doubles the instance cost
+    if multi_az:
+        monthly_instance_cost *= 2
+    
+    return monthly_instance_cost + monthly_storage_cost + monthly_iops_cost
+
 def discover_rds_services(creds, region):
     """Discover all RDS-related services and components"""
     services = []
     try:
-        client = boto3.client(
-            'rds',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('rds', creds, region)
         
         # ========== RDS INSTANCES ==========
-        instances = client.describe_db_instances()
-        for instance in instances.get('DBInstances', []):
+        instances = collect(client, 'describe_db_instances', 'DBInstances')
+        for instance in instances:
             instance_id = instance['DBInstanceIdentifier']
             instance_class = instance.get('DBInstanceClass', '')
             engine = instance.get('Engine', '')
@@ -30,40 +60,7 @@ def discover_rds_services(creds, region):
             iops = instance.get('Iops', 0)
             
             # Estimate cost (simplified)
-            # Instance hourly rate based on class (simplified)
-            hourly_rates = {
-                'db.t3.micro': 0.017, 'db.t3.small': 0.034, 'db.t3.medium': 0.068,
-                'db.t3.large': 0.136, 'db.t3.xlarge': 0.272, 'db.t3.2xlarge': 0.544,
-                'db.m5.large': 0.155, 'db.m5.xlarge': 0.31, 'db.m5.2xlarge': 0.62,
-                'db.m5.4xlarge': 1.24, 'db.m5.8xlarge': 2.48, 'db.m5.12xlarge': 3.72,
-                'db.m5.16xlarge': 4.96, 'db.m5.24xlarge': 7.44,
-                'db.r5.large': 0.24, 'db.r5.xlarge': 0.48, 'db.r5.2xlarge': 0.96,
-                'db.r5.4xlarge': 1.92, 'db.r5.8xlarge': 3.84, 'db.r5.12xlarge': 5.76,
-                'db.r5.16xlarge': 7.68, 'db.r5.24xlarge': 11.52
-            }
-            
-            hourly_rate = hourly_rates.get(instance_class, 0.10)
-            monthly_instance_cost = hourly_rate * 730
-            
-            # Storage cost
-            storage_pricing = {
-                'gp2': 0.115, 'gp3': 0.108, 'io1': 0.125, 'standard': 0.115,
-                'aurora': 0.10
-            }
-            storage_rate = storage_pricing.get(storage_type, 0.115)
-            monthly_storage_cost = storage_rate * allocated_storage
-            
-            # IOPS cost for io1
-            if storage_type == 'io1' and iops > 0:
-                monthly_iops_cost = 0.10 * iops
-            else:
-                monthly_iops_cost = 0
-            
-            # Multi-AZ doubles the instance cost
-            if multi_az:
-                monthly_instance_cost *= 2
-            
-            total_monthly_cost = monthly_instance_cost + monthly_storage_cost + monthly_iops_cost
+            total_monthly_cost = estimate_db_instance_monthly_cost(instance_class, storage_type, allocated_storage, iops, multi_az)
             
             services.append({
                 'service_id': 'rds_db_instance',
@@ -123,8 +120,7 @@ def discover_rds_services(creds, region):
         
         # ========== RDS PROXIES ==========
         try:
-            proxies = client.describe_db_proxies()
-            for proxy in proxies.get('DBProxies', []):
+            for proxy in paginate(client, 'describe_db_proxies', 'DBProxies'):
                 proxy_hourly_cost = 0.015
                 monthly_cost = proxy_hourly_cost * 730
                 
@@ -156,8 +152,7 @@ def discover_rds_services(creds, region):
             pass
         
         # ========== RDS SNAPSHOTS ==========
-        snapshots = client.describe_db_snapshots(SnapshotType='manual')
-        for snapshot in snapshots.get('DBSnapshots', []):
+        for snapshot in paginate(client, 'describe_db_snapshots', 'DBSnapshots', SnapshotType='manual'):
             allocated_storage = snapshot.get('AllocatedStorage', 0)
             monthly_cost = 0.095 * allocated_storage  # $0.095 per GB-month
             
@@ -185,7 +180,7 @@ def discover_rds_services(creds, region):
         
         # ========== RDS AUTOMATED BACKUPS ==========
         # Automated backups are included in the instance, but we can track them
-        for instance in instances.get('DBInstances', []):
+        for instance in instances:
             backup_retention = instance.get('BackupRetentionPeriod', 0)
             allocated_storage = instance.get('AllocatedStorage', 0)
             
@@ -212,8 +207,7 @@ def discover_rds_services(creds, region):
                 })
         
         # ========== RDS PARAMETER GROUPS ==========
-        param_groups = client.describe_db_parameter_groups()
-        for param_group in param_groups.get('DBParameterGroups', []):
+        for param_group in paginate(client, 'describe_db_parameter_groups', 'DBParameterGroups'):
             services.append({
                 'service_id': 'rds_parameter_group',
                 'resource_id': param_group['DBParameterGroupArn'],
@@ -232,8 +226,7 @@ def discover_rds_services(creds, region):
             })
         
         # ========== RDS OPTION GROUPS ==========
-        option_groups = client.describe_option_groups()
-        for option_group in option_groups.get('OptionGroupsList', []):
+        for option_group in paginate(client, 'describe_option_groups', 'OptionGroupsList'):
             services.append({
                 'service_id': 'rds_option_group',
                 'resource_id': option_group['OptionGroupArn'],
@@ -254,8 +247,7 @@ def discover_rds_services(creds, region):
             })
         
         # ========== RDS SUBNET GROUPS ==========
-        subnet_groups = client.describe_db_subnet_groups()
-        for subnet_group in subnet_groups.get('DBSubnetGroups', []):
+        for subnet_group in paginate(client, 'describe_db_subnet_groups', 'DBSubnetGroups'):
             services.append({
                 'service_id': 'rds_subnet_group',
                 'resource_id': subnet_group['DBSubnetGroupArn'],
@@ -277,8 +269,7 @@ def discover_rds_services(creds, region):
         
         # ========== AURORA CLUSTERS ==========
         try:
-            clusters = client.describe_db_clusters()
-            for cluster in clusters.get('DBClusters', []):
+            for cluster in paginate(client, 'describe_db_clusters', 'DBClusters'):
                 engine = cluster.get('Engine', '')
                 allocated_storage = cluster.get('AllocatedStorage', 0)
                 
@@ -336,7 +327,7 @@ def discover_rds_services(creds, region):
             pass
         
         # ========== RDS PERFORMANCE INSIGHTS ==========
-        for instance in instances.get('DBInstances', []):
+        for instance in instances:
             if instance.get('PerformanceInsightsEnabled', False):
                 hourly_cost = 0.10
                 monthly_cost = hourly_cost * 730
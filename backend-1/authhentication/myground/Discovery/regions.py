@@ -0,0 +1,130 @@
+# discovery/regions.py
+import collections
+import concurrent.futures
+
+from django.conf import settings
+
+from ..cache_utils import ResourceCache
+from ..client_pool import get_client
+from .pagination import current_budget, take_retries
+
+# Which regions an account is scanned in, and a shared region x service work
+# scheduler so every enabled region can be scanned at once.
+
+
+def list_enabled_regions(creds):
+    """Regions enabled for the account (default regions plus opted-in ones)"""
+    ec2 = get_client('ec2', creds, 'us-east-1')
+    response = ec2.describe_regions(
+        Filters=[{'Name': 'opt-in-status', 'Values': ['opt-in-not-required', 'opted-in']}]
+    )
+    return sorted(region['RegionName'] for region in response.get('Regions', []))
+
+
+def get_scan_regions(account, creds):
+    """Regions to scan for ``account``: its enabled regions (cached) narrowed by the allowlists"""
+    regions = ResourceCache.get_cached_dataset('regions', account.id)
+    if not regions:
+        try:
+            regions = list_enabled_regions(creds)
+            ResourceCache.cache_dataset('regions', account.id, regions)
+        except Exception as e:
+            print(f"⚠️ Could not list enabled regions for {account.aws_account_id}, using defaults: {e}")
+            regions = list(settings.DISCOVERY_DEFAULT_REGIONS)
+
+    allowlist = account.region_allowlist or settings.DISCOVERY_REGION_ALLOWLIST
+    if allowlist:
+        regions = [region for region in regions if region in allowlist]
+    return regions
+
+
+class RegionLimiter:
+    """Concurrency limit of one region, adjusted AIMD-style.
+
+    Tasks that needed botocore retries (throttling) halve the limit; tasks
+    that did not raise it by about one per ``limit`` successes.
+    """
+
+    def __init__(self, region):
+        self.region = region
+        self.limit = float(settings.DISCOVERY_REGION_INITIAL_CONCURRENCY)
+        self.running = 0
+
+    @property
+    def available(self):
+        return self.running < int(self.limit)
+
+    def on_done(self, retries):
+        if retries:
+            previous = int(self.limit)
+            self.limit = max(1.0, self.limit / 2)
+            if int(self.limit) < previous:
+                print(f"🐢 {self.region} is throttling ({retries} retries), concurrency now {int(self.limit)}")
+        else:
+            self.limit = min(float(settings.DISCOVERY_REGION_MAX_CONCURRENCY), self.limit + 1 / self.limit)
+
+
+def run_region_tasks(tasks, max_workers=None, budget=None):
+    """Run ``(region, fn, args)`` tasks on one shared thread pool, yielding results as tasks finish.
+
+    Regions are served round robin within their own RegionLimiter, so all
+    regions progress at once and a throttled region slows down without
+    holding back the others. Failed tasks are logged and skipped. Workers
+    run under ``budget`` (default: the caller's scan budget). New tasks are only dispatched while the
+    consumer pulls results, which bounds how much is buffered.
+    """
+    max_workers = max_workers or settings.DISCOVERY_MAX_WORKERS
+    budget = budget or current_budget()
+
+    pending = collections.OrderedDict()
+    limiters = {}
+    for region, fn, args in tasks:
+        pending.setdefault(region, collections.deque()).append((fn, args))
+        limiters.setdefault(region, RegionLimiter(region))
+
+    def execute(fn, args):
+        take_retries()
+        result = budget.run(fn, *args) if budget else fn(*args)
+        return result, take_retries()
+
+    running = {}
+
+    def dispatch():
+        dispatched = True
+        while dispatched and len(running) < max_workers:
+            dispatched = False
+            for region in list(pending):
+                if len(running) >= max_workers:
+                    break
+                limiter = limiters[region]
+                if not limiter.available:
+                    continue
+                fn, args = pending[region].popleft()
+                if not pending[region]:
+                    del pending[region]
+                limiter.running += 1
+                running[executor.submit(execute, fn, args)] = (region, fn)
+                dispatched = True
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="discovery")
+    try:
+        dispatch()
+        while running:
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            results = []
+            for future in done:
+                region, fn = running.pop(future)
+                limiter = limiters[region]
+                limiter.running -= 1
+                try:
+                    result, retries = future.result()
+                except Exception as e:
+                    print(f"Error in discovery thread ({fn.__name__}, {region}): {e}")
+                    continue
+                limiter.on_done(retries)
+                results.append(result)
+            dispatch()
+            yield from results
+    finally:
+        # Stop handing out work if the consumer stopped early
+        executor.shutdown(wait=True, cancel_futures=True)
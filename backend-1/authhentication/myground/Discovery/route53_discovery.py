@@ -1,5 +1,7 @@
 # discovery/route53_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
+from .tags import route53_tags
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,16 +11,13 @@ def discover_route53_services(creds):
     """Discover Route53 hosted zones, health checks, and related services (global)"""
     services = []
     try:
-        client = boto3.client(
-            'route53',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken']
+        client = get_client('route53', creds)
+        resource_tags = route53_tags(
+            client, fallback=lambda resource_id, ResourceType: get_route53_tags(client, resource_id, ResourceType)
         )
         
         # ========== HOSTED ZONES ==========
-        hosted_zones = client.list_hosted_zones()
-        for zone in hosted_zones.get('HostedZones', []):
+        for zone in paginate(client, 'list_hosted_zones', 'HostedZones'):
             zone_id = zone['Id'].split('/')[-1]
             zone_name = zone['Name']
             private_zone = zone.get('Config', {}).get('PrivateZone', False)
@@ -29,8 +28,7 @@ def discover_route53_services(creds):
             service_id = 'hosted_zone_private' if private_zone else 'hosted_zone'
             
             # Get resource record sets count for billing
-            record_sets = client.list_resource_record_sets(HostedZoneId=zone_id)
-            record_count = len(record_sets.get('ResourceRecordSets', []))
+            record_count = sum(1 for _ in paginate(client, 'list_resource_record_sets', 'ResourceRecordSets', HostedZoneId=zone_id))
             
             services.append({
                 'service_id': service_id,
@@ -47,15 +45,14 @@ def discover_route53_services(creds):
                     'comment': zone.get('Config', {}).get('Comment'),
                     'linked_service': zone.get('LinkedService'),
                     'resource_record_set_count': zone.get('ResourceRecordSetCount', 0),
-                    'tags': get_route53_tags(client, zone['Id'])
+                    'tags': resource_tags.defer(zone['Id'].split('/')[-1], ResourceType='hostedzone')
                 },
                 'discovered_at': datetime.now(timezone.utc).isoformat()
             })
             
             # ========== QUERY LOGGING ==========
             try:
-                loggings = client.list_query_logging_configs(HostedZoneId=zone_id)
-                for log_config in loggings.get('QueryLoggingConfigs', []):
+                for log_config in paginate(client, 'list_query_logging_configs', 'QueryLoggingConfigs', HostedZoneId=zone_id):
                     services.append({
                         'service_id': 'query_logging',
                         'resource_id': log_config['Id'],
@@ -75,8 +72,7 @@ def discover_route53_services(creds):
                 pass
         
         # ========== HEALTH CHECKS ==========
-        health_checks = client.list_health_checks()
-        for health_check in health_checks.get('HealthChecks', []):
+        for health_check in paginate(client, 'list_health_checks', 'HealthChecks'):
             health_check_id = health_check['Id']
             health_check_config = health_check.get('HealthCheckConfig', {})
             
@@ -115,23 +111,16 @@ def discover_route53_services(creds):
                     'child_health_checks': health_check_config.get('ChildHealthChecks', []),
                     'health_threshold': health_check_config.get('HealthThreshold'),
                     'alarm_identifier': health_check_config.get('AlarmIdentifier'),
-                    'tags': get_route53_tags(client, health_check['Id'])
+                    'tags': resource_tags.defer(health_check['Id'], ResourceType='healthcheck')
                 },
                 'discovered_at': datetime.now(timezone.utc).isoformat()
             })
         
         # ========== DNS FIREWALL ==========
         try:
-            route53resolver = boto3.client(
-                'route53resolver',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name='us-east-1'
-            )
+            route53resolver = get_client('route53resolver', creds, 'us-east-1')
             
-            firewall_domain_lists = route53resolver.list_firewall_domain_lists()
-            for domain_list in firewall_domain_lists.get('FirewallDomainLists', []):
+            for domain_list in paginate(route53resolver, 'list_firewall_domain_lists', 'FirewallDomainLists'):
                 # $0.60 per domain list per month
                 monthly_cost = 0.60
                 
@@ -158,8 +147,7 @@ def discover_route53_services(creds):
                 })
             
             # ========== DNS FIREWALL RULE GROUPS ==========
-            firewall_rule_groups = route53resolver.list_firewall_rule_groups()
-            for rule_group in firewall_rule_groups.get('FirewallRuleGroups', []):
+            for rule_group in paginate(route53resolver, 'list_firewall_rule_groups', 'FirewallRuleGroups'):
                 services.append({
                     'service_id': 'dns_firewall',
                     'resource_id': rule_group['Arn'],
@@ -188,19 +176,14 @@ def discover_route53_services(creds):
         
         # ========== RESOLVER ENDPOINTS ==========
         try:
-            route53resolver = boto3.client(
-                'route53resolver',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name='us-east-1'
-            )
+            route53resolver = get_client('route53resolver', creds, 'us-east-1')
             
             # Inbound endpoints
-            inbound_endpoints = route53resolver.list_resolver_endpoints(
+            inbound_endpoints = paginate(
+                route53resolver, 'list_resolver_endpoints', 'ResolverEndpoints',
                 Filters=[{'Name': 'Direction', 'Values': ['INBOUND']}]
             )
-            for endpoint in inbound_endpoints.get('ResolverEndpoints', []):
+            for endpoint in inbound_endpoints:
                 hourly_cost = 0.125
                 monthly_cost = hourly_cost * 730
                 
@@ -230,10 +213,11 @@ def discover_route53_services(creds):
                 })
             
             # Outbound endpoints
-            outbound_endpoints = route53resolver.list_resolver_endpoints(
+            outbound_endpoints = paginate(
+                route53resolver, 'list_resolver_endpoints', 'ResolverEndpoints',
                 Filters=[{'Name': 'Direction', 'Values': ['OUTBOUND']}]
             )
-            for endpoint in outbound_endpoints.get('ResolverEndpoints', []):
+            for endpoint in outbound_endpoints:
                 hourly_cost = 0.125
                 monthly_cost = hourly_cost * 730
                 
@@ -266,16 +250,9 @@ def discover_route53_services(creds):
         
         # ========== DOMAIN REGISTRATIONS ==========
         try:
-            route53domains = boto3.client(
-                'route53domains',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name='us-east-1'
-            )
+            route53domains = get_client('route53domains', creds, 'us-east-1')
             
-            domains = route53domains.list_domains()
-            for domain in domains.get('Domains', []):
+            for domain in paginate(route53domains, 'list_domains', 'Domains'):
                 domain_name = domain['DomainName']
                 
                 # Domain registration cost varies by TLD, using .com as example
@@ -304,8 +281,7 @@ def discover_route53_services(creds):
         
         # ========== TRAFFIC FLOW POLICIES ==========
         try:
-            traffic_policies = client.list_traffic_policies()
-            for policy in traffic_policies.get('TrafficPolicySummaries', []):
+            for policy in paginate(client, 'list_traffic_policies', 'TrafficPolicySummaries'):
                 # $50 per policy per month
                 monthly_cost = 50.00
                 
@@ -328,16 +304,19 @@ def discover_route53_services(creds):
         except:
             pass
         
+        # Fill in the deferred tags with batched calls
+        resource_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering Route53 services: {str(e)}")
     
     return services
 
-def get_route53_tags(client, resource_id):
-    """Get tags for Route53 resource"""
+def get_route53_tags(client, resource_id, resource_type):
+    """Get tags for Route53 resource (``resource_type`` 'hostedzone' or 'healthcheck')"""
     try:
         response = client.list_tags_for_resource(
-            ResourceType='hostedzone' if 'hostedzone' in resource_id else 'healthcheck',
+            ResourceType=resource_type,
             ResourceId=resource_id.split('/')[-1]
         )
         return response.get('ResourceTagSet', {}).get('Tags', [])
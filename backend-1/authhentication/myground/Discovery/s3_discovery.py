@@ -1,5 +1,6 @@
 # discovery/s3_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +10,10 @@ def discover_s3_services(creds, region):
     """Discover S3 buckets and related services"""
     services = []
     try:
-        client = boto3.client(
-            's3',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name='us-east-1'  # S3 is global
-        )
+        client = get_client('s3', creds, 'us-east-1')  # S3 is global
         
         # ========== S3 BUCKETS ==========
-        buckets = client.list_buckets()
-        for bucket in buckets.get('Buckets', []):
+        for bucket in paginate(client, 'list_buckets', 'Buckets'):
             bucket_name = bucket['Name']
             creation_date = bucket.get('CreationDate')
             
@@ -145,8 +139,7 @@ def discover_s3_services(creds, region):
                     
                     # ========== BUCKET INVENTORY ==========
                     try:
-                        inventory = client.list_bucket_inventory_configurations(Bucket=bucket_name)
-                        for inventory_config in inventory.get('InventoryConfigurationList', []):
+                        for inventory_config in paginate(client, 'list_bucket_inventory_configurations', 'InventoryConfigurationList', Bucket=bucket_name):
                             services.append({
                                 'service_id': 's3_inventory',
                                 'resource_id': f"{bucket_name}-{inventory_config.get('Id')}",
@@ -170,8 +163,7 @@ def discover_s3_services(creds, region):
                     
                     # ========== BUCKET ACCESS POINTS ==========
                     try:
-                        access_points = client.list_access_points(Bucket=bucket_name)
-                        for ap in access_points.get('AccessPointList', []):
+                        for ap in paginate(client, 'list_access_points', 'AccessPointList', Bucket=bucket_name):
                             services.append({
                                 'service_id': 's3_access_points',
                                 'resource_id': ap['AccessPointArn'],
@@ -198,25 +190,13 @@ def discover_s3_services(creds, region):
         
         # ========== S3 MULTI-REGION ACCESS POINTS ==========
         try:
-            s3control = boto3.client(
-                's3control',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name='us-west-2'  # MRAP is global but requires a region
-            )
+            s3control = get_client('s3control', creds, 'us-west-2')  # MRAP is global but requires a region
             
             # Get account ID from STS
-            sts = boto3.client(
-                'sts',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken']
-            )
+            sts = get_client('sts', creds)
             account_id = sts.get_caller_identity()['Account']
             
-            mraps = s3control.list_multi_region_access_points(AccountId=account_id)
-            for mrap in mraps.get('AccessPoints', []):
+            for mrap in paginate(s3control, 'list_multi_region_access_points', 'AccessPoints', AccountId=account_id):
                 services.append({
                     'service_id': 's3_multi_region_access_point',
                     'resource_id': mrap['AccessPointArn'],
@@ -241,8 +221,7 @@ def discover_s3_services(creds, region):
         
         # ========== S3 STORAGE LENS ==========
         try:
-            storage_lens = s3control.list_storage_lens_configurations(AccountId=account_id)
-            for lens in storage_lens.get('StorageLensConfigurationList', []):
+            for lens in paginate(s3control, 'list_storage_lens_configurations', 'StorageLensConfigurationList', AccountId=account_id):
                 services.append({
                     'service_id': 's3_storage_lens',
                     'resource_id': lens['Id'],
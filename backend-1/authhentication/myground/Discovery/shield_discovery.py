@@ -1,5 +1,6 @@
 # discovery/shield_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -10,13 +11,7 @@ def discover_shield_services(creds, region):
     services = []
     try:
         # Shield is global, but we need to check if it's enabled
-        client = boto3.client(
-            'shield',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name='us-east-1'  # Shield is global
-        )
+        client = get_client('shield', creds, 'us-east-1')  # Shield is global
         
         # ========== SHIELD SUBSCRIPTION ==========
         try:
@@ -46,8 +41,7 @@ def discover_shield_services(creds, region):
                 })
                 
                 # ========== SHIELD ADVANCED PROTECTIONS ==========
-                protections = client.list_protections()
-                for protection in protections.get('Protections', []):
+                for protection in paginate(client, 'list_protections', 'Protections'):
                     protection_id = protection['Id']
                     protection_name = protection['Name']
                     resource_arn = protection.get('ResourceArn')
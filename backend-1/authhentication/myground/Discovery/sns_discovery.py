@@ -1,5 +1,7 @@
 # discovery/sns_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
+from .tags import TaggingApiBatch
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +11,13 @@ def discover_sns_services(creds, region):
     """Discover SNS topics and subscriptions"""
     services = []
     try:
-        client = boto3.client(
-            'sns',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('sns', creds, region)
+        sns_tags = TaggingApiBatch(creds, region, fallback=lambda arn: (
+            get_sns_platform_app_tags(client, arn) if ':app/' in arn else get_sns_topic_tags(client, arn)
+        ))
         
         # ========== SNS TOPICS ==========
-        topics = client.list_topics()
-        for topic in topics.get('Topics', []):
+        for topic in paginate(client, 'list_topics', 'Topics'):
             topic_arn = topic['TopicArn']
             topic_name = topic_arn.split(':')[-1]
             
@@ -35,8 +33,8 @@ def discover_sns_services(creds, region):
                 delivery_costs = 0.00
                 
                 # Get subscriptions for this topic
-                subscriptions = client.list_subscriptions_by_topic(TopicArn=topic_arn)
-                subscription_count = len(subscriptions.get('Subscriptions', []))
+                subscriptions = collect(client, 'list_subscriptions_by_topic', 'Subscriptions', TopicArn=topic_arn)
+                subscription_count = len(subscriptions)
                 
                 services.append({
                     'service_id': 'sns_topic',
@@ -62,13 +60,13 @@ def discover_sns_services(creds, region):
                         'tracing_config': attrs.get('TracingConfig'),
                         'kms_master_key_id': attrs.get('KmsMasterKeyId'),
                         'subscription_count': subscription_count,
-                        'tags': get_sns_topic_tags(client, topic_arn)
+                        'tags': sns_tags.defer(topic_arn)
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
                 
                 # ========== SNS SUBSCRIPTIONS ==========
-                for sub in subscriptions.get('Subscriptions', []):
+                for sub in subscriptions:
                     subscription_arn = sub['SubscriptionArn']
                     if subscription_arn != 'PendingConfirmation':
                         protocol = sub.get('Protocol', 'unknown')
@@ -126,8 +124,7 @@ def discover_sns_services(creds, region):
         
         # ========== SNS PLATFORM APPLICATIONS (MOBILE PUSH) ==========
         try:
-            platform_apps = client.list_platform_applications()
-            for app in platform_apps.get('PlatformApplications', []):
+            for app in paginate(client, 'list_platform_applications', 'PlatformApplications'):
                 app_arn = app['PlatformApplicationArn']
                 
                 services.append({
@@ -142,7 +139,7 @@ def discover_sns_services(creds, region):
                         'platform_application_arn': app_arn,
                         'attributes': app.get('Attributes', {}),
                         'platform': app.get('Platform'),
-                        'tags': get_sns_platform_app_tags(client, app_arn)
+                        'tags': sns_tags.defer(app_arn)
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
@@ -171,6 +168,9 @@ def discover_sns_services(creds, region):
         except:
             pass
         
+        # Fill in the deferred tags with batched calls
+        sns_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering SNS services in {region}: {str(e)}")
     
@@ -1,5 +1,7 @@
 # discovery/sqs_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect
+from .tags import TaggingApiBatch, tags_as_dict
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,18 +11,16 @@ def discover_sqs_services(creds, region):
     """Discover SQS queues and related resources"""
     services = []
     try:
-        client = boto3.client(
-            'sqs',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
+        client = get_client('sqs', creds, region)
+        queue_tags = TaggingApiBatch(
+            creds, region, formatter=tags_as_dict, empty=dict,
+            fallback=lambda arn: get_sqs_tags_by_arn(client, arn)
         )
         
         # ========== SQS QUEUES ==========
-        queues = client.list_queues()
-        if 'QueueUrls' in queues:
-            for queue_url in queues['QueueUrls']:
+        queue_urls = collect(client, 'list_queues', 'QueueUrls', page_size=1000)
+        if queue_urls:
+            for queue_url in queue_urls:
                 try:
                     # Get queue attributes
                     attributes = client.get_queue_attributes(
@@ -86,7 +86,7 @@ def discover_sqs_services(creds, region):
                             'created_timestamp': attrs.get('CreatedTimestamp'),
                             'last_modified_timestamp': attrs.get('LastModifiedTimestamp'),
                             'sqs_managed_sse_enabled': attrs.get('SqsManagedSseEnabled') == 'true',
-                            'tags': get_sqs_tags(client, queue_url)
+                            'tags': queue_tags.defer(queue_arn)
                         },
                         'discovered_at': datetime.now(timezone.utc).isoformat()
                     })
@@ -120,6 +120,9 @@ def discover_sqs_services(creds, region):
                 except Exception as e:
                     print(f"Error processing SQS queue {queue_url}: {str(e)}")
         
+        # Fill in the deferred tags with batched calls
+        queue_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering SQS services in {region}: {str(e)}")
     
@@ -133,6 +136,11 @@ def get_sqs_tags(client, queue_url):
     except:
         return {}
 
+def get_sqs_tags_by_arn(client, queue_arn):
+    """Get tags for SQS queue by ARN"""
+    account_id, queue_name = queue_arn.split(':')[4:6]
+    return get_sqs_tags(client, f"{client.meta.endpoint_url}/{account_id}/{queue_name}")
+
 def parse_redrive_policy(redrive_policy):
     """Parse redrive policy JSON string"""
     if not redrive_policy:
@@ -1,5 +1,6 @@
 # discovery/ssm_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +10,10 @@ def discover_ssm_services(creds, region):
     """Discover Systems Manager resources: parameters, documents, inventory, patches, sessions"""
     services = []
     try:
-        client = boto3.client(
-            'ssm',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('ssm', creds, region)
         
         # ========== SSM PARAMETERS ==========
-        parameters = client.describe_parameters(MaxResults=50)
-        for param in parameters.get('Parameters', []):
+        for param in paginate(client, 'describe_parameters', 'Parameters', page_size=50):
             param_name = param['Name']
             param_type = param['Type']
             param_version = param.get('Version', 1)
@@ -66,8 +60,7 @@ def discover_ssm_services(creds, region):
             })
         
         # ========== SSM DOCUMENTS ==========
-        documents = client.list_documents(MaxResults=50)
-        for doc in documents.get('DocumentIdentifiers', []):
+        for doc in paginate(client, 'list_documents', 'DocumentIdentifiers', page_size=50):
             doc_name = doc['Name']
             doc_owner = doc.get('Owner', 'Amazon')
             doc_version = doc.get('DocumentVersion', '1')
@@ -110,8 +103,7 @@ def discover_ssm_services(creds, region):
                     print(f"Error describing SSM document {doc_name}: {str(e)}")
         
         # ========== SSM MANAGED INSTANCES ==========
-        instances = client.describe_instance_information()
-        for instance in instances.get('InstanceInformationList', []):
+        for instance in paginate(client, 'describe_instance_information', 'InstanceInformationList', page_size=50):
             instance_id = instance['InstanceId']
             ping_status = instance.get('PingStatus', 'Online')
             platform_type = instance.get('PlatformType', 'Linux')
@@ -159,8 +151,7 @@ def discover_ssm_services(creds, region):
             })
         
         # ========== SSM ASSOCIATIONS ==========
-        associations = client.list_associations(MaxResults=50)
-        for assoc in associations.get('Associations', []):
+        for assoc in paginate(client, 'list_associations', 'Associations', page_size=50):
             assoc_id = assoc['AssociationId']
             assoc_name = assoc.get('Name', '')
             instance_id = assoc.get('InstanceId', 'N/A')
@@ -204,8 +195,7 @@ def discover_ssm_services(creds, region):
                 print(f"Error describing SSM association {assoc_id}: {str(e)}")
         
         # ========== SSM PATCH BASELINES ==========
-        patch_baselines = client.describe_patch_baselines(MaxResults=50)
-        for baseline in patch_baselines.get('BaselineIdentities', []):
+        for baseline in paginate(client, 'describe_patch_baselines', 'BaselineIdentities', page_size=50):
             baseline_id = baseline['BaselineId']
             baseline_name = baseline['BaselineName']
             baseline_description = baseline.get('BaselineDescription', '')
@@ -232,8 +222,7 @@ def discover_ssm_services(creds, region):
             })
         
         # ========== SSM MAINTENANCE WINDOWS ==========
-        maintenance_windows = client.describe_maintenance_windows(MaxResults=50)
-        for window in maintenance_windows.get('WindowIdentities', []):
+        for window in paginate(client, 'describe_maintenance_windows', 'WindowIdentities', page_size=50):
             window_id = window['WindowId']
             window_name = window.get('Name', window_id)
             schedule = window.get('Schedule', '')
@@ -267,8 +256,7 @@ def discover_ssm_services(creds, region):
         
         # ========== SSM AUTOMATION EXECUTIONS ==========
         try:
-            automations = client.list_automation_executions(MaxResults=50)
-            for automation in automations.get('AutomationExecutionMetadataList', []):
+            for automation in paginate(client, 'list_automation_executions', 'AutomationExecutionMetadataList', page_size=50):
                 execution_id = automation['AutomationExecutionId']
                 document_name = automation.get('DocumentName', '')
                 execution_status = automation.get('AutomationExecutionStatus', 'Unknown')
@@ -306,8 +294,7 @@ def discover_ssm_services(creds, region):
         
         # ========== SSM SESSION MANAGER ==========
         try:
-            sessions = client.describe_sessions(State='Active')
-            for session in sessions.get('Sessions', []):
+            for session in paginate(client, 'describe_sessions', 'Sessions', State='Active'):
                 session_id = session['SessionId']
                 target = session.get('Target', '')
                 owner = session.get('Owner', '')
@@ -363,8 +350,7 @@ def discover_ssm_services(creds, region):
         
         # ========== SSM COMPLIANCE ==========
         try:
-            compliance_summary = client.list_compliance_summaries(MaxResults=50)
-            for compliance in compliance_summary.get('ComplianceSummaryItems', []):
+            for compliance in paginate(client, 'list_compliance_summaries', 'ComplianceSummaryItems', page_size=50):
                 compliance_type = compliance['ComplianceType']
                 
                 services.append({
@@ -388,8 +374,7 @@ def discover_ssm_services(creds, region):
         
         # ========== SSM OPSMETADATA ==========
         try:
-            ops_metadata = client.list_ops_metadata(MaxResults=50)
-            for ops in ops_metadata.get('OpsMetadataList', []):
+            for ops in paginate(client, 'list_ops_metadata', 'OpsMetadataList', page_size=50):
                 ops_id = ops['OpsMetadataId']
                 resource_id = ops.get('ResourceId', '')
                 
@@ -416,8 +401,7 @@ def discover_ssm_services(creds, region):
         
         # ========== SSM RESOURCE DATA SYNC ==========
         try:
-            syncs = client.list_resource_data_sync()
-            for sync in syncs.get('ResourceDataSyncItems', []):
+            for sync in paginate(client, 'list_resource_data_sync', 'ResourceDataSyncItems'):
                 sync_name = sync['SyncName']
                 sync_type = sync.get('SyncType', 'SyncFromSource')
                 
@@ -446,8 +430,7 @@ def discover_ssm_services(creds, region):
         
         # ========== SSM OPSITEMS ==========
         try:
-            ops_items = client.describe_ops_items(MaxResults=50)
-            for ops_item in ops_items.get('OpsItemSummaries', []):
+            for ops_item in paginate(client, 'describe_ops_items', 'OpsItemSummaries', page_size=50):
                 ops_item_id = ops_item['OpsItemId']
                 
                 services.append({
@@ -481,17 +464,10 @@ def discover_ssm_services(creds, region):
         # ========== SSM INCIDENT MANAGER ==========
         try:
             # Check if Incident Manager is available in this region
-            ssm_incidents = boto3.client(
-                'ssm-incidents',
-                aws_access_key_id=creds['AccessKeyId'],
-                aws_secret_access_key=creds['SecretAccessKey'],
-                aws_session_token=creds['SessionToken'],
-                region_name=region
-            )
+            ssm_incidents = get_client('ssm-incidents', creds, region)
             
             # List response plans
-            response_plans = ssm_incidents.list_response_plans()
-            for plan in response_plans.get('responsePlanSummaries', []):
+            for plan in paginate(ssm_incidents, 'list_response_plans', 'responsePlanSummaries'):
                 plan_arn = plan['arn']
                 plan_name = plan['name']
                 
@@ -1,5 +1,7 @@
 # discovery/stepfunctions_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import collect, paginate
+from .tags import TaggingApiBatch, tags_with_keys
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +11,15 @@ def discover_stepfunctions_services(creds, region):
     """Discover Step Functions state machines and activities"""
     services = []
     try:
-        client = boto3.client(
-            'stepfunctions',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
+        client = get_client('stepfunctions', creds, region)
+        sfn_tags = TaggingApiBatch(
+            creds, region, formatter=tags_with_keys('key', 'value'),
+            fallback=lambda arn: get_stepfunctions_tags(client, arn)
         )
         
         # ========== STANDARD STATE MACHINES ==========
-        state_machines = client.list_state_machines()
-        for sm in state_machines.get('stateMachines', []):
+        state_machines = collect(client, 'list_state_machines', 'stateMachines')
+        for sm in state_machines:
             sm_arn = sm['stateMachineArn']
             sm_name = sm['name']
             sm_type = sm.get('type', 'STANDARD')
@@ -67,19 +67,20 @@ def discover_stepfunctions_services(creds, region):
                         'tracing_configuration': {
                             'enabled': tracing_config.get('enabled', False)
                         },
-                        'tags': get_stepfunctions_tags(client, sm_arn)
+                        'tags': sfn_tags.defer(sm_arn)
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
                 
                 # ========== STATE MACHINE EXECUTIONS ==========
                 try:
-                    executions = client.list_executions(
+                    executions = paginate(
+                        client, 'list_executions', 'executions',
+                        max_items=10,
                         stateMachineArn=sm_arn,
-                        maxResults=10,
                         statusFilter='RUNNING'
                     )
-                    for execution in executions.get('executions', []):
+                    for execution in executions:
                         exec_arn = execution['executionArn']
                         exec_name = execution['name']
                         
@@ -111,8 +112,7 @@ def discover_stepfunctions_services(creds, region):
         
         # ========== ACTIVITIES ==========
         try:
-            activities = client.list_activities()
-            for activity in activities.get('activities', []):
+            for activity in paginate(client, 'list_activities', 'activities'):
                 activity_arn = activity['activityArn']
                 activity_name = activity['name']
                 created_date = activity.get('creationDate')
@@ -131,7 +131,7 @@ def discover_stepfunctions_services(creds, region):
                         'activity_arn': activity_arn,
                         'name': activity_name,
                         'creation_date': created_date.isoformat() if created_date else None,
-                        'tags': get_stepfunctions_tags(client, activity_arn)
+                        'tags': sfn_tags.defer(activity_arn)
                     },
                     'discovered_at': datetime.now(timezone.utc).isoformat()
                 })
@@ -139,10 +139,9 @@ def discover_stepfunctions_services(creds, region):
             pass
         
         # ========== MAP RUNS ==========
-        for sm in state_machines.get('stateMachines', []):
+        for sm in state_machines:
             try:
-                map_runs = client.list_map_runs(stateMachineArn=sm['stateMachineArn'])
-                for map_run in map_runs.get('mapRuns', []):
+                for map_run in paginate(client, 'list_map_runs', 'mapRuns', stateMachineArn=sm['stateMachineArn']):
                     map_run_arn = map_run['mapRunArn']
                     
                     services.append({
@@ -165,6 +164,9 @@ def discover_stepfunctions_services(creds, region):
             except:
                 pass
         
+        # Fill in the deferred tags with batched calls
+        sfn_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering Step Functions services in {region}: {str(e)}")
     
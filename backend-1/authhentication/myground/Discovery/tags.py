@@ -0,0 +1,148 @@
+# discovery/tags.py
+from ..client_pool import get_client
+from .pagination import chunked, paginate
+
+# Batched tag lookups for discovery modules.
+#
+# Instead of one tagging call per resource, a module asks a TagBatch for a
+# placeholder (``'tags': elbv2_tags.defer(lb_arn)``), which is an empty list
+# or dict that ``resolve()`` fills in place before the module returns. All
+# deferred resources are then looked up with as few multi-resource calls as
+# the service API allows. Services without such an API use the Resource
+# Groups Tagging API, which takes up to 100 ARNs of any service per call.
+
+
+def tags_as_dict(tags):
+    """[{'Key': k, 'Value': v}] -> {k: v}"""
+    return {tag['Key']: tag.get('Value') for tag in tags}
+
+
+def tags_with_keys(key_name, value_name):
+    """Formatter renaming 'Key'/'Value' to a service's own tag field names"""
+    def formatter(tags):
+        return [{key_name: tag['Key'], value_name: tag.get('Value')} for tag in tags]
+    return formatter
+
+
+class TagBatch:
+    """Tags of many resources of one service, fetched ``batch_size`` resources per call.
+
+    ``defer`` keyword arguments are passed to the call (resources are
+    grouped by them). If a batch call fails, ``fallback(resource_id,
+    **kwargs)`` is used for each resource of that batch when given, so one
+    bad resource does not cost the tags of the whole batch.
+    """
+
+    def __init__(self, client, operation, id_param, batch_size, result_key, id_key, tags_key,
+                 formatter=None, fallback=None, empty=list):
+        self.client = client
+        self.operation = operation
+        self.id_param = id_param
+        self.batch_size = batch_size
+        self.result_key = result_key
+        self.id_key = id_key
+        self.tags_key = tags_key
+        self.formatter = formatter
+        self.fallback = fallback
+        self.empty = empty
+        self.pending = {}  # (call kwargs, resource id) -> placeholders
+
+    def defer(self, resource_id, **kwargs):
+        """Placeholder for the tags of ``resource_id``, filled by ``resolve``"""
+        placeholder = self.empty()
+        if resource_id:
+            self.pending.setdefault((tuple(sorted(kwargs.items())), resource_id), []).append(placeholder)
+        return placeholder
+
+    def _fetch(self, resource_ids, kwargs):
+        """{resource id: raw tags} for one batch"""
+        return {
+            item.get(self.id_key): item.get(self.tags_key) or []
+            for item in paginate(
+                self.client, self.operation, self.result_key,
+                **{self.id_param: resource_ids}, **kwargs
+            )
+        }
+
+    def resolve(self):
+        groups = {}
+        for kwargs, resource_id in self.pending:
+            groups.setdefault(kwargs, []).append(resource_id)
+
+        for kwargs, resource_ids in groups.items():
+            for batch in chunked(resource_ids, self.batch_size):
+                try:
+                    found = self._fetch(batch, dict(kwargs))
+                    if self.formatter:
+                        found = {resource_id: self.formatter(tags) for resource_id, tags in found.items()}
+                except Exception as e:
+                    if self.fallback is None:
+                        print(f"⚠️ {self.operation} failed for {len(batch)} resources: {e}")
+                        found = {}
+                    else:
+                        found = {resource_id: self.fallback(resource_id, **dict(kwargs)) for resource_id in batch}
+
+                for resource_id in batch:
+                    tags = found.get(resource_id)
+                    if not tags:
+                        continue
+                    for placeholder in self.pending[(kwargs, resource_id)]:
+                        if isinstance(placeholder, dict):
+                            placeholder.update(tags)
+                        else:
+                            placeholder.extend(tags)
+        self.pending.clear()
+
+
+class TaggingApiBatch(TagBatch):
+    """Tags of any ARNs through the Resource Groups Tagging API (100 ARNs per call).
+
+    Calls are made in the region of each ARN, so global-scope resources
+    (e.g. CloudFront WAF ACLs in us-east-1) resolve too. Resources without
+    tags are not returned by the API and keep an empty placeholder.
+    """
+
+    def __init__(self, creds, region, formatter=None, fallback=None, empty=list):
+        super().__init__(
+            None, 'get_resources', 'ResourceARNList', 100,
+            'ResourceTagMappingList', 'ResourceARN', 'Tags',
+            formatter=formatter, fallback=fallback, empty=empty
+        )
+        self.creds = creds
+        self.region = region
+
+    def _fetch(self, resource_ids, kwargs):
+        by_region = {}
+        for arn in resource_ids:
+            parts = arn.split(':')
+            arn_region = parts[3] if len(parts) > 3 and parts[3] else self.region
+            by_region.setdefault(arn_region, []).append(arn)
+
+        found = {}
+        for arn_region, arns in by_region.items():
+            client = get_client('resourcegroupstaggingapi', self.creds, arn_region)
+            for item in paginate(client, 'get_resources', 'ResourceTagMappingList', ResourceARNList=arns, **kwargs):
+                found[item['ResourceARN']] = item.get('Tags') or []
+        return found
+
+
+def elbv2_tags(client, fallback=None):
+    return TagBatch(client, 'describe_tags', 'ResourceArns', 20, 'TagDescriptions', 'ResourceArn', 'Tags',
+                    fallback=fallback)
+
+
+def elb_tags(client, fallback=None):
+    return TagBatch(client, 'describe_tags', 'LoadBalancerNames', 20, 'TagDescriptions', 'LoadBalancerName', 'Tags',
+                    fallback=fallback)
+
+
+def cloudtrail_tags(client, fallback=None):
+    """Only defer resources that live in the client's region; list_tags rejects the whole batch otherwise"""
+    return TagBatch(client, 'list_tags', 'ResourceIdList', 20, 'ResourceTagList', 'ResourceId', 'TagsList',
+                    fallback=fallback)
+
+
+def route53_tags(client, fallback=None):
+    """Defer with ``ResourceType='hostedzone'`` or ``'healthcheck'`` and the bare id"""
+    return TagBatch(client, 'list_tags_for_resources', 'ResourceIds', 10, 'ResourceTagSets', 'ResourceId', 'Tags',
+                    fallback=fallback)
@@ -1,5 +1,6 @@
 # discovery/vpc_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -9,17 +10,10 @@ def discover_vpc_services(creds, region):
     """Discover all VPC-related services and components"""
     services = []
     try:
-        client = boto3.client(
-            'ec2',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('ec2', creds, region)
         
         # ========== VPCS ==========
-        vpcs = client.describe_vpcs()
-        for vpc in vpcs.get('Vpcs', []):
+        for vpc in paginate(client, 'describe_vpcs', 'Vpcs'):
             services.append({
                 'service_id': 'vpc',
                 'resource_id': vpc['VpcId'],
@@ -38,8 +32,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== SUBNETS ==========
-        subnets = client.describe_subnets()
-        for subnet in subnets.get('Subnets', []):
+        for subnet in paginate(client, 'describe_subnets', 'Subnets'):
             services.append({
                 'service_id': 'subnet',
                 'resource_id': subnet['SubnetId'],
@@ -61,8 +54,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== INTERNET GATEWAYS ==========
-        igws = client.describe_internet_gateways()
-        for igw in igws.get('InternetGateways', []):
+        for igw in paginate(client, 'describe_internet_gateways', 'InternetGateways'):
             attachments = igw.get('Attachments', [])
             services.append({
                 'service_id': 'internet_gateway',
@@ -81,8 +73,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== NAT GATEWAYS ==========
-        nat_gateways = client.describe_nat_gateways()
-        for nat in nat_gateways.get('NatGateways', []):
+        for nat in paginate(client, 'describe_nat_gateways', 'NatGateways', Filter=[{'Name': 'state', 'Values': ['pending', 'available']}]):
             hourly_cost = 0.045  # $0.045 per hour
             monthly_cost = hourly_cost * 730  # Approximate monthly
             data_processed_cost = 0.045 * 100  # Assume 100GB data processed as example
@@ -109,8 +100,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== VPC ENDPOINTS ==========
-        endpoints = client.describe_vpc_endpoints()
-        for endpoint in endpoints.get('VpcEndpoints', []):
+        for endpoint in paginate(client, 'describe_vpc_endpoints', 'VpcEndpoints', Filters=[{'Name': 'vpc-endpoint-state', 'Values': ['pendingAcceptance', 'pending', 'available']}]):
             hourly_cost = 0.01  # $0.01 per hour
             monthly_cost = hourly_cost * 730
             data_processed_cost = 0.01 * 100  # Assume 100GB data processed
@@ -139,8 +129,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== VPC PEERING CONNECTIONS ==========
-        peerings = client.describe_vpc_peering_connections()
-        for peering in peerings.get('VpcPeeringConnections', []):
+        for peering in paginate(client, 'describe_vpc_peering_connections', 'VpcPeeringConnections'):
             services.append({
                 'service_id': 'vpc_peering',
                 'resource_id': peering['VpcPeeringConnectionId'],
@@ -160,8 +149,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== TRANSIT GATEWAYS ==========
-        tgws = client.describe_transit_gateways()
-        for tgw in tgws.get('TransitGateways', []):
+        for tgw in paginate(client, 'describe_transit_gateways', 'TransitGateways', Filters=[{'Name': 'state', 'Values': ['pending', 'available', 'modifying']}]):
             hourly_cost = 0.05
             monthly_cost = hourly_cost * 730
             
@@ -188,10 +176,11 @@ def discover_vpc_services(creds, region):
             })
             
             # ========== TRANSIT GATEWAY ATTACHMENTS ==========
-            attachments = client.describe_transit_gateway_attachments(
+            attachments = paginate(
+                client, 'describe_transit_gateway_attachments', 'TransitGatewayAttachments',
                 Filters=[{'Name': 'transit-gateway-id', 'Values': [tgw['TransitGatewayId']]}]
             )
-            for attachment in attachments.get('TransitGatewayAttachments', []):
+            for attachment in attachments:
                 attachment_hourly_cost = 0.05
                 attachment_monthly_cost = attachment_hourly_cost * 730
                 
@@ -214,8 +203,7 @@ def discover_vpc_services(creds, region):
                 })
         
         # ========== VPN CONNECTIONS ==========
-        vpn_connections = client.describe_vpn_connections()
-        for vpn in vpn_connections.get('VpnConnections', []):
+        for vpn in paginate(client, 'describe_vpn_connections', 'VpnConnections'):
             hourly_cost = 0.05
             monthly_cost = hourly_cost * 730
             data_processed_cost = 0.09 * 100  # Assume 100GB data transfer
@@ -244,8 +232,7 @@ def discover_vpc_services(creds, region):
         
         # ========== CLIENT VPN ENDPOINTS ==========
         try:
-            client_vpns = client.describe_client_vpn_endpoints()
-            for cvpn in client_vpns.get('ClientVpnEndpoints', []):
+            for cvpn in paginate(client, 'describe_client_vpn_endpoints', 'ClientVpnEndpoints'):
                 hourly_cost = 0.10
                 monthly_cost = hourly_cost * 730
                 data_processed_cost = 0.05 * 100
@@ -275,8 +262,7 @@ def discover_vpc_services(creds, region):
             pass  # Client VPN not available in all regions
         
         # ========== ELASTIC IPS ==========
-        addresses = client.describe_addresses()
-        for address in addresses.get('Addresses', []):
+        for address in paginate(client, 'describe_addresses', 'Addresses'):
             # Only charge for unattached EIPs
             is_attached = 'InstanceId' in address or 'NetworkInterfaceId' in address
             hourly_cost = 0.005 if not is_attached else 0.00
@@ -306,8 +292,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== NETWORK INTERFACES ==========
-        enis = client.describe_network_interfaces()
-        for eni in enis.get('NetworkInterfaces', []):
+        for eni in paginate(client, 'describe_network_interfaces', 'NetworkInterfaces'):
             # Check if it's an enhanced networking interface
             is_enhanced = eni.get('InterfaceType') in ['efa', 'trunk']
             service_id = 'eni_enhanced' if is_enhanced else 'eni'
@@ -341,8 +326,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== NETWORK ACLS ==========
-        nacls = client.describe_network_acls()
-        for nacl in nacls.get('NetworkAcls', []):
+        for nacl in paginate(client, 'describe_network_acls', 'NetworkAcls'):
             services.append({
                 'service_id': 'network_acl',
                 'resource_id': nacl['NetworkAclId'],
@@ -362,8 +346,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== SECURITY GROUPS ==========
-        sgs = client.describe_security_groups()
-        for sg in sgs.get('SecurityGroups', []):
+        for sg in paginate(client, 'describe_security_groups', 'SecurityGroups'):
             services.append({
                 'service_id': 'security_group',
                 'resource_id': sg['GroupId'],
@@ -384,8 +367,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== ROUTE TABLES ==========
-        route_tables = client.describe_route_tables()
-        for rt in route_tables.get('RouteTables', []):
+        for rt in paginate(client, 'describe_route_tables', 'RouteTables'):
             services.append({
                 'service_id': 'route_table',
                 'resource_id': rt['RouteTableId'],
@@ -405,8 +387,7 @@ def discover_vpc_services(creds, region):
             })
         
         # ========== VPC FLOW LOGS ==========
-        flow_logs = client.describe_flow_logs()
-        for flow_log in flow_logs.get('FlowLogs', []):
+        for flow_log in paginate(client, 'describe_flow_logs', 'FlowLogs'):
             # Cost based on data ingested
             estimated_gb_per_month = 10  # Assume 10GB per month
             monthly_cost = 0.50 * estimated_gb_per_month
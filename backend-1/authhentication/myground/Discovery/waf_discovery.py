@@ -1,5 +1,7 @@
 # discovery/waf_discovery.py
-import boto3
+from ..client_pool import get_client
+from .pagination import paginate
+from .tags import TaggingApiBatch
 from datetime import datetime
 from datetime import timezone
 # and then using:
@@ -10,19 +12,13 @@ def discover_waf_services(creds, region):
     services = []
     try:
         # WAF v2
-        client = boto3.client(
-            'wafv2',
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        client = get_client('wafv2', creds, region)
+        waf_tags = TaggingApiBatch(creds, region, fallback=lambda arn: get_waf_tags(client, arn))
         
         # ========== WEB ACLS ==========
         for scope in ['REGIONAL', 'CLOUDFRONT']:
             try:
-                web_acls = client.list_web_acls(Scope=scope)
-                for acl in web_acls.get('WebACLs', []):
+                for acl in paginate(client, 'list_web_acls', 'WebACLs', Scope=scope):
                     acl_name = acl['Name']
                     acl_id = acl['Id']
                     acl_arn = acl['ARN']
@@ -77,7 +73,7 @@ def discover_waf_services(creds, region):
                                 'default_action': web_acl.get('DefaultAction', {}),
                                 'visibility_config': web_acl.get('VisibilityConfig', {}),
                                 'association_count': get_web_acl_associations(client, acl_arn, scope),
-                                'tags': get_waf_tags(client, acl_arn)
+                                'tags': waf_tags.defer(acl_arn)
                             },
                             'discovered_at': datetime.now(timezone.utc).isoformat()
                         })
@@ -108,8 +104,7 @@ def discover_waf_services(creds, region):
         # ========== RULE GROUPS ==========
         for scope in ['REGIONAL', 'CLOUDFRONT']:
             try:
-                rule_groups = client.list_rule_groups(Scope=scope)
-                for rg in rule_groups.get('RuleGroups', []):
+                for rg in paginate(client, 'list_rule_groups', 'RuleGroups', Scope=scope):
                     rg_name = rg['Name']
                     rg_id = rg['Id']
                     rg_arn = rg['ARN']
@@ -146,7 +141,7 @@ def discover_waf_services(creds, region):
                                     for rule in rule_group.get('Rules', [])
                                 ],
                                 'visibility_config': rule_group.get('VisibilityConfig', {}),
-                                'tags': get_waf_tags(client, rg_arn)
+                                'tags': waf_tags.defer(rg_arn)
                             },
                             'discovered_at': datetime.now(timezone.utc).isoformat()
                         })
@@ -158,8 +153,7 @@ def discover_waf_services(creds, region):
         # ========== IP SETS ==========
         for scope in ['REGIONAL', 'CLOUDFRONT']:
             try:
-                ip_sets = client.list_ip_sets(Scope=scope)
-                for ip_set in ip_sets.get('IPSets', []):
+                for ip_set in paginate(client, 'list_ip_sets', 'IPSets', Scope=scope):
                     ip_set_name = ip_set['Name']
                     ip_set_id = ip_set['Id']
                     ip_set_arn = ip_set['ARN']
@@ -187,7 +181,7 @@ def discover_waf_services(creds, region):
                                 'ip_address_version': ip_set_details.get('IPAddressVersion'),
                                 'addresses': ip_set_details.get('Addresses', [])[:10],  # First 10 only
                                 'address_count': len(ip_set_details.get('Addresses', [])),
-                                'tags': get_waf_tags(client, ip_set_arn)
+                                'tags': waf_tags.defer(ip_set_arn)
                             },
                             'discovered_at': datetime.now(timezone.utc).isoformat()
                         })
@@ -199,8 +193,7 @@ def discover_waf_services(creds, region):
         # ========== REGEX PATTERN SETS ==========
         for scope in ['REGIONAL', 'CLOUDFRONT']:
             try:
-                regex_sets = client.list_regex_pattern_sets(Scope=scope)
-                for regex_set in regex_sets.get('RegexPatternSets', []):
+                for regex_set in paginate(client, 'list_regex_pattern_sets', 'RegexPatternSets', Scope=scope):
                     regex_name = regex_set['Name']
                     regex_id = regex_set['Id']
                     regex_arn = regex_set['ARN']
@@ -227,7 +220,7 @@ def discover_waf_services(creds, region):
                                 'description': regex_details.get('Description'),
                                 'regular_expressions': regex_details.get('RegularExpressionList', [])[:10],  # First 10 only
                                 'regex_count': len(regex_details.get('RegularExpressionList', [])),
-                                'tags': get_waf_tags(client, regex_arn)
+                                'tags': waf_tags.defer(regex_arn)
                             },
                             'discovered_at': datetime.now(timezone.utc).isoformat()
                         })
@@ -238,8 +231,7 @@ def discover_waf_services(creds, region):
         
         # ========== MANAGED RULE GROUPS ==========
         try:
-            managed_rule_groups = client.list_available_managed_rule_groups(Scope='REGIONAL')
-            for mrg in managed_rule_groups.get('ManagedRuleGroups', []):
+            for mrg in paginate(client, 'list_available_managed_rule_groups', 'ManagedRuleGroups', Scope='REGIONAL'):
                 services.append({
                     'service_id': 'waf_managed_rule_group',
                     'resource_id': mrg.get('VendorName', 'AWS') + '/' + mrg['Name'],
@@ -262,8 +254,7 @@ def discover_waf_services(creds, region):
         # ========== WAF LOGGING CONFIGURATIONS ==========
         for scope in ['REGIONAL', 'CLOUDFRONT']:
             try:
-                web_acls = client.list_web_acls(Scope=scope)
-                for acl in web_acls.get('WebACLs', []):
+                for acl in paginate(client, 'list_web_acls', 'WebACLs', Scope=scope):
                     try:
                         logging = client.get_logging_configuration(ResourceArn=acl['ARN'])
                         if 'LoggingConfiguration' in logging:
@@ -291,6 +282,9 @@ def discover_waf_services(creds, region):
             except:
                 pass
         
+        # Fill in the deferred tags with batched calls
+        waf_tags.resolve()
+        
     except Exception as e:
         print(f"Error discovering WAF services in {region}: {str(e)}")
     
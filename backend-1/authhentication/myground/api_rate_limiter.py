@@ -0,0 +1,119 @@
+# api_rate_limiter.py
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .Discovery.pagination import current_budget
+from .fanout import TokenBucket
+
+# Client-side pacing of AWS API calls.
+#
+# Every pooled client gets botocore event hooks that take a token from an
+# AdaptiveTokenBucket keyed by (AWS account ID, region, service, operation)
+# before each call, so all threads and rotated STS sessions calling the same
+# API of an account share one rate. Throttling
+# responses halve that rate and successes slowly raise it again, which keeps
+# calls just under the API limits. Botocore's adaptive retry mode
+# (AWS_CLIENT_RETRY_MODE) retries the throttled calls themselves; every
+# retry is charged to the scan budget of the calling discovery thread.
+
+# Request-rate throttling only. Botocore also retries LimitExceededException
+# and TransactionInProgressException, but those usually mean a quota was hit
+# or a conflicting change is in progress; slowing down does not help there.
+THROTTLING_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'BandwidthLimitExceeded',
+    'RequestThrottled',
+    'SlowDown',
+    'PriorRequestNotComplete',
+    'EC2ThrottledException',
+}
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """TokenBucket whose rate is halved on throttling and raised by about 1/s per second of successes"""
+
+    def __init__(self, name, rate, min_rate):
+        super().__init__(rate)
+        self.name = name
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate)
+
+    def on_throttle(self):
+        with self._lock:
+            previous = self.rate
+            self.rate = max(self.min_rate, self.rate / 2)
+        if self.rate < previous:
+            print(f"🐢 {self.name} is throttled, pacing at {self.rate:.2f} calls/s")
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + 1 / max(self.rate, 1.0))
+
+
+# Least recently used first, capped at AWS_API_MAX_BUCKETS
+_buckets = OrderedDict()
+_buckets_lock = threading.Lock()
+
+
+def get_api_bucket(account, region, service, operation):
+    """Process-wide bucket for one API of one account and region"""
+    key = (account, region, service, operation)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is not None:
+            _buckets.move_to_end(key)
+            return bucket
+        limits = settings.AWS_API_RATE_LIMITS
+        rate = limits.get(f"{service}.{operation}") or limits.get(service) or settings.AWS_API_DEFAULT_RATE_LIMIT
+        bucket = _buckets[key] = AdaptiveTokenBucket(
+            f"{service}.{operation} ({region or 'global'})", rate, settings.AWS_API_MIN_RATE_LIMIT
+        )
+        while len(_buckets) > settings.AWS_API_MAX_BUCKETS:
+            _buckets.popitem(last=False)
+        return bucket
+
+
+def _error_code(response):
+    if not response:
+        return None
+    return (response[1].get('Error') or {}).get('Code')
+
+
+def install_rate_limiter(client, account, region):
+    """Pace every call ``client`` makes and feed its throttling back into the buckets
+
+    ``account`` is the AWS account ID the client calls into, so buckets
+    outlive the STS session the client was built from.
+    """
+    service = client.meta.service_model.service_name
+
+    def before_call(model, **kwargs):
+        get_api_bucket(account, region, service, model.name).acquire()
+
+    def after_call(model, http_response, **kwargs):
+        if http_response.status_code < 400:
+            get_api_bucket(account, region, service, model.name).on_success()
+
+    def needs_retry(response, operation, attempts, **kwargs):
+        # Observe only: botocore's retry handler decides whether and when to retry
+        if _error_code(response) not in THROTTLING_ERROR_CODES:
+            return None
+        get_api_bucket(account, region, service, operation.name).on_throttle()
+        budget = current_budget()
+        if budget is not None:
+            budget.record_retry(operation.name, gave_up=attempts >= settings.AWS_CLIENT_MAX_ATTEMPTS)
+        return None
+
+    events = client.meta.events
+    events.register('before-call', before_call, unique_id='api-rate-limiter-before-call')
+    events.register('after-call', after_call, unique_id='api-rate-limiter-after-call')
+    events.register('needs-retry', needs_retry, unique_id='api-rate-limiter-needs-retry')
@@ -1,32 +1,71 @@
-import boto3
 from datetime import date, timedelta, datetime
+import hashlib
+import json
 from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.cache import cache
+from .cache_codec import decode, encode
+from .client_pool import client_pool
+from .credential_broker import credential_broker
 
 def assume_role(role_arn, external_id):
     try:
-        sts = boto3.client("sts")
-        creds = sts.assume_role(
-            RoleArn=role_arn,
-            RoleSessionName="CostSession",
-            ExternalId=str(external_id)  # Ensure it's string
-        )["Credentials"]
-        return boto3.client(
-            "ce",
-            aws_access_key_id=creds["AccessKeyId"],
-            aws_secret_access_key=creds["SecretAccessKey"],
-            aws_session_token=creds["SessionToken"],
-            region_name="us-east-1"
-        )
+        creds = credential_broker.get_credentials(role_arn, str(external_id), "CostSession")
+        return client_pool.get_client("ce", creds, "us-east-1")
     except ClientError as e:
         print(f"STS AssumeRole Error: {e}")
         raise
 
-def fetch_monthly_cost(ce):
+# --------------------------------------------------
+# Cost Explorer response cache
+#
+# Callers pass ``cache_scope`` (the account's role ARN) to share cached
+# responses between every session of that account; without it the request
+# goes straight to Cost Explorer.
+# --------------------------------------------------
+
+def get_cost_request_fingerprint(scope, params):
+    """Stable cache key for a get_cost_and_usage request"""
+    payload = json.dumps({'scope': scope, 'request': params}, sort_keys=True, default=str)
+    return f"ce_response_{hashlib.sha256(payload.encode()).hexdigest()}"
+
+def _cost_cache_ttl(params):
+    """Closed periods rarely change; the open period is only cached briefly"""
+    end = date.fromisoformat(params['TimePeriod']['End'])
+    closed_before = date.today() - timedelta(days=settings.COST_SYNC_RESTATEMENT_DAYS)
+    if end <= closed_before:
+        return settings.CE_CACHE_CLOSED_PERIOD_TTL
+    return settings.CE_CACHE_OPEN_PERIOD_TTL
+
+def get_cost_and_usage(ce, cache_scope=None, **params):
+    """``ce.get_cost_and_usage`` through a cache shared by views and scheduler tasks"""
+    if cache_scope is None:
+        return ce.get_cost_and_usage(**params)
+    
+    key = get_cost_request_fingerprint(cache_scope, params)
+    try:
+        cached = decode(cache.get(key, version=settings.CACHE_SCHEMA_VERSION))
+        if cached is not None:
+            return cached
+    except Exception as e:
+        print(f"⚠️ Cache get failed for Cost Explorer response: {e}")
+    
+    res = ce.get_cost_and_usage(**params)
+    res.pop("ResponseMetadata", None)
+    
+    try:
+        cache.set(key, encode(res), _cost_cache_ttl(params), version=settings.CACHE_SCHEMA_VERSION)
+    except Exception as e:
+        print(f"⚠️ Cache set failed for Cost Explorer response: {e}")
+    return res
+
+def fetch_monthly_cost(ce, cache_scope=None):
     """Get current month's total spend"""
     try:
         today = date.today()
         start = today.replace(day=1)
-        res = ce.get_cost_and_usage(
+        res = get_cost_and_usage(
+            ce, cache_scope,
             TimePeriod={
                 "Start": start.isoformat(),
                 "End": today.isoformat(),
@@ -42,12 +81,12 @@ def fetch_monthly_cost(ce):
         print(f"Cost Explorer Error: {e}")
         return 0.0
 
-def fetch_daily_costs(ce, days=90):
-    """Get daily costs for last N days"""
+def fetch_daily_costs(ce, days=90, start=None, cache_scope=None):
+    """Get daily costs for last N days (or from ``start`` up to yesterday)"""
     try:
         today = date.today()
-        start = today - timedelta(days=days)
-        res = ce.get_cost_and_usage(
+        start = start or today - timedelta(days=days)
+        params = dict(
             TimePeriod={
                 "Start": start.isoformat(),
                 "End": today.isoformat(),
@@ -56,24 +95,30 @@ def fetch_daily_costs(ce, days=90):
             Metrics=["UnblendedCost"],
         )
         daily_costs = []
-        for r in res["ResultsByTime"]:
-            daily_costs.append({
-                "date": r["TimePeriod"]["Start"],
-                "amount": float(r["Total"]["UnblendedCost"]["Amount"]),
-            })
+        while True:
+            res = get_cost_and_usage(ce, cache_scope, **params)
+            for r in res["ResultsByTime"]:
+                daily_costs.append({
+                    "date": r["TimePeriod"]["Start"],
+                    "amount": float(r["Total"]["UnblendedCost"]["Amount"]),
+                })
+            if not res.get("NextPageToken"):
+                break
+            params["NextPageToken"] = res["NextPageToken"]
         return daily_costs
     except ClientError as e:
         print(f"Daily Cost Error: {e}")
         return []
 
-def fetch_total_historical_cost(ce):
+def fetch_total_historical_cost(ce, cache_scope=None):
     """Get total historical spend (all time)"""
     try:
         today = date.today()
         # Get start date from when account was likely created (3 years back max)
         start = today - timedelta(days=365*3)
         
-        res = ce.get_cost_and_usage(
+        res = get_cost_and_usage(
+            ce, cache_scope,
             TimePeriod={
                 "Start": start.isoformat(),
                 "End": today.isoformat(),
@@ -93,10 +138,11 @@ def fetch_total_historical_cost(ce):
     
 
 
-def fetch_service_breakdown(ce, start_date, end_date):
+def fetch_service_breakdown(ce, start_date, end_date, cache_scope=None):
     """Get cost breakdown by AWS service"""
     try:
-        res = ce.get_cost_and_usage(
+        res = get_cost_and_usage(
+            ce, cache_scope,
             TimePeriod={
                 "Start": start_date.isoformat(),
                 "End": end_date.isoformat(),
@@ -134,4 +180,81 @@ def fetch_service_breakdown(ce, start_date, end_date):
         
     except ClientError as e:
         print(f"Service Breakdown Error: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def fetch_daily_costs_by_service(ce, start, end, cache_scope=None):
+    """Get {date: {service: amount}} from one DAILY query grouped by SERVICE"""
+    try:
+        params = dict(
+            TimePeriod={
+                "Start": start.isoformat(),
+                "End": end.isoformat(),
+            },
+            Granularity="DAILY",
+            Metrics=["UnblendedCost"],
+            GroupBy=[
+                {
+                    "Type": "DIMENSION",
+                    "Key": "SERVICE"
+                }
+            ]
+        )
+        costs = {}
+        while True:
+            res = get_cost_and_usage(ce, cache_scope, **params)
+            for r in res["ResultsByTime"]:
+                day = date.fromisoformat(r["TimePeriod"]["Start"])
+                services = costs.setdefault(day, {})
+                for group in r.get("Groups", []):
+                    service_name = group["Keys"][0]
+                    services[service_name] = services.get(service_name, 0.0) + float(group["Metrics"]["UnblendedCost"]["Amount"])
+            if not res.get("NextPageToken"):
+                break
+            params["NextPageToken"] = res["NextPageToken"]
+        return costs
+    except ClientError as e:
+        print(f"Daily Service Cost Error: {e}")
+        return {}
+
+def compose_cost_analytics(ce, today, days=90, cache_scope=None):
+    """Derive every dashboard figure from a single DAILY + SERVICE query.
+    
+    Returns the window total, current and previous month totals, a
+    {date: amount} daily index and the current month's service breakdown.
+    """
+    by_day = fetch_daily_costs_by_service(ce, today - timedelta(days=days), today, cache_scope)
+    
+    current_month_start = today.replace(day=1)
+    last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+    
+    daily_totals = {}
+    service_totals = {}
+    current_month_total = 0.0
+    last_month_total = 0.0
+    for day, services in by_day.items():
+        amount = sum(services.values())
+        daily_totals[day] = amount
+        if day >= current_month_start:
+            current_month_total += amount
+            for service_name, service_amount in services.items():
+                service_totals[service_name] = service_totals.get(service_name, 0.0) + service_amount
+        elif day >= last_month_start:
+            last_month_total += amount
+    
+    # Same shape as fetch_service_breakdown
+    service_breakdown = [
+        {"service": service_name, "amount": amount}
+        for service_name, amount in service_totals.items() if amount > 0
+    ]
+    total = sum(s["amount"] for s in service_breakdown)
+    for service in service_breakdown:
+        service["percentage"] = (service["amount"] / total * 100) if total > 0 else 0
+    service_breakdown.sort(key=lambda x: x["amount"], reverse=True)
+    
+    return {
+        "total": sum(daily_totals.values()),
+        "current_month_total": current_month_total,
+        "last_month_total": last_month_total,
+        "daily_totals": daily_totals,
+        "service_breakdown": service_breakdown,
+    }
@@ -0,0 +1,135 @@
+# cache_codec.py
+import pickle
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+
+# Compact encoding for large cache payloads (resource inventories, analytics,
+# Cost Explorer responses).
+#
+# Values are serialized with msgpack when it is installed (pickle otherwise)
+# and compressed with zstd, lz4 or zlib, whichever is available first. A
+# two-byte header records the serializer and compressor, so entries written
+# by a process with different optional packages still decode.
+#
+# msgpack has a single array type: tuples and sets are cached as lists and
+# come back as lists. Cached data is JSON-shaped (API responses, view
+# payloads), so callers must not rely on tuple or set values surviving a
+# round trip. Values msgpack cannot represent at all fall back to pickle
+# and keep their exact types.
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+MSGPACK = b'm'
+PICKLE = b'p'
+
+NONE = b'n'
+ZSTD = b'z'
+LZ4 = b'l'
+ZLIB = b'd'
+
+# msgpack extension types for values boto3 and the views put in cached data
+EXT_DECIMAL = 1
+EXT_DATETIME = 2
+EXT_DATE = 3
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(obj).encode())
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Cannot msgpack {type(obj).__name__}")
+
+
+def _msgpack_ext_hook(code, data):
+    if code == EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _serialize(value):
+    if msgpack is not None:
+        try:
+            return MSGPACK, msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError):
+            pass  # value holds a type msgpack cannot represent
+    return PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _deserialize(serializer, data):
+    if serializer == MSGPACK:
+        return msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+    return pickle.loads(data)
+
+
+def _compress(data):
+    if len(data) < settings.CACHE_COMPRESS_MIN_BYTES:
+        return NONE, data
+    if zstandard is not None:
+        return ZSTD, zstandard.ZstdCompressor(level=settings.CACHE_COMPRESSION_LEVEL).compress(data)
+    if lz4_frame is not None:
+        return LZ4, lz4_frame.compress(data)
+    return ZLIB, zlib.compress(data, min(settings.CACHE_COMPRESSION_LEVEL, 9))
+
+
+def _decompress(compressor, data):
+    if compressor == ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)
+    if compressor == LZ4:
+        return lz4_frame.decompress(data)
+    if compressor == ZLIB:
+        return zlib.decompress(data)
+    return data
+
+
+def encode_sized(value):
+    """(payload, serialized size before compression)"""
+    serializer, data = _serialize(value)
+    size = len(data)
+    compressor, data = _compress(data)
+    return serializer + compressor + data, size
+
+
+def decode_sized(payload):
+    """(value, serialized size before compression); size is 0 for non-encoded payloads"""
+    if not isinstance(payload, bytes) or len(payload) < 2:
+        return payload, 0
+    serializer, compressor = payload[:1], payload[1:2]
+    if serializer not in (MSGPACK, PICKLE) or compressor not in (NONE, ZSTD, LZ4, ZLIB):
+        return payload, 0
+    data = _decompress(compressor, payload[2:])
+    return _deserialize(serializer, data), len(data)
+
+
+def encode(value):
+    """Serialize and compress ``value`` into bytes for the cache"""
+    return encode_sized(value)[0]
+
+
+def decode(payload):
+    """Inverse of ``encode``; anything that is not an encoded payload is returned as is"""
+    return decode_sized(payload)[0]
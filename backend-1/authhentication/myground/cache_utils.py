@@ -1,96 +1,436 @@
 # cache_utils.py
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connection
+
+from .cache_codec import decode_sized, encode_sized
+
+
+class CacheDataset:
+    """A cached dataset: its key namespace and TTL (from CACHE_DATASET_TTLS)"""
+    
+    def __init__(self, name, prefix):
+        self.name = name
+        self.prefix = prefix
+    
+    @property
+    def ttl(self):
+        return settings.CACHE_DATASET_TTLS[self.name]
+
+
+class LocalLRU:
+    """Size-bounded in-process LRU used as L1 in front of the shared cache
+    
+    Entries are tagged with the write stamp of the shared entry they were
+    read from; a lookup with a different stamp is a miss. Values are shared
+    between requests and must be treated as read-only.
+    """
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, stamp):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key, stamp, value, size):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (stamp, value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+# Where one dataset of one account currently lives: its generation-scoped
+# key, the key of its write stamp and the stamp read along with the generations
+CacheSlot = namedtuple('CacheSlot', ['key', 'stamp_key', 'stamp'])
+
+
+# Every dataset ResourceCache stores, one key namespace each
+DATASETS = {
+    dataset.name: dataset for dataset in [
+        CacheDataset('resources', 'aws_resources'),
+        CacheDataset('resource_summary', 'aws_resource_summary'),
+        CacheDataset('cost_analytics', 'aws_cost_analytics'),
+        CacheDataset('low_level_services', 'aws_low_level_services'),
+        CacheDataset('low_level_services_quick', 'aws_low_level_services_quick'),
+        CacheDataset('low_level_services_config', 'aws_low_level_services_config'),
+        CacheDataset('regions', 'aws_enabled_regions'),
+    ]
+}
+
 
 class ResourceCache:
-    """Cache management for AWS resources using Django's cache framework"""
+    """Cache management for AWS resources using Django's cache framework
+    
+    Entries are stored with a soft TTL (the dataset TTL) and kept for
+    CACHE_STALE_GRACE_SECONDS longer, so ``get_or_compute`` can serve a
+    stale value while a single worker refreshes it.
+    
+    Payloads go through ``cache_codec`` (compact serialization plus
+    compression) and are stored under CACHE_SCHEMA_VERSION, so changing the
+    payload layout only requires bumping the version.
+    
+    Keys are namespaced per dataset (see DATASETS) and carry an account
+    generation and a dataset generation, so invalidating one dataset or
+    everything an account owns is a single counter increment.
+    
+    Decoded entries are kept in a per-process LocalLRU (L1). Every write
+    also stores a small stamp next to the payload; a read fetches the stamp
+    in the same get_many as the key generations and serves the L1 copy when
+    it matches, so an L1 hit costs one round trip and workers stay coherent
+    without transferring or decoding the payload again.
+    """
+    
+    _l1 = LocalLRU(settings.CACHE_L1_MAX_BYTES)
+    
+    # --------------------------------------------------
+    # Envelope helpers (soft/hard TTL)
+    # --------------------------------------------------
+    
+    @staticmethod
+    def _stamp_key(dataset, account_id):
+        # Not generation-scoped, so it is read together with the generations;
+        # L1 entries are keyed by the generation-scoped key
+        return f"{DATASETS[dataset].prefix}_{account_id}_stamp_v{settings.CACHE_SCHEMA_VERSION}"
+    
+    @staticmethod
+    def _set(slot, value, ttl):
+        fresh_until = time.time() + ttl
+        entry = {'value': ResourceCache._pack(value), 'fresh_until': fresh_until, 'swr': True}
+        payload, size = encode_sized(entry)
+        stamp = time.time_ns()
+        timeout = ttl + settings.CACHE_STALE_GRACE_SECONDS
+        # Payload before stamp: a reader that sees the new stamp also sees the new payload
+        cache.set(slot.key, payload, timeout, version=settings.CACHE_SCHEMA_VERSION)
+        cache.set(slot.stamp_key, stamp, timeout)
+        if settings.CACHE_L1_MAX_BYTES:
+            ResourceCache._l1.set(slot.key, stamp, (value, fresh_until), size)
+    
+    @staticmethod
+    def _read(slot):
+        """(value, is_fresh); entries written before envelopes existed count as fresh"""
+        if settings.CACHE_L1_MAX_BYTES and slot.stamp is not None:
+            local = ResourceCache._l1.get(slot.key, slot.stamp)
+            if local is not None:
+                value, fresh_until = local
+                return value, time.time() < fresh_until
+        
+        entry, size = decode_sized(cache.get(slot.key, version=settings.CACHE_SCHEMA_VERSION))
+        if isinstance(entry, dict) and entry.get('swr'):
+            value = ResourceCache._unpack(entry['value'])
+            if settings.CACHE_L1_MAX_BYTES and slot.stamp is not None:
+                ResourceCache._l1.set(slot.key, slot.stamp, (value, entry['fresh_until']), size)
+            return value, time.time() < entry['fresh_until']
+        return entry, True
+    
+    @staticmethod
+    def _get(slot):
+        return ResourceCache._read(slot)[0]
+    
+    # --------------------------------------------------
+    # Paid resources deduplication
+    # --------------------------------------------------
+    
+    @staticmethod
+    def _pack(value):
+        """Store ``raw_resources`` lists that mirror a cost category as a reference to it"""
+        if not (isinstance(value, dict) and value.get('raw_resources') and 'cost_categories' in value):
+            return value
+        
+        categories_by_resources = {}
+        for category_key, category in value['cost_categories'].items():
+            resources = category.get('resources') or []
+            if resources:
+                categories_by_resources[tuple(map(id, resources))] = category_key
+        
+        raw_resources = {}
+        raw_resource_refs = {}
+        for raw_key, resources in value['raw_resources'].items():
+            category_key = categories_by_resources.get(tuple(map(id, resources)))
+            if category_key is not None:
+                raw_resource_refs[raw_key] = category_key
+            else:
+                raw_resources[raw_key] = resources
+        
+        packed = dict(value)
+        packed['raw_resources'] = raw_resources
+        packed['raw_resource_refs'] = raw_resource_refs
+        return packed
+    
+    @staticmethod
+    def _unpack(value):
+        if not (isinstance(value, dict) and 'raw_resource_refs' in value):
+            return value
+        unpacked = dict(value)
+        raw_resource_refs = unpacked.pop('raw_resource_refs')
+        raw_resources = dict(unpacked.get('raw_resources') or {})
+        for raw_key, category_key in raw_resource_refs.items():
+            raw_resources[raw_key] = list(unpacked['cost_categories'][category_key]['resources'])
+        unpacked['raw_resources'] = raw_resources
+        return unpacked
+    
+    # --------------------------------------------------
+    # Single-flight get-or-compute
+    # --------------------------------------------------
+    
+    @staticmethod
+    def _acquire_compute_lock(cache_key):
+        try:
+            # A cache backend that swallows errors returns None; treat that as acquired
+            return cache.add(f"{cache_key}_lock", 1, settings.CACHE_COMPUTE_LOCK_TIMEOUT) is not False
+        except Exception:
+            return True
+    
+    @staticmethod
+    def _release_compute_lock(cache_key):
+        try:
+            cache.delete(f"{cache_key}_lock")
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _compute_and_store(slot, compute, ttl):
+        try:
+            value = compute()
+            if value is not None:
+                try:
+                    ResourceCache._set(slot, value, ttl)
+                except Exception as e:
+                    print(f"⚠️ Cache set failed for {slot.key}: {e}")
+            return value
+        finally:
+            ResourceCache._release_compute_lock(slot.key)
+    
+    @staticmethod
+    def _refresh_in_background(slot, compute, ttl):
+        def refresh():
+            try:
+                ResourceCache._compute_and_store(slot, compute, ttl)
+            except Exception as e:
+                print(f"⚠️ Background refresh failed for {slot.key}: {e}")
+            finally:
+                connection.close()
+        
+        threading.Thread(target=refresh, daemon=True).start()
+    
+    @staticmethod
+    def _wait_for_value(slot):
+        """Wait for another worker's in-flight computation of ``slot``"""
+        deadline = time.monotonic() + settings.CACHE_COMPUTE_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(0.25)
+            try:
+                value, _ = ResourceCache._read(slot._replace(stamp=cache.get(slot.stamp_key)))
+                if value is not None:
+                    return value
+                if cache.get(f"{slot.key}_lock") is None:
+                    return None  # the computing worker gave up
+            except Exception:
+                return None
+        return None
+    
+    @staticmethod
+    def _get_or_compute(slot, compute, ttl):
+        """Return the cached value for ``slot`` or compute it exactly once.
+        
+        - fresh hit: returned as is
+        - stale hit: returned immediately; one worker refreshes it in the background
+        - miss: one worker computes, concurrent callers wait for its result
+        ``compute`` returning None is not cached.
+        """
+        try:
+            value, is_fresh = ResourceCache._read(slot)
+        except Exception as e:
+            print(f"⚠️ Cache get failed for {slot.key}: {e}")
+            return compute()
+        
+        if value is not None:
+            if not is_fresh and ResourceCache._acquire_compute_lock(slot.key):
+                print(f"♻️ Serving stale {slot.key} while refreshing")
+                ResourceCache._refresh_in_background(slot, compute, ttl)
+            return value
+        
+        if ResourceCache._acquire_compute_lock(slot.key):
+            return ResourceCache._compute_and_store(slot, compute, ttl)
+        
+        value = ResourceCache._wait_for_value(slot)
+        if value is not None:
+            return value
+        
+        # The other worker failed without storing a value: take over
+        if ResourceCache._acquire_compute_lock(slot.key):
+            return ResourceCache._compute_and_store(slot, compute, ttl)
+        
+        print(f"⚠️ Timed out waiting for in-flight computation of {slot.key}")
+        return None
+    
+    @staticmethod
+    def get_or_compute(dataset, account_id, compute):
+        """``compute()`` cached in ``dataset`` for the account (single-flight, stale-while-revalidate)"""
+        try:
+            slot = ResourceCache._locate(dataset, account_id)
+        except Exception as e:
+            print(f"⚠️ Cache get failed for {dataset}: {e}")
+            return compute()
+        return ResourceCache._get_or_compute(slot, compute, DATASETS[dataset].ttl)
+    
+    @staticmethod
+    def get_or_compute_resources(account_id, compute):
+        return ResourceCache.get_or_compute('resources', account_id, compute)
+    
+    @staticmethod
+    def get_or_compute_resource_summary(account_id, compute):
+        return ResourceCache.get_or_compute('resource_summary', account_id, compute)
+    
+    @staticmethod
+    def get_or_compute_cost_analytics(account_id, compute):
+        return ResourceCache.get_or_compute('cost_analytics', account_id, compute)
+    
+    # --------------------------------------------------
+    # Keys and generations
+    # --------------------------------------------------
+    
+    @staticmethod
+    def _generation_key(account_id, dataset=None):
+        if dataset is None:
+            return f"cache_generation_{account_id}"
+        return f"cache_generation_{account_id}_{dataset}"
+    
+    @staticmethod
+    def _locate(dataset, account_id):
+        """CacheSlot of the account's ``dataset``: generations and write stamp in one get_many"""
+        keys = [ResourceCache._generation_key(account_id), ResourceCache._generation_key(account_id, dataset)]
+        stamp_key = ResourceCache._stamp_key(dataset, account_id)
+        found = cache.get_many(keys + [stamp_key])
+        for key in keys:
+            if found.get(key) is None:
+                # Seeded from the clock so an evicted counter never reuses an old generation
+                cache.add(key, time.time_ns(), None)
+                found[key] = cache.get(key, time.time_ns())
+        cache_key = f"{DATASETS[dataset].prefix}_{account_id}_g{found[keys[0]]}.{found[keys[1]]}"
+        return CacheSlot(cache_key, stamp_key, found.get(stamp_key))
+    
+    @staticmethod
+    def _bump_generation(key):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+    
+    @staticmethod
+    def get_cache_key(dataset, account_id):
+        """Current key of ``dataset`` for the account; changes whenever it is invalidated"""
+        return ResourceCache._locate(dataset, account_id).key
     
     @staticmethod
     def get_resources_cache_key(account_id):
-        return f"aws_resources_{account_id}"
+        return ResourceCache.get_cache_key('resources', account_id)
     
     @staticmethod
     def get_resource_summary_cache_key(account_id):
-        return f"aws_resource_summary_{account_id}"
+        return ResourceCache.get_cache_key('resource_summary', account_id)
     
     @staticmethod
     def get_cost_analytics_cache_key(account_id):
-        return f"aws_cost_analytics_{account_id}"
+        return ResourceCache.get_cache_key('cost_analytics', account_id)
+    
+    # --------------------------------------------------
+    # Read / write
+    # --------------------------------------------------
     
     @staticmethod
-    def cache_resources(account_id, resources_data):
-        """Cache AWS resources data"""
+    def cache_dataset(dataset, account_id, data):
+        """Cache ``data`` as the account's ``dataset``"""
         try:
-            cache_key = ResourceCache.get_resources_cache_key(account_id)
-            cache.set(cache_key, resources_data, settings.RESOURCE_CACHE_TTL)
+            ResourceCache._set(ResourceCache._locate(dataset, account_id), data, DATASETS[dataset].ttl)
             return True
         except Exception as e:
-            print(f"⚠️ Cache set failed for resources: {e}")
+            print(f"⚠️ Cache set failed for {dataset}: {e}")
             return False
     
     @staticmethod
-    def get_cached_resources(account_id):
-        """Get cached AWS resources"""
+    def get_cached_dataset(dataset, account_id):
+        """Cached ``dataset`` of the account, or None"""
         try:
-            cache_key = ResourceCache.get_resources_cache_key(account_id)
-            return cache.get(cache_key)
+            return ResourceCache._get(ResourceCache._locate(dataset, account_id))
         except Exception as e:
-            print(f"⚠️ Cache get failed for resources: {e}")
+            print(f"⚠️ Cache get failed for {dataset}: {e}")
             return None
     
+    @staticmethod
+    def cache_resources(account_id, resources_data):
+        """Cache AWS resources data"""
+        return ResourceCache.cache_dataset('resources', account_id, resources_data)
+    
+    @staticmethod
+    def get_cached_resources(account_id):
+        """Get cached AWS resources"""
+        return ResourceCache.get_cached_dataset('resources', account_id)
+    
     @staticmethod
     def cache_resource_summary(account_id, summary_data):
         """Cache resource summary data"""
-        try:
-            cache_key = ResourceCache.get_resource_summary_cache_key(account_id)
-            cache.set(cache_key, summary_data, settings.RESOURCE_CACHE_TTL)
-            return True
-        except Exception as e:
-            print(f"⚠️ Cache set failed for summary: {e}")
-            return False
+        return ResourceCache.cache_dataset('resource_summary', account_id, summary_data)
     
     @staticmethod
     def get_cached_resource_summary(account_id):
         """Get cached resource summary"""
-        try:
-            cache_key = ResourceCache.get_resource_summary_cache_key(account_id)
-            return cache.get(cache_key)
-        except Exception as e:
-            print(f"⚠️ Cache get failed for summary: {e}")
-            return None
+        return ResourceCache.get_cached_dataset('resource_summary', account_id)
     
     @staticmethod
     def cache_cost_analytics(account_id, analytics_data):
         """Cache cost analytics data"""
-        try:
-            cache_key = ResourceCache.get_cost_analytics_cache_key(account_id)
-            cache.set(cache_key, analytics_data, settings.COST_CACHE_TTL)
-            return True
-        except Exception as e:
-            print(f"⚠️ Cache set failed for analytics: {e}")
-            return False
+        return ResourceCache.cache_dataset('cost_analytics', account_id, analytics_data)
     
     @staticmethod
     def get_cached_cost_analytics(account_id):
         """Get cached cost analytics"""
+        return ResourceCache.get_cached_dataset('cost_analytics', account_id)
+    
+    # --------------------------------------------------
+    # Invalidation
+    # --------------------------------------------------
+    
+    @staticmethod
+    def invalidate(account_id, *datasets):
+        """Invalidate only the given datasets of an account"""
         try:
-            cache_key = ResourceCache.get_cost_analytics_cache_key(account_id)
-            return cache.get(cache_key)
+            for dataset in datasets:
+                ResourceCache._bump_generation(ResourceCache._generation_key(account_id, DATASETS[dataset].name))
+            return True
         except Exception as e:
-            print(f"⚠️ Cache get failed for analytics: {e}")
-            return None
+            print(f"⚠️ Cache invalidation failed for {', '.join(datasets)}: {e}")
+            return False
     
     @staticmethod
     def invalidate_account_cache(account_id):
-        """Invalidate all cache for an account"""
+        """Invalidate all cache for an account (old entries expire on their own)"""
         try:
-            keys = [
-                ResourceCache.get_resources_cache_key(account_id),
-                ResourceCache.get_resource_summary_cache_key(account_id),
-                ResourceCache.get_cost_analytics_cache_key(account_id),
-            ]
-            cache.delete_many(keys)
+            ResourceCache._bump_generation(ResourceCache._generation_key(account_id))
             return True
         except Exception as e:
             print(f"⚠️ Cache delete failed: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,132 @@
+# client_pool.py
+import threading
+from datetime import datetime, timezone
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+
+from .api_rate_limiter import install_rate_limiter
+
+
+class AWSClientPool:
+    """Thread-safe pool of boto3 clients shared by discovery, trackers and views.
+
+    Clients are keyed by (account, service, region, credential expiry). The
+    account is identified by the STS access key, so every assumed-role session
+    gets its own clients, and a rotated session never reuses stale ones.
+    All clients are built from one boto3 session so botocore service models
+    are loaded once per process instead of once per client.
+    """
+
+    PLATFORM_ACCOUNT = 'platform'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session = None
+        self._clients = {}
+
+    @staticmethod
+    def _account_key(creds):
+        if not creds:
+            return AWSClientPool.PLATFORM_ACCOUNT
+        return creds['AccessKeyId']
+
+    @staticmethod
+    def _rate_limit_account(creds):
+        """AWS account ID the API rate limits apply to (set by the credential broker)"""
+        if not creds:
+            return AWSClientPool.PLATFORM_ACCOUNT
+        return creds.get('AccountId') or creds['AccessKeyId']
+
+    @staticmethod
+    def _expiry(creds):
+        if not creds:
+            return None
+        return creds.get('Expiration')
+
+    @staticmethod
+    def _is_expired(expiry, now):
+        if expiry is None:
+            return False
+        if isinstance(expiry, str):
+            expiry = datetime.fromisoformat(expiry.replace('Z', '+00:00'))
+        if expiry.tzinfo is None:
+            expiry = expiry.replace(tzinfo=timezone.utc)
+        return expiry <= now
+
+    def _client_config(self):
+        return Config(
+            max_pool_connections=settings.AWS_CLIENT_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.AWS_CLIENT_CONNECT_TIMEOUT,
+            read_timeout=settings.AWS_CLIENT_READ_TIMEOUT,
+            retries={
+                'mode': settings.AWS_CLIENT_RETRY_MODE,
+                'max_attempts': settings.AWS_CLIENT_MAX_ATTEMPTS,
+            },
+        )
+
+    def _prune_expired(self):
+        """Drop clients whose STS credentials have expired (caller holds the lock)"""
+        now = datetime.now(timezone.utc)
+        expired = [key for key in self._clients if self._is_expired(key[3], now)]
+        for key in expired:
+            del self._clients[key]
+
+    def get_client(self, service_name, creds=None, region=None):
+        """Return a shared client for the given credentials, service and region.
+
+        When ``creds`` is None the platform credentials from the environment
+        are used (e.g. the STS client that performs AssumeRole).
+        """
+        key = (self._account_key(creds), service_name, region, self._expiry(creds))
+
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+
+            self._prune_expired()
+
+            if self._session is None:
+                self._session = boto3.session.Session()
+
+            kwargs = {'region_name': region, 'config': self._client_config()}
+            if creds:
+                kwargs.update(
+                    aws_access_key_id=creds['AccessKeyId'],
+                    aws_secret_access_key=creds['SecretAccessKey'],
+                    aws_session_token=creds['SessionToken'],
+                )
+
+            # Client creation is not thread-safe on a shared session, so it
+            # happens under the lock; the finished clients are thread-safe.
+            client = self._session.client(service_name, **kwargs)
+            install_rate_limiter(client, self._rate_limit_account(creds), region)
+            self._clients[key] = client
+            return client
+
+    def evict(self, creds):
+        """Drop every client built from the given credentials (e.g. after rotation)"""
+        account_key = self._account_key(creds)
+        with self._lock:
+            stale = [key for key in self._clients if key[0] == account_key]
+            for key in stale:
+                del self._clients[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+
+client_pool = AWSClientPool()
+
+
+def get_client(service_name, creds=None, region=None):
+    """Shortcut for ``client_pool.get_client``"""
+    return client_pool.get_client(service_name, creds, region)
@@ -0,0 +1,134 @@
+# cost_queries.py
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import DailySpend
+
+# DailySpend aggregation done in the database, so dashboard and summary
+# queries stay constant-time as the daily history grows.
+
+ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=15, decimal_places=9))
+
+
+def month_bounds(today):
+    """(current month start, previous month start)"""
+    current_month_start = today.replace(day=1)
+    last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+    return current_month_start, last_month_start
+
+
+def get_cost_totals(account, today):
+    """Total, current month, previous month and yesterday's spend in a single query"""
+    current_month_start, last_month_start = month_bounds(today)
+    current_month = Q(date__gte=current_month_start)
+    previous_month = Q(date__gte=last_month_start, date__lt=current_month_start)
+    yesterday = Q(date=today - timedelta(days=1))
+
+    return DailySpend.objects.filter(account=account).aggregate(
+        total=Coalesce(Sum('amount'), ZERO),
+        current_month=Coalesce(Sum('amount', filter=current_month), ZERO),
+        current_month_days=Count('id', filter=current_month),
+        previous_month=Coalesce(Sum('amount', filter=previous_month), ZERO),
+        previous_month_days=Count('id', filter=previous_month),
+        yesterday=Coalesce(Sum('amount', filter=yesterday), ZERO),
+    )
+
+
+def monthly_change_percent(current_total, previous_total):
+    """Month-over-month change in percent, or None without a previous month"""
+    if not previous_total:
+        return None
+    return ((Decimal(current_total) - Decimal(previous_total)) / Decimal(previous_total)) * 100
+
+
+def get_daily_amounts(account, start_date, end_date):
+    """{date: amount} for the inclusive range in a single query"""
+    return dict(
+        DailySpend.objects.filter(
+            account=account,
+            date__gte=start_date,
+            date__lte=end_date
+        ).values_list('date', 'amount')
+    )
+
+
+def get_last_days(account, today, days=7):
+    """Zero-filled daily series ending today (oldest first)"""
+    start_date = today - timedelta(days=days - 1)
+    amounts = get_daily_amounts(account, start_date, today)
+
+    series = []
+    for i in range(days):
+        target_date = start_date + timedelta(days=i)
+        series.append({
+            'date': target_date.strftime('%a'),
+            'amount': amounts.get(target_date, Decimal('0')),
+            'full_date': target_date.strftime('%Y-%m-%d'),
+            'day_name': target_date.strftime('%A')
+        })
+    return series
+
+
+class DailySpendWindow:
+    """DailySpend of the previous and current month (and at least the last 31 days), loaded once.
+
+    The derived cost jobs (monthly summary, forecast, recent spend) run right
+    after a cost sync and share one instance instead of each querying
+    DailySpend again.
+    """
+
+    def __init__(self, account, today):
+        self.account = account
+        self.today = today
+        self.current_month_start, self.last_month_start = month_bounds(today)
+        self.start_date = min(self.last_month_start, today - timedelta(days=30))
+        self.amounts = get_daily_amounts(account, self.start_date, today)
+
+    def totals(self):
+        """Same keys as ``get_cost_totals`` except the all-time ``total``"""
+        current = [amount for day, amount in self.amounts.items() if day >= self.current_month_start]
+        previous = [
+            amount for day, amount in self.amounts.items()
+            if self.last_month_start <= day < self.current_month_start
+        ]
+        return {
+            'current_month': sum(current, Decimal('0')),
+            'current_month_days': len(current),
+            'previous_month': sum(previous, Decimal('0')),
+            'previous_month_days': len(previous),
+            'yesterday': self.amounts.get(self.today - timedelta(days=1), Decimal('0')),
+        }
+
+    def last_days(self, days=7):
+        """Like ``get_last_days`` (``days`` must fit in the window)"""
+        start_date = self.today - timedelta(days=days - 1)
+        series = []
+        for i in range(days):
+            target_date = start_date + timedelta(days=i)
+            series.append({
+                'date': target_date.strftime('%a'),
+                'amount': self.amounts.get(target_date, Decimal('0')),
+                'full_date': target_date.strftime('%Y-%m-%d'),
+                'day_name': target_date.strftime('%A')
+            })
+        return series
+
+    def moving_averages(self, start_date, window=7):
+        """Daily rows since ``start_date`` with a trailing ``window``-day average of amount
+        
+        Only days with a DailySpend row are included (no zero-fill);
+        ``start_date`` must be inside the window.
+        """
+        rows = sorted((day, amount) for day, amount in self.amounts.items() if day >= start_date)
+        series = []
+        for i, (day, amount) in enumerate(rows):
+            frame = [a for _, a in rows[max(0, i - window + 1):i + 1]]
+            series.append({
+                'date': day,
+                'amount': amount,
+                'moving_average': sum(frame, Decimal('0')) / len(frame),
+            })
+        return series
@@ -0,0 +1,211 @@
+# credential_broker.py
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .client_pool import client_pool
+from .locks import Lease
+
+
+class CredentialBroker:
+    """Shared cache of STS assumed-role credentials.
+
+    Credentials are cached per (role ARN, external ID) in process and in the
+    Django (Redis) cache so scheduler jobs, views and other workers reuse the
+    same session for its whole lifetime. Concurrent callers for the same
+    account share a single in-flight AssumeRole, and credentials that are close
+    to expiry are refreshed in the background while the current ones are still
+    handed out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._credentials = {}
+        self._key_locks = {}
+        self._refreshing = set()
+
+    # --------------------------------------------------
+    # Keys and expiry helpers
+    # --------------------------------------------------
+
+    @staticmethod
+    def get_cache_key(role_arn, external_id):
+        digest = hashlib.sha1(f"{role_arn}|{external_id}".encode()).hexdigest()
+        return f"sts_credentials_{digest}"
+
+    @staticmethod
+    def account_id_from_role_arn(role_arn):
+        """'123456789012' for arn:aws:iam::123456789012:role/Name, None if it is not an ARN"""
+        parts = (role_arn or '').split(':')
+        return parts[4] if len(parts) > 5 and parts[4] else None
+
+    @staticmethod
+    def seconds_remaining(creds):
+        expiration = creds.get('Expiration')
+        if expiration is None:
+            return 0
+        if isinstance(expiration, str):
+            expiration = datetime.fromisoformat(expiration.replace('Z', '+00:00'))
+        if expiration.tzinfo is None:
+            expiration = expiration.replace(tzinfo=timezone.utc)
+        return (expiration - datetime.now(timezone.utc)).total_seconds()
+
+    def _is_usable(self, creds):
+        return bool(creds) and self.seconds_remaining(creds) > settings.STS_MIN_REMAINING_SECONDS
+
+    def _needs_refresh(self, creds):
+        return self.seconds_remaining(creds) <= settings.STS_REFRESH_WINDOW_SECONDS
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._key_locks[key] = lock
+            return lock
+
+    # --------------------------------------------------
+    # Storage
+    # --------------------------------------------------
+
+    def _store(self, key, creds):
+        previous = self._credentials.get(key)
+        self._credentials[key] = creds
+
+        # Clients built from the rotated session are no longer needed
+        if previous and previous.get('AccessKeyId') != creds.get('AccessKeyId'):
+            client_pool.evict(previous)
+
+        try:
+            timeout = int(self.seconds_remaining(creds) - settings.STS_MIN_REMAINING_SECONDS)
+            if timeout > 0:
+                cache.set(key, creds, timeout)
+        except Exception as e:
+            print(f"⚠️ Cache set failed for STS credentials: {e}")
+
+    def _load_shared(self, key):
+        try:
+            return cache.get(key)
+        except Exception as e:
+            print(f"⚠️ Cache get failed for STS credentials: {e}")
+            return None
+
+    # --------------------------------------------------
+    # AssumeRole
+    # --------------------------------------------------
+
+    def _assume_role(self, role_arn, external_id, session_name):
+        sts = client_pool.get_client('sts')
+        creds = sts.assume_role(
+            RoleArn=role_arn,
+            RoleSessionName=session_name,
+            ExternalId=str(external_id),
+            DurationSeconds=settings.STS_SESSION_DURATION_SECONDS,
+        )["Credentials"]
+        # Pooled clients pace their API calls per account, not per session
+        creds['AccountId'] = self.account_id_from_role_arn(role_arn)
+        return creds
+
+    def _wait_for_shared(self, key):
+        """Wait for another process's in-flight AssumeRole to publish credentials"""
+        deadline = time.monotonic() + settings.STS_ASSUME_LOCK_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            creds = self._load_shared(key)
+            if self._is_usable(creds) and not self._needs_refresh(creds):
+                return creds
+            time.sleep(0.2)
+        return None
+
+    def _fetch(self, key, role_arn, external_id, session_name):
+        """Single-flight fetch: shared cache first, then one AssumeRole per key.
+
+        Also used for refreshes: credentials that another thread or worker
+        already refreshed are picked up from the caches instead of assuming
+        the role again.
+        """
+        with self._get_key_lock(key):
+            creds = self._credentials.get(key)
+            if self._is_usable(creds) and not self._needs_refresh(creds):
+                return creds
+
+            creds = self._load_shared(key)
+            if self._is_usable(creds) and not self._needs_refresh(creds):
+                self._credentials[key] = creds
+                return creds
+
+            # Cross-process lock so only one worker calls STS per account; owned
+            # by a token, so a waiter that timed out never releases another's lock
+            lease = Lease(f"{key}_assume", settings.STS_ASSUME_LOCK_TIMEOUT_SECONDS)
+            if not lease.acquire():
+                creds = self._wait_for_shared(key)
+                if creds:
+                    self._credentials[key] = creds
+                    return creds
+
+            try:
+                creds = self._assume_role(role_arn, external_id, session_name)
+                self._store(key, creds)
+                return creds
+            finally:
+                lease.release()
+
+    def _refresh_in_background(self, key, role_arn, external_id, session_name):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(key, role_arn, external_id, session_name)
+            except Exception as e:
+                print(f"⚠️ Background STS refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+
+    def get_credentials(self, role_arn, external_id, session_name="CloudCostSession"):
+        """Return cached assumed-role credentials, assuming the role only when needed"""
+        external_id = str(external_id)
+        key = self.get_cache_key(role_arn, external_id)
+
+        creds = self._credentials.get(key)
+        if not self._is_usable(creds):
+            creds = self._load_shared(key)
+            if self._is_usable(creds):
+                self._credentials[key] = creds
+
+        if self._is_usable(creds):
+            if self._needs_refresh(creds):
+                self._refresh_in_background(key, role_arn, external_id, session_name)
+            return creds
+
+        return self._fetch(key, role_arn, external_id, session_name)
+
+    def get_account_credentials(self, account, session_name="CloudCostSession"):
+        """Credentials for an AWSAccountConnection"""
+        return self.get_credentials(account.role_arn, str(account.external_id), session_name)
+
+    def invalidate(self, role_arn, external_id):
+        """Forget cached credentials (e.g. after the role or trust policy changed)"""
+        key = self.get_cache_key(role_arn, str(external_id))
+        creds = self._credentials.pop(key, None)
+        if creds:
+            client_pool.evict(creds)
+        try:
+            cache.delete(key)
+        except Exception as e:
+            print(f"⚠️ Cache delete failed for STS credentials: {e}")
+
+
+credential_broker = CredentialBroker()
@@ -0,0 +1,45 @@
+# fanout.py
+import threading
+import time
+
+from django.conf import settings
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every job that calls the same AWS service"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_service_bucket(service):
+    """Process-wide rate budget for an AWS service (None when the service is not limited)"""
+    rate = settings.SCHEDULER_SERVICE_RATE_LIMITS.get(service) if service else None
+    if not rate:
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(service)
+        if bucket is None:
+            bucket = _buckets[service] = TokenBucket(rate)
+        return bucket
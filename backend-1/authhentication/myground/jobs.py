@@ -0,0 +1,170 @@
+# jobs.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job, JobRun
+
+# Durable job queue stored in the database.
+#
+# Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+# worker processes can pull from the same queue. A claimed job carries a
+# lease that the worker renews while it runs; a job whose lease expires
+# (crashed worker) is claimed again, counting as an attempt, and fails once
+# it is out of attempts. Only one queued/running job may exist
+# per dedupe key, so the same account job is never queued twice. Jobs queued
+# together by one scheduled fan-out share a JobRun, which records the
+# per-account results once its last job has finished.
+
+
+def get_dedupe_key(name, account_id=None):
+    return f"{name}:{account_id or 'global'}"
+
+
+def enqueue(name, account=None, run_at=None, max_attempts=None, run=None):
+    """Queue a job; returns None when an identical job is already queued or running"""
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=name,
+                account=account,
+                run=run,
+                dedupe_key=get_dedupe_key(name, account.id if account else None),
+                run_at=run_at or timezone.now(),
+                max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            )
+    except IntegrityError:
+        return None
+
+
+def claim_job(worker_id, names=None):
+    """Lease the next due job to ``worker_id`` (None when the queue is empty)"""
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = Job.objects.select_for_update(skip_locked=True).filter(
+                Q(status=Job.STATUS_QUEUED, run_at__lte=now)
+                | Q(status=Job.STATUS_RUNNING, lease_expires_at__lt=now)
+            )
+            if names:
+                jobs = jobs.filter(name__in=names)
+            job = jobs.order_by('run_at').first()
+            if job is None:
+                return None
+
+            # A job whose every attempt lost its worker (OOM kill, crash) is not run again
+            if job.status == Job.STATUS_RUNNING and job.attempts >= job.max_attempts:
+                fail_job(job, f"Lease of worker {job.worker_id} expired", retry=False)
+                continue
+
+            job.status = Job.STATUS_RUNNING
+            job.attempts += 1
+            job.worker_id = worker_id
+            job.lease_expires_at = now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+            job.started_at = now
+            job.save(update_fields=['status', 'attempts', 'worker_id', 'lease_expires_at', 'started_at'])
+            return job
+
+
+def renew_leases(worker_id, job_ids):
+    """Extend the leases of jobs ``worker_id`` is still running"""
+    if not job_ids:
+        return 0
+    return Job.objects.filter(
+        id__in=job_ids,
+        worker_id=worker_id,
+        status=Job.STATUS_RUNNING
+    ).update(lease_expires_at=timezone.now() + timedelta(seconds=settings.JOB_LEASE_SECONDS))
+
+
+def complete_job(job):
+    Job.objects.filter(id=job.id, worker_id=job.worker_id).update(
+        status=Job.STATUS_DONE,
+        lease_expires_at=None,
+        finished_at=timezone.now()
+    )
+    finish_run_if_done(job)
+
+
+def postpone_job(job, delay):
+    """Put a claimed job back in the queue for ``delay`` seconds without using up an attempt"""
+    Job.objects.filter(id=job.id, worker_id=job.worker_id, status=Job.STATUS_RUNNING).update(
+        status=Job.STATUS_QUEUED,
+        attempts=F('attempts') - 1,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        lease_expires_at=None
+    )
+
+
+def fail_job(job, error, retry=True):
+    """Requeue with exponential backoff, or mark failed after ``max_attempts``"""
+    now = timezone.now()
+    if retry and job.attempts < job.max_attempts:
+        delay = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        Job.objects.filter(id=job.id, worker_id=job.worker_id).update(
+            status=Job.STATUS_QUEUED,
+            run_at=now + timedelta(seconds=delay),
+            lease_expires_at=None,
+            last_error=str(error)
+        )
+        print(f"🔁 Job {job.dedupe_key} failed (attempt {job.attempts}/{job.max_attempts}), retrying in {delay}s: {error}")
+    else:
+        Job.objects.filter(id=job.id, worker_id=job.worker_id).update(
+            status=Job.STATUS_FAILED,
+            lease_expires_at=None,
+            finished_at=now,
+            last_error=str(error)
+        )
+        print(f"❌ Job {job.dedupe_key} failed after {job.attempts} attempts: {error}")
+        finish_run_if_done(job)
+
+
+def finish_run_if_done(job):
+    """Summarize the job's JobRun once none of its jobs is queued or running"""
+    if job.run_id is None:
+        return
+    if Job.objects.filter(run_id=job.run_id, status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING]).exists():
+        return
+
+    # Only the worker that finishes the run first writes the summary
+    now = timezone.now()
+    if not JobRun.objects.filter(id=job.run_id, finished_at__isnull=True).update(finished_at=now):
+        return
+
+    run = JobRun.objects.get(id=job.run_id)
+    results = []
+    counts = {}
+    for run_job in run.jobs.select_related('account'):
+        duration = None
+        if run_job.started_at and run_job.finished_at:
+            duration = round((run_job.finished_at - run_job.started_at).total_seconds(), 2)
+        results.append({
+            'account_id': run_job.account_id,
+            'aws_account_id': run_job.account.aws_account_id if run_job.account else None,
+            'status': run_job.status,
+            'attempts': run_job.attempts,
+            'error': run_job.last_error if run_job.status == Job.STATUS_FAILED else None,
+            'duration': duration,
+        })
+        counts[run_job.status] = counts.get(run_job.status, 0) + 1
+
+    run.summary = {'counts': counts, 'results': results}
+    run.save(update_fields=['summary'])
+    print(
+        f"✅ {run.name} run finished in {(now - run.created_at).total_seconds():.1f}s: "
+        + ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    )
+
+
+def purge_finished_jobs(days=None):
+    """Delete done/failed jobs older than JOB_RETENTION_DAYS"""
+    cutoff = timezone.now() - timedelta(days=days or settings.JOB_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.STATUS_DONE, Job.STATUS_FAILED],
+        finished_at__lt=cutoff
+    ).delete()
+    JobRun.objects.filter(finished_at__lt=cutoff).delete()
+    return deleted
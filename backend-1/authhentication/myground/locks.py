@@ -0,0 +1,140 @@
+# locks.py
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
+# Cluster-wide leases and leader election on the shared Redis cache.
+#
+# A Lease is an expiring key owned by a random token: only the owner can
+# renew or release it, and a crashed owner's lease simply expires. Without
+# django-redis (local memory cache) leases fall back to the cache API, which
+# is only safe within a single process.
+
+# Compare-and-act scripts so a lease that expired and was taken over is
+# never extended or deleted by its previous owner.
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _redis():
+    if get_redis_connection is None or 'RedisCache' not in settings.CACHES['default']['BACKEND']:
+        return None
+    return get_redis_connection('default')
+
+
+class Lease:
+    """Expiring cluster-wide lock on ``name``"""
+
+    def __init__(self, name, ttl):
+        self.key = cache.make_key(f"lease:{name}")
+        self.ttl = max(1, int(ttl))
+        self.token = uuid.uuid4().hex
+        self.held = False
+
+    def acquire(self):
+        try:
+            redis = _redis()
+            if redis is not None:
+                self.held = bool(redis.set(self.key, self.token, nx=True, ex=self.ttl))
+            else:
+                self.held = cache.add(self.key, self.token, self.ttl)
+        except Exception as e:
+            # Same policy as the other cache locks: fail open rather than stop all work
+            print(f"⚠️ Lease backend unavailable for {self.key}, proceeding without it: {e}")
+            self.held = True
+        return self.held
+
+    def renew(self):
+        """Extend the lease; False when it expired and is now owned by someone else"""
+        if not self.held:
+            return False
+        try:
+            redis = _redis()
+            if redis is not None:
+                self.held = bool(redis.eval(RENEW_SCRIPT, 1, self.key, self.token, self.ttl * 1000))
+            elif cache.get(self.key) == self.token:
+                cache.touch(self.key, self.ttl)
+            else:
+                self.held = False
+        except Exception as e:
+            print(f"⚠️ Failed to renew lease {self.key}: {e}")
+        return self.held
+
+    def release(self):
+        if not self.held:
+            return
+        self.held = False
+        try:
+            redis = _redis()
+            if redis is not None:
+                redis.eval(RELEASE_SCRIPT, 1, self.key, self.token)
+            elif cache.get(self.key) == self.token:
+                cache.delete(self.key)
+        except Exception as e:
+            print(f"⚠️ Failed to release lease {self.key}: {e}")
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class LeaderElector:
+    """Keeps trying to hold the ``leader:<name>`` lease; exactly one holder is the leader"""
+
+    def __init__(self, name, ttl=None):
+        self.name = name
+        self.lease = Lease(f"leader:{name}", ttl or settings.SCHEDULER_LEADER_LEASE_SECONDS)
+        self.renewed_at = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        # A lease not renewed within its TTL may already belong to another replica
+        return self.lease.held and time.monotonic() - self.renewed_at < self.lease.ttl
+
+    def start(self):
+        if self._thread is None:
+            self._tick()  # campaign once up front so jobs due at startup see the result
+            self._thread = threading.Thread(target=self._run, name=f"leader-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.lease.release()
+
+    def _tick(self):
+        started_at = time.monotonic()
+        if self.lease.held:
+            if self.lease.renew():
+                self.renewed_at = started_at
+            else:
+                print(f"⚠️ Lost {self.name} leadership")
+        elif self.lease.acquire():
+            self.renewed_at = started_at
+            print(f"👑 This process is now the {self.name} leader")
+
+    def _run(self):
+        while not self._stop.wait(self.lease.ttl / 3):
+            self._tick()
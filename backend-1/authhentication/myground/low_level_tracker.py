@@ -1,12 +1,17 @@
 # low_level_tracker.py
-import boto3
+from collections import namedtuple
 from datetime import datetime
+from types import MappingProxyType
 from django.utils import timezone
 from botocore.exceptions import ClientError
+from django.conf import settings
 from .models import AWSAccountConnection
 from .cache_utils import ResourceCache
+from .client_pool import client_pool
+from .credential_broker import credential_broker
+from .Discovery.pagination import ScanBudget, current_budget
+from .Discovery.regions import get_scan_regions, run_region_tasks
 import concurrent.futures
-import threading
 
 # ============================================================
 # COMPLETE LOW-LEVEL SERVICE CATEGORIES & PRICING
@@ -4208,6 +4213,42 @@ LOW_LEVEL_SERVICES = {
     }
 }
 
+# ============================================================
+# SERVICE DEFINITION INDEX (built once at import time)
+# ============================================================
+
+ServiceIndexEntry = namedtuple('ServiceIndexEntry', ['definition', 'category_key', 'category_name'])
+
+def _build_service_index():
+    index = {}
+    for category_key, category in LOW_LEVEL_SERVICES.items():
+        for low_service in category['low_level_services']:
+            # A few ids appear under several categories; the first one wins
+            index.setdefault(low_service['id'], ServiceIndexEntry(low_service, category_key, category['name']))
+    
+    category_ids = {category_key: set() for category_key in LOW_LEVEL_SERVICES}
+    for service_id, entry in index.items():
+        category_ids[entry.category_key].add(service_id)
+    
+    return (
+        MappingProxyType(index),
+        MappingProxyType({key: frozenset(ids) for key, ids in category_ids.items()}),
+        MappingProxyType({category['name'].lower(): key for key, category in LOW_LEVEL_SERVICES.items()}),
+    )
+
+# service_id -> ServiceIndexEntry, category key -> service ids, lowercase category name -> key
+SERVICE_INDEX, CATEGORY_SERVICE_IDS, CATEGORY_KEYS_BY_NAME = _build_service_index()
+
+def get_service_entry(service_id):
+    """O(1) lookup of a service definition and its category"""
+    return SERVICE_INDEX.get(service_id)
+
+def get_category_service_ids(category):
+    """Service ids for a category key or (case-insensitive) category name, or None if unknown"""
+    category = category.lower()
+    category_key = category if category in CATEGORY_SERVICE_IDS else CATEGORY_KEYS_BY_NAME.get(category)
+    return CATEGORY_SERVICE_IDS.get(category_key)
+
 # ============================================================
 # DISCOVERY FUNCTIONS FOR ALL SERVICES
 # ============================================================
@@ -4237,6 +4278,11 @@ from .Discovery.sqs_discovery import *
 #from .Discovery.eventbridge_discovery import *
 #from .Discovery.stepfunctions_discovery import *
 from .Discovery.waf_discovery import *
+from .Discovery.quick_inventory import discover_quick_inventory
+from .Discovery.config_discovery import (
+    CONFIG_COVERED_SERVICE_IDS, discover_config_aggregate_inventory, discover_config_inventory,
+    has_config_aggregator, is_config_recording
+)
 #from .Discovery.shield_discovery import *
 #from .Discovery.guardduty_discovery import *
 #from .Discovery.cloudtrail_discovery import *
@@ -4250,102 +4296,285 @@ from .Discovery.waf_discovery import *
 # ============================================================
 
 def assume_role_for_account(account):
-    """Assume role for AWS account using platform credentials"""
+    """Get assumed-role credentials for the account (cached by the credential broker)"""
     try:
-        sts = boto3.client('sts')
-        creds = sts.assume_role(
-            RoleArn=account.role_arn,
-            RoleSessionName="LowLevelServiceTracker",
-            ExternalId=str(account.external_id)
-        )["Credentials"]
-        return creds
+        return credential_broker.get_account_credentials(account, "LowLevelServiceTracker")
     except Exception as e:
         print(f"Error assuming role: {e}")
         return None
 
 def get_aws_client(service_name, creds, region='us-east-1'):
-    """Create AWS client with assumed role credentials"""
+    """Get a pooled AWS client for the assumed role credentials"""
     try:
-        return boto3.client(
-            service_name,
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        return client_pool.get_client(service_name, creds, region)
     except Exception as e:
         print(f"Error creating {service_name} client: {e}")
         return None
 
-def discover_region_services(creds, region):
-    """Discover all low-level services in a specific region"""
-    services = []
+def iter_region_resources(creds, region):
+    """Yield low-level resources in a region as each discovery module finishes"""
+    # Worker threads inherit the scan's API call budget from this thread
+    budget = current_budget()
+    run = budget.run if budget else (lambda fn, *args: fn(*args))
     
     # Execute all region-based discovery functions
     with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
         futures = [
 
-            executor.submit(discover_vpc_services, creds, region),
-            executor.submit(discover_ec2_services, creds, region),
-            executor.submit(discover_s3_services, creds, region),
-            executor.submit(discover_rds_services, creds, region),
-            executor.submit(discover_dynamodb_services, creds, region),
-            executor.submit(discover_lambda_services, creds, region),
-            executor.submit(discover_ecs_services, creds, region),
-            executor.submit(discover_eks_services, creds, region),
-            executor.submit(discover_waf_services, creds, region),
+            executor.submit(run, discover_vpc_services, creds, region),
+            executor.submit(run, discover_ec2_services, creds, region),
+            executor.submit(run, discover_s3_services, creds, region),
+            executor.submit(run, discover_rds_services, creds, region),
+            executor.submit(run, discover_dynamodb_services, creds, region),
+            executor.submit(run, discover_lambda_services, creds, region),
+            executor.submit(run, discover_ecs_services, creds, region),
+            executor.submit(run, discover_eks_services, creds, region),
+            executor.submit(run, discover_waf_services, creds, region),
           
-          #   executor.submit(discover_apigateway_services, creds, region),
-          #  executor.submit(discover_elb_services, creds, region),
-           # executor.submit(discover_cloudwatch_services, creds, region),
-           # executor.submit(discover_kms_services, creds, region),
-           # executor.submit(discover_sqs_services, creds, region),
-           # executor.submit(discover_sns_services, creds, region),
-           # executor.submit(discover_eventbridge_services, creds, region),
-           # executor.submit(discover_stepfunctions_services, creds, region),
+          #   executor.submit(run, discover_apigateway_services, creds, region),
+          #  executor.submit(run, discover_elb_services, creds, region),
+           # executor.submit(run, discover_cloudwatch_services, creds, region),
+           # executor.submit(run, discover_kms_services, creds, region),
+           # executor.submit(run, discover_sqs_services, creds, region),
+           # executor.submit(run, discover_sns_services, creds, region),
+           # executor.submit(run, discover_eventbridge_services, creds, region),
+           # executor.submit(run, discover_stepfunctions_services, creds, region),
 
          
-         #   executor.submit(discover_guardduty_services, creds, region),
-         #   executor.submit(discover_cloudtrail_services, creds, region),
-         #   executor.submit(discover_cloudformation_services, creds, region),
-         #   executor.submit(discover_ssm_services, creds, region),
-         #   executor.submit(discover_dms_services, creds, region),
+         #   executor.submit(run, discover_guardduty_services, creds, region),
+         #   executor.submit(run, discover_cloudtrail_services, creds, region),
+         #   executor.submit(run, discover_cloudformation_services, creds, region),
+         #   executor.submit(run, discover_ssm_services, creds, region),
+         #   executor.submit(run, discover_dms_services, creds, region),
            
         ]
         
         for future in concurrent.futures.as_completed(futures):
             try:
                 result = future.result()
-                if result:
-                    services.extend(result)
             except Exception as e:
                 print(f"Error in discovery thread: {e}")
-    
-    return services
+                continue
+            if result:
+                yield from result
+
+def discover_region_services(creds, region):
+    """Discover all low-level services in a specific region"""
+    return list(iter_region_resources(creds, region))
+
+def iter_global_resources(creds):
+    """Yield global AWS service resources"""
+    # Global services
+    yield from discover_route53_services(creds)
+    yield from discover_cloudfront_distributions(creds)
+   # yield from discover_shield_services(creds)
 
 def discover_global_services(creds):
     """Discover global AWS services"""
-    services = []
+    return list(iter_global_resources(creds))
+
+# Discovery modules that scan one region per call; S3 lists every bucket from
+# any region, so it runs once with the global services
+REGIONAL_DISCOVERY = [
+    discover_vpc_services,
+    discover_ec2_services,
+    discover_rds_services,
+    discover_dynamodb_services,
+    discover_lambda_services,
+    discover_ecs_services,
+    discover_eks_services,
+    discover_waf_services,
+]
+
+def iter_low_level_resources(creds, regions, budget, account=None):
+    """Stream resources from every region x service task and the global services.
     
-    # Global services
-    services.extend(discover_route53_services(creds))
-    services.extend(discover_cloudfront_distributions(creds))
-   # services.extend(discover_shield_services(creds))
+    All tasks share one thread pool (see run_region_tasks), so every region
+    is scanned at once and each region's concurrency follows its throttling.
+    """
+    tasks = [
+        (region, discover, (creds, region))
+        for region in regions
+        for discover in REGIONAL_DISCOVERY
+    ]
+    tasks += [
+        ('global', discover_s3_services, (creds, 'us-east-1')),
+        ('global', discover_route53_services, (creds,)),
+        ('global', discover_cloudfront_distributions, (creds,)),
+    ]
+    
+    for result in run_region_tasks(tasks, budget=budget):
+        if result:
+            yield from result
+
+def with_flat_rates(resources):
+    """Price resources left unpriced by an inventory backend at their service's hourly rate"""
+    for resource in resources:
+        if resource['estimated_monthly_cost'] is None:
+            entry = get_service_entry(resource['service_id'])
+            hourly_rate = (entry.definition.get('price_per_hour') if entry else None) or 0
+            resource['estimated_monthly_cost'] = round(hourly_rate * 730, 2)
+        yield resource
+
+def iter_quick_inventory_resources(creds, regions, budget, account=None):
+    """Stream tagged resources from one Tagging API sweep per region (see Discovery/quick_inventory.py).
+    
+    Resources the sweep did not price get their service's flat hourly rate.
+    CloudFront distributions are only listed in us-east-1, so that region is
+    always swept for them.
+    """
+    tasks = [(region, discover_quick_inventory, (creds, region)) for region in regions]
+    if 'us-east-1' not in regions:
+        tasks.append(('global', discover_quick_inventory, (creds, 'us-east-1', ['cloudfront:distribution'])))
+    
+    for result in run_region_tasks(tasks, budget=budget):
+        yield from with_flat_rates(result or [])
+
+def iter_config_resources(creds, regions, budget, account=None):
+    """Stream resources recorded by AWS Config (see Discovery/config_discovery.py).
+    
+    Accounts with a Config aggregator are read with one query for all
+    regions, otherwise each region's recorder is queried. S3 buckets and
+    CloudFront distributions are found as far as Config records them.
+    """
+    if account is not None and account.config_aggregator_name:
+        tasks = [('global', discover_config_aggregate_inventory,
+                  (creds, account.config_aggregator_name, account.config_aggregator_region,
+                   account.aws_account_id, regions))]
+    else:
+        tasks = [(region, discover_config_inventory, (creds, region)) for region in regions]
     
-    return services
+    for result in run_region_tasks(tasks, budget=budget):
+        yield from with_flat_rates(result or [])
+
+def is_config_available(account, creds, regions):
+    """Whether AWS Config holds the account's inventory for every scanned region"""
+    if account.config_aggregator_name:
+        return has_config_aggregator(creds, account.config_aggregator_name, account.config_aggregator_region)
+    
+    tasks = [(region, is_config_recording, (creds, region)) for region in regions]
+    not_recording = sorted(region for region, recording in run_region_tasks(tasks) if not recording)
+    if not_recording:
+        print(f"⚠️ AWS Config is not recording in {', '.join(not_recording)}")
+    return not not_recording
+
+# Engines behind discover_low_level_services, selected per account
+# (AWSAccountConnection.discovery_backend) or per request. Each streams
+# resource dicts from iter_resources(creds, regions, budget, account);
+# backends whose is_available(account, creds, regions) fails fall back to
+# 'full'. Partial backends miss resources even of the types they see and are
+# never stored as snapshots; covered_service_ids (None: every service) limits
+# which stored resources a snapshot of the scan may deactivate.
+DiscoveryBackend = namedtuple('DiscoveryBackend', ['iter_resources', 'dataset', 'partial', 'covered_service_ids', 'is_available'])
 
-def discover_low_level_services(account_id, use_cache=True):
-    """Discover ALL low-level AWS services with pricing information"""
+DISCOVERY_BACKENDS = {
+    AWSAccountConnection.BACKEND_FULL: DiscoveryBackend(
+        iter_low_level_resources, 'low_level_services', False, None, None
+    ),
+    AWSAccountConnection.BACKEND_QUICK: DiscoveryBackend(
+        iter_quick_inventory_resources, 'low_level_services_quick', True, None, None
+    ),
+    AWSAccountConnection.BACKEND_CONFIG: DiscoveryBackend(
+        iter_config_resources, 'low_level_services_config', False, CONFIG_COVERED_SERVICE_IDS, is_config_available
+    ),
+}
+
+class LowLevelServiceAggregator:
+    """Incremental grouping/cost stage of the discovery pipeline"""
+    
+    def __init__(self):
+        self.grouped_services = {}
+        self.total_services = 0
+        self.total_monthly_cost = 0
+    
+    def add(self, service):
+        service_id = service['service_id']
+        group = self.grouped_services.get(service_id)
+        
+        if group is None:
+            entry = get_service_entry(service_id)
+            group = self.grouped_services[service_id] = {
+                'service_info': entry.definition if entry else None,
+                'category': entry.category_name if entry else "Other",
+                'resources': [],
+                'total_count': 0,
+                'total_monthly_cost': 0
+            }
+        
+        cost = service.get('estimated_monthly_cost', 0)
+        group['resources'].append(service)
+        group['total_count'] += 1
+        group['total_monthly_cost'] += cost
+        self.total_services += 1
+        self.total_monthly_cost += cost
+    
+    def consume(self, services):
+        for service in services:
+            self.add(service)
+        return self
+    
+    def result(self, regions, budget, scan_mode='full', partial=False, covered_service_ids=None):
+        return {
+            'services_by_category': self.grouped_services,
+            'summary': {
+                'total_services': self.total_services,
+                'estimated_monthly_cost': round(self.total_monthly_cost, 2),
+                'unique_service_types': len(self.grouped_services),
+                'unique_services_discovered': len(self.grouped_services),
+                'regions_scanned': regions,
+                'scan_mode': scan_mode,
+                'partial_inventory': partial,
+                'covered_service_ids': sorted(covered_service_ids) if covered_service_ids is not None else None,
+                'api_calls': budget.calls,
+                'truncated_operations': sorted(budget.truncated),
+                'api_retries': budget.retries,
+                'throttled_operations': sorted(budget.throttled),
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }
+        }
+
+def iter_all_resources(services_data):
+    """Flat view over the grouped resources (no copies)"""
+    for group in services_data.get('services_by_category', {}).values():
+        yield from group['resources']
+
+def with_response_fields(services_data):
+    """Add the derived `all_resources` list and the pricing table to a scan result.
+    
+    Neither is cached or stored: `all_resources` only references the grouped
+    resources and the pricing table is static.
+    """
+    response = dict(services_data)
+    response['all_resources'] = list(iter_all_resources(services_data))
+    response['pricing_reference'] = LOW_LEVEL_SERVICES
+    return response
+
+def discover_low_level_services(account_id, use_cache=True, backend=None):
+    """Discover ALL low-level AWS services with pricing information
+    
+    ``backend`` (a DISCOVERY_BACKENDS key) overrides the account's discovery
+    backend, e.g. 'quick' for the Tagging API inventory.
+    """
     try:
+        account = AWSAccountConnection.objects.get(id=account_id)
+        backend_name = backend or account.discovery_backend
+        discovery_backend = DISCOVERY_BACKENDS.get(backend_name)
+        
+        if discovery_backend is None:
+            return {
+                'error': f"Unknown discovery backend: {backend_name}",
+                'services': [],
+                'summary': {'total_services': 0, 'estimated_monthly_cost': 0},
+                'pricing_reference': LOW_LEVEL_SERVICES
+            }
+        
         # Try cache first
         if use_cache:
-            cache_key = f"low_level_services_{account_id}"
-            cached_data = ResourceCache.get_cached_resources(cache_key)
+            cached_data = ResourceCache.get_cached_dataset(discovery_backend.dataset, account_id)
             if cached_data:
                 print(f"📦 Using cached low-level services for account {account_id}")
-                return cached_data
+                return with_response_fields(cached_data)
         
-        account = AWSAccountConnection.objects.get(id=account_id)
         creds = assume_role_for_account(account)
         
         if not creds:
@@ -4356,90 +4585,39 @@ def discover_low_level_services(account_id, use_cache=True):
                 'pricing_reference': LOW_LEVEL_SERVICES
             }
         
-        # Initialize results
-        all_services = []
-        
-        # Regions to check (major regions)
-        regions_to_check = [
-            'us-east-1',
-             # 'us-west-1', 'us-west-2',
-            #'eu-west-1', 'eu-west-2', 'eu-central-1', 
-            "eu-north-1"
-            #'ap-northeast-1', 'ap-southeast-1', 'ap-southeast-2'
-        ]
+        # Enabled regions of the account, narrowed by its allowlist
+        regions_to_check = get_scan_regions(account, creds)
         
-        # Discover services in each region (parallel)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            region_futures = {
-                executor.submit(discover_region_services, creds, region): region
-                for region in regions_to_check
-            }
-            
-            for future in concurrent.futures.as_completed(region_futures):
-                region = region_futures[future]
-                try:
-                    region_services = future.result()
-                    if region_services:
-                        all_services.extend(region_services)
-                        print(f"✅ Discovered {len(region_services)} services in {region}")
-                except Exception as e:
-                    print(f"❌ Error discovering services in {region}: {e}")
+        # A fallback scan is still cached under the requested backend's dataset,
+        # so later requests hit the cache instead of probing again
+        dataset = discovery_backend.dataset
+        if discovery_backend.is_available and not discovery_backend.is_available(account, creds, regions_to_check):
+            print(f"⚠️ {backend_name} discovery is not available for account {account_id}, running a full scan")
+            backend_name = AWSAccountConnection.BACKEND_FULL
+            discovery_backend = DISCOVERY_BACKENDS[backend_name]
         
-        # Add global services
-        all_services.extend(discover_global_services(creds))
+        # Every paginated call in this scan counts against one API call budget
+        budget = ScanBudget()
         
-        # Calculate summary
-        total_monthly_cost = sum(service.get('estimated_monthly_cost', 0) for service in all_services)
+        # Group and total resources as they are discovered
+        aggregator = LowLevelServiceAggregator().consume(
+            discovery_backend.iter_resources(creds, regions_to_check, budget, account)
+        )
         
-        # Group by service category
-        grouped_services = {}
-        for service in all_services:
-            service_id = service['service_id']
-            service_info = None
-            category_name = "Other"
-            
-            # Find service info from LOW_LEVEL_SERVICES
-            for category_key, category in LOW_LEVEL_SERVICES.items():
-                for low_service in category['low_level_services']:
-                    if low_service['id'] == service_id:
-                        service_info = low_service
-                        category_name = category['name']
-                        break
-                if service_info:
-                    break
-            
-            if service_id not in grouped_services:
-                grouped_services[service_id] = {
-                    'service_info': service_info,
-                    'category': category_name,
-                    'resources': [],
-                    'total_count': 0,
-                    'total_monthly_cost': 0
-                }
-            
-            grouped_services[service_id]['resources'].append(service)
-            grouped_services[service_id]['total_count'] += 1
-            grouped_services[service_id]['total_monthly_cost'] += service.get('estimated_monthly_cost', 0)
+        if budget.truncated:
+            print(f"⚠️ API call ({budget.max_calls}) or retry ({budget.max_retries}) budget exhausted; truncated: {', '.join(sorted(budget.truncated))}")
+        if budget.throttled:
+            print(f"⚠️ Still throttled after {settings.AWS_CLIENT_MAX_ATTEMPTS} attempts: {', '.join(sorted(budget.throttled))}")
         
-        # Prepare final response
-        result = {
-            'services_by_category': grouped_services,
-            'all_resources': all_services,
-            'summary': {
-                'total_services': len(all_services),
-                'estimated_monthly_cost': round(total_monthly_cost, 2),
-                'unique_service_types': len(grouped_services),
-                'unique_services_discovered': len(set(s['service_id'] for s in all_services)),
-                'regions_scanned': regions_to_check,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            },
-            'pricing_reference': LOW_LEVEL_SERVICES
-        }
+        result = aggregator.result(
+            regions_to_check, budget, backend_name,
+            discovery_backend.partial, discovery_backend.covered_service_ids
+        )
         
-        # Cache the results (1 hour TTL)
-        ResourceCache.cache_resources(f"low_level_services_{account_id}", result)
+        # Cache the results (TTL per dataset, see CACHE_DATASET_TTLS)
+        ResourceCache.cache_dataset(dataset, account_id, result)
         
-        return result
+        return with_response_fields(result)
         
     except AWSAccountConnection.DoesNotExist:
         return {
@@ -4455,4 +4633,4 @@ def discover_low_level_services(account_id, use_cache=True):
             'services': [],
             'summary': {'total_services': 0, 'estimated_monthly_cost': 0},
             'pricing_reference': LOW_LEVEL_SERVICES
-        }
\ No newline at end of file
+        }
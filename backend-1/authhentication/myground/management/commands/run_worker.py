@@ -0,0 +1,30 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from myground.scheduler import JOB_HANDLERS, WORKER_HANDLERS, start_scheduler
+from myground.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run background jobs (AWS cost and resource syncs) from the durable job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help="Worker threads (default: JOB_WORKER_CONCURRENCY)")
+        parser.add_argument('--jobs', nargs='+', choices=sorted(JOB_HANDLERS), help="Only run these jobs")
+        parser.add_argument('--scheduler', action='store_true', help="Also run the periodic scheduler that queues jobs")
+
+    def handle(self, *args, **options):
+        worker = Worker(WORKER_HANDLERS, concurrency=options['concurrency'], names=options['jobs'])
+
+        def shutdown(signum, frame):
+            print("🛑 Shutting down worker after in-flight jobs finish...")
+            worker.stop()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        if options['scheduler']:
+            start_scheduler()
+
+        worker.run()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-16 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myground', '0013_lowlevelservicecategory_lowlevelservicedefinition_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='awsaccountconnection',
+            name='cost_sync_watermark',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-16 23:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myground', '0015_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='awsaccountconnection',
+            name='region_allowlist',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
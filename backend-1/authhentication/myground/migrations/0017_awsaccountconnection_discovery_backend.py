@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myground', '0016_awsaccountconnection_region_allowlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='awsaccountconnection',
+            name='config_aggregator_name',
+            field=models.CharField(blank=True, max_length=256),
+        ),
+        migrations.AddField(
+            model_name='awsaccountconnection',
+            name='config_aggregator_region',
+            field=models.CharField(default='us-east-1', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='awsaccountconnection',
+            name='discovery_backend',
+            field=models.CharField(choices=[('full', 'Per-service discovery'), ('quick', 'Tagging API inventory'), ('config', 'AWS Config advanced query')], default='full', max_length=20),
+        ),
+    ]
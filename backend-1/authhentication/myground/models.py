@@ -60,6 +60,16 @@ class MFALog(models.Model):
 
 # Your existing AWS models (with minor enhancements)
 class AWSAccountConnection(models.Model):
+    # Engines behind discover_low_level_services (see DISCOVERY_BACKENDS in low_level_tracker.py)
+    BACKEND_FULL = 'full'
+    BACKEND_QUICK = 'quick'
+    BACKEND_CONFIG = 'config'
+    BACKEND_CHOICES = [
+        (BACKEND_FULL, 'Per-service discovery'),
+        (BACKEND_QUICK, 'Tagging API inventory'),
+        (BACKEND_CONFIG, 'AWS Config advanced query'),
+    ]
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="aws_accounts")
     aws_account_id = models.CharField(max_length=20)
     role_arn = models.CharField(max_length=255)
@@ -68,6 +78,11 @@ class AWSAccountConnection(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_synced = models.DateTimeField(null=True, blank=True)
     last_resource_sync = models.DateTimeField(null=True, blank=True)
+    cost_sync_watermark = models.DateField(null=True, blank=True)  # Last day of DailySpend synced from Cost Explorer
+    region_allowlist = models.JSONField(default=list, blank=True)  # Regions to scan; empty scans every enabled region
+    discovery_backend = models.CharField(max_length=20, choices=BACKEND_CHOICES, default=BACKEND_FULL)
+    config_aggregator_name = models.CharField(max_length=256, blank=True)  # Query this Config aggregator instead of each region's recorder
+    config_aggregator_region = models.CharField(max_length=32, default='us-east-1')  # Region the aggregator was created in
     
     class Meta:
         unique_together = ['user', 'aws_account_id']  # Added unique constraint
@@ -357,4 +372,69 @@ class LowLevelServiceCostHistory(models.Model):
         ordering = ['-date']
     
     def __str__(self):
-        return f"{self.account.id} - {self.service_definition.name} - {self.date}"
\ No newline at end of file
+        return f"{self.account.id} - {self.service_definition.name} - {self.date}"
+
+
+class JobRun(models.Model):
+    """One scheduled fan-out of a job over every active account, summarized when its last job finishes"""
+    name = models.CharField(max_length=100)
+    total_jobs = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    summary = models.JSONField(default=dict, blank=True)  # status counts and per-account results
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} run {self.created_at:%Y-%m-%d %H:%M} ({self.total_jobs} jobs)"
+
+
+class Job(models.Model):
+    """Durable background job, claimed by ``manage.py run_worker`` processes under a lease"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    account = models.ForeignKey(AWSAccountConnection, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True)
+    run = models.ForeignKey(JobRun, on_delete=models.SET_NULL, related_name='jobs', null=True, blank=True)
+    dedupe_key = models.CharField(max_length=255)  # at most one queued/running job per key
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    
+    # Retries
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    
+    # Lease held by the worker running the job
+    worker_id = models.CharField(max_length=255, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)  # start of the latest attempt
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['run_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='unique_active_job',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.dedupe_key}) - {self.status}"
@@ -1,11 +1,16 @@
 # resource_tracker.py
-import boto3
+import uuid
 from datetime import datetime, timedelta, timezone
+from django.conf import settings
 from django.utils import timezone as django_timezone
 from .models import AWSAccountConnection
 from .models import ResourceSummary  # Import the new model
 from botocore.exceptions import ClientError
 from .cache_utils import ResourceCache
+from .client_pool import client_pool
+from .credential_broker import credential_broker
+from .Discovery.pagination import ScanBudget, paginate
+from .Discovery.regions import get_scan_regions, run_region_tasks
 
 # ============================================================
 # COST CATEGORIES FOR AWS RESOURCES
@@ -217,30 +222,17 @@ COST_CATEGORIES = {
 # ============================================================
 
 def assume_role_for_account(account):
-    """Assume role for AWS account using platform credentials"""
+    """Get assumed-role credentials for the account (cached by the credential broker)"""
     try:
-        # Use platform credentials from environment
-        sts = boto3.client('sts')
-        creds = sts.assume_role(
-            RoleArn=account.role_arn,
-            RoleSessionName="ResourceTracker",
-            ExternalId=str(account.external_id)
-        )["Credentials"]
-        return creds
+        return credential_broker.get_account_credentials(account, "ResourceTracker")
     except Exception as e:
         print(f"Error assuming role: {e}")
         return None
 
 def get_aws_client(service_name, creds, region='us-east-1'):
-    """Create AWS client with assumed role credentials"""
+    """Get a pooled AWS client for the assumed role credentials"""
     try:
-        return boto3.client(
-            service_name,
-            aws_access_key_id=creds['AccessKeyId'],
-            aws_secret_access_key=creds['SecretAccessKey'],
-            aws_session_token=creds['SessionToken'],
-            region_name=region
-        )
+        return client_pool.get_client(service_name, creds, region)
     except Exception as e:
         print(f"Error creating {service_name} client: {e}")
         return None
@@ -293,6 +285,430 @@ def calculate_age_days(creation_date):
 # PAID RESOURCES TRACKING FUNCTIONS
 # ============================================================
 
+def _empty_paid_resources():
+    """Resources structure with every cost category initialized"""
+    resources = {
+        'cost_categories': {},
+        'raw_resources': {},
+        'permissions_issues': []
+    }
+    for category_key, category_info in COST_CATEGORIES.items():
+        resources['cost_categories'][category_key] = {
+            'name': category_info['name'],
+            'description': category_info['description'],
+            'cost_level': category_info['cost_level'],
+            'cost_driver': category_info['cost_driver'],
+            'resources': [],
+            'count': 0,
+            'estimated_monthly_cost': 0
+        }
+    return resources
+
+def scan_regional_paid_resources(creds, region):
+    """Paid resources of the regional services in one region"""
+    resources = _empty_paid_resources()
+    
+    # EC2 Instances (Most common cost driver)
+    try:
+        ec2 = get_aws_client('ec2', creds, region)
+        if ec2:
+            for reservation in paginate(ec2, 'describe_instances', 'Reservations', page_size=settings.DISCOVERY_EC2_PAGE_SIZE):
+                for instance in reservation.get('Instances', []):
+                    instance_info = {
+                        'id': instance.get('InstanceId'),
+                        'type': instance.get('InstanceType'),
+                        'state': instance.get('State', {}).get('Name'),
+                        'launch_time': instance.get('LaunchTime'),
+                        'running_hours': calculate_running_hours(instance.get('LaunchTime')),
+                        'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', []) if 'Key' in tag and 'Value' in tag}
+                    }
+                    resources['cost_categories']['ec2']['resources'].append(instance_info)
+                    resources['cost_categories']['ec2']['count'] += 1
+                    
+                    # Also add to raw_resources for backward compatibility
+                    if 'ec2_instances' not in resources['raw_resources']:
+                        resources['raw_resources']['ec2_instances'] = []
+                    resources['raw_resources']['ec2_instances'].append(instance_info)
+    except Exception as e:
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown') if hasattr(e, 'response') else 'Unknown'
+        if error_code == 'AccessDenied':
+            resources['permissions_issues'].append('EC2: Access denied')
+            print(f"⚠️ EC2 Access Denied: Missing ec2:DescribeInstances permission")
+        else:
+            print(f"EC2 Error: {e}")
+    
+    # Lambda Functions
+    try:
+        lambda_client = get_aws_client('lambda', creds, region)
+        if lambda_client:
+            for function in paginate(lambda_client, 'list_functions', 'Functions'):
+                function_info = {
+                    'name': function.get('FunctionName'),
+                    'runtime': function.get('Runtime'),
+                    'memory_size': function.get('MemorySize'),
+                    'timeout': function.get('Timeout'),
+                    'last_modified': function.get('LastModified'),
+                    'code_size': function.get('CodeSize')
+                }
+                resources['cost_categories']['lambda']['resources'].append(function_info)
+                resources['cost_categories']['lambda']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'lambda_functions' not in resources['raw_resources']:
+                    resources['raw_resources']['lambda_functions'] = []
+                resources['raw_resources']['lambda_functions'].append(function_info)
+    except Exception as e:
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown') if hasattr(e, 'response') else 'Unknown'
+        if error_code == 'AccessDenied':
+            resources['permissions_issues'].append('Lambda: Access denied')
+            print(f"⚠️ Lambda Access Denied: Missing lambda:ListFunctions permission")
+        else:
+            print(f"Lambda Error: {e}")
+    
+    # RDS Instances
+    try:
+        rds = get_aws_client('rds', creds, region)
+        if rds:
+            for db_instance in paginate(rds, 'describe_db_instances', 'DBInstances'):
+                db_info = {
+                    'id': db_instance.get('DBInstanceIdentifier'),
+                    'engine': db_instance.get('Engine'),
+                    'instance_class': db_instance.get('DBInstanceClass'),
+                    'status': db_instance.get('DBInstanceStatus'),
+                    'allocated_storage': db_instance.get('AllocatedStorage'),
+                    'multi_az': db_instance.get('MultiAZ', False),
+                    'created_time': db_instance.get('InstanceCreateTime')
+                }
+                resources['cost_categories']['rds']['resources'].append(db_info)
+                resources['cost_categories']['rds']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'rds_instances' not in resources['raw_resources']:
+                    resources['raw_resources']['rds_instances'] = []
+                resources['raw_resources']['rds_instances'].append(db_info)
+    except Exception as e:
+        print(f"RDS Error: {e}")
+    
+    # DynamoDB Tables
+    try:
+        dynamodb = get_aws_client('dynamodb', creds, region)
+        if dynamodb:
+            for table_name in paginate(dynamodb, 'list_tables', 'TableNames'):
+                try:
+                    table_info = dynamodb.describe_table(TableName=table_name)['Table']
+                    ddb_info = {
+                        'name': table_name,
+                        'status': table_info.get('TableStatus'),
+                        'creation_date': table_info.get('CreationDateTime'),
+                        'item_count': table_info.get('ItemCount', 0),
+                        'billing_mode': table_info.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED')
+                    }
+                    resources['cost_categories']['dynamodb']['resources'].append(ddb_info)
+                    resources['cost_categories']['dynamodb']['count'] += 1
+                    
+                    # Also add to raw_resources
+                    if 'dynamodb_tables' not in resources['raw_resources']:
+                        resources['raw_resources']['dynamodb_tables'] = []
+                    resources['raw_resources']['dynamodb_tables'].append(ddb_info)
+                except Exception as e:
+                    print(f"DynamoDB table {table_name} error: {e}")
+    except Exception as e:
+        print(f"DynamoDB Error: {e}")
+    
+    # ElastiCache Clusters
+    try:
+        elasticache = get_aws_client('elasticache', creds, region)
+        if elasticache:
+            for cluster in paginate(elasticache, 'describe_cache_clusters', 'CacheClusters'):
+                ec_info = {
+                    'id': cluster.get('CacheClusterId'),
+                    'engine': cluster.get('Engine'),
+                    'status': cluster.get('CacheClusterStatus'),
+                    'node_type': cluster.get('CacheNodeType'),
+                    'num_nodes': cluster.get('NumCacheNodes', 0)
+                }
+                resources['cost_categories']['elasticache']['resources'].append(ec_info)
+                resources['cost_categories']['elasticache']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'elasticache_clusters' not in resources['raw_resources']:
+                    resources['raw_resources']['elasticache_clusters'] = []
+                resources['raw_resources']['elasticache_clusters'].append(ec_info)
+    except Exception as e:
+        print(f"ElastiCache Error: {e}")
+    
+    # EKS Clusters
+    try:
+        eks = get_aws_client('eks', creds, region)
+        if eks:
+            for cluster_name in paginate(eks, 'list_clusters', 'clusters'):
+                try:
+                    cluster_info_resp = eks.describe_cluster(name=cluster_name)
+                    cluster_info = cluster_info_resp.get('cluster', {})
+                    eks_info = {
+                        'name': cluster_name,
+                        'status': cluster_info.get('status'),
+                        'version': cluster_info.get('version'),
+                        'created_at': cluster_info.get('createdAt')
+                    }
+                    resources['cost_categories']['eks']['resources'].append(eks_info)
+                    resources['cost_categories']['eks']['count'] += 1
+                    
+                    # Also add to raw_resources
+                    if 'eks_clusters' not in resources['raw_resources']:
+                        resources['raw_resources']['eks_clusters'] = []
+                    resources['raw_resources']['eks_clusters'].append(eks_info)
+                except Exception as e:
+                    print(f"EKS cluster {cluster_name} error: {e}")
+    except Exception as e:
+        print(f"EKS Error: {e}")
+    
+    # Load Balancers
+    try:
+        elbv2 = get_aws_client('elbv2', creds, region)
+        if elbv2:
+            for lb in paginate(elbv2, 'describe_load_balancers', 'LoadBalancers'):
+                lb_info = {
+                    'arn': lb.get('LoadBalancerArn'),
+                    'name': lb.get('LoadBalancerName'),
+                    'type': lb.get('Type'),
+                    'scheme': lb.get('Scheme'),
+                    'state': lb.get('State', {}).get('Code'),
+                    'created_time': lb.get('CreatedTime')
+                }
+                resources['cost_categories']['load_balancers']['resources'].append(lb_info)
+                resources['cost_categories']['load_balancers']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'load_balancers' not in resources['raw_resources']:
+                    resources['raw_resources']['load_balancers'] = []
+                resources['raw_resources']['load_balancers'].append(lb_info)
+    except Exception as e:
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown') if hasattr(e, 'response') else 'Unknown'
+        if error_code == 'AccessDenied':
+            resources['permissions_issues'].append('ELB: Access denied')
+            print(f"⚠️ ELB Access Denied: Missing elasticloadbalancing:DescribeLoadBalancers permission")
+        else:
+            print(f"ELB Error: {e}")
+    
+    # API Gateway
+    try:
+        apigateway = get_aws_client('apigateway', creds, region)
+        if apigateway:
+            for api in paginate(apigateway, 'get_rest_apis', 'items'):
+                api_info = {
+                    'id': api.get('id'),
+                    'name': api.get('name'),
+                    'created_date': api.get('createdDate'),
+                    'description': api.get('description', '')
+                }
+                resources['cost_categories']['api_gateway']['resources'].append(api_info)
+                resources['cost_categories']['api_gateway']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'api_gateway_apis' not in resources['raw_resources']:
+                    resources['raw_resources']['api_gateway_apis'] = []
+                resources['raw_resources']['api_gateway_apis'].append(api_info)
+    except Exception as e:
+        print(f"API Gateway Error: {e}")
+    
+    # SQS Queues
+    try:
+        sqs = get_aws_client('sqs', creds, region)
+        if sqs:
+            for queue_url in paginate(sqs, 'list_queues', 'QueueUrls'):
+                queue_name = queue_url.split('/')[-1]
+                sqs_info = {
+                    'name': queue_name,
+                    'url': queue_url
+                }
+                resources['cost_categories']['sqs']['resources'].append(sqs_info)
+                resources['cost_categories']['sqs']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'sqs_queues' not in resources['raw_resources']:
+                    resources['raw_resources']['sqs_queues'] = []
+                resources['raw_resources']['sqs_queues'].append(sqs_info)
+    except Exception as e:
+        print(f"SQS Error: {e}")
+    
+    # SNS Topics
+    try:
+        sns = get_aws_client('sns', creds, region)
+        if sns:
+            for topic in paginate(sns, 'list_topics', 'Topics'):
+                topic_arn = topic.get('TopicArn', '')
+                topic_name = topic_arn.split(':')[-1]
+                sns_info = {
+                    'name': topic_name,
+                    'arn': topic_arn
+                }
+                resources['cost_categories']['sns']['resources'].append(sns_info)
+                resources['cost_categories']['sns']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'sns_topics' not in resources['raw_resources']:
+                    resources['raw_resources']['sns_topics'] = []
+                resources['raw_resources']['sns_topics'].append(sns_info)
+    except Exception as e:
+        print(f"SNS Error: {e}")
+    
+    # ECR Repositories
+    try:
+        ecr = get_aws_client('ecr', creds, region)
+        if ecr:
+            for repo in paginate(ecr, 'describe_repositories', 'repositories'):
+                ecr_info = {
+                    'name': repo.get('repositoryName'),
+                    'arn': repo.get('repositoryArn'),
+                    'created_at': repo.get('createdAt'),
+                    'image_tag_mutability': repo.get('imageTagMutability')
+                }
+                resources['cost_categories']['ecr']['resources'].append(ecr_info)
+                resources['cost_categories']['ecr']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'ecr_repositories' not in resources['raw_resources']:
+                    resources['raw_resources']['ecr_repositories'] = []
+                resources['raw_resources']['ecr_repositories'].append(ecr_info)
+    except Exception as e:
+        print(f"ECR Error: {e}")
+    
+    # Redshift Clusters
+    try:
+        redshift = get_aws_client('redshift', creds, region)
+        if redshift:
+            for cluster in paginate(redshift, 'describe_clusters', 'Clusters'):
+                redshift_info = {
+                    'id': cluster.get('ClusterIdentifier'),
+                    'node_type': cluster.get('NodeType'),
+                    'status': cluster.get('ClusterStatus'),
+                    'created_time': cluster.get('ClusterCreateTime'),
+                    'number_of_nodes': cluster.get('NumberOfNodes', 0)
+                }
+                resources['cost_categories']['redshift']['resources'].append(redshift_info)
+                resources['cost_categories']['redshift']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'redshift_clusters' not in resources['raw_resources']:
+                    resources['raw_resources']['redshift_clusters'] = []
+                resources['raw_resources']['redshift_clusters'].append(redshift_info)
+    except Exception as e:
+        print(f"Redshift Error: {e}")
+    
+    # EFS File Systems
+    try:
+        efs = get_aws_client('efs', creds, region)
+        if efs:
+            for fs in paginate(efs, 'describe_file_systems', 'FileSystems'):
+                efs_info = {
+                    'id': fs.get('FileSystemId'),
+                    'creation_time': fs.get('CreationTime'),
+                    'lifecycle_state': fs.get('LifeCycleState'),
+                    'size_bytes': fs.get('SizeInBytes', {}).get('Value', 0)
+                }
+                resources['cost_categories']['efs']['resources'].append(efs_info)
+                resources['cost_categories']['efs']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'efs_file_systems' not in resources['raw_resources']:
+                    resources['raw_resources']['efs_file_systems'] = []
+                resources['raw_resources']['efs_file_systems'].append(efs_info)
+    except Exception as e:
+        print(f"EFS Error: {e}")
+    
+    # EBS Volumes (important cost driver)
+    try:
+        ec2 = get_aws_client('ec2', creds, region)
+        if ec2:
+            for volume in paginate(ec2, 'describe_volumes', 'Volumes', page_size=settings.DISCOVERY_EC2_PAGE_SIZE):
+                ebs_info = {
+                    'id': volume.get('VolumeId'),
+                    'size_gb': volume.get('Size'),
+                    'type': volume.get('VolumeType'),
+                    'state': volume.get('State'),
+                    'iops': volume.get('Iops'),
+                    'throughput': volume.get('Throughput'),
+                    'created_time': volume.get('CreateTime')
+                }
+                resources['cost_categories']['ebs']['resources'].append(ebs_info)
+                resources['cost_categories']['ebs']['count'] += 1
+    except Exception as e:
+        print(f"EBS Error: {e}")
+    
+    # Record where each resource lives (raw_resources share the same dicts)
+    for category in resources['cost_categories'].values():
+        for resource in category['resources']:
+            resource['region'] = region
+    
+    return resources
+
+def scan_global_paid_resources(creds):
+    """Paid resources of the global services (S3 lists every bucket from any region)"""
+    resources = _empty_paid_resources()
+    
+    # S3 Buckets
+    try:
+        s3 = get_aws_client('s3', creds)
+        if s3:
+            for bucket in paginate(s3, 'list_buckets', 'Buckets'):
+                bucket_info = {
+                    'name': bucket.get('Name'),
+                    'creation_date': bucket.get('CreationDate'),
+                    'age_days': calculate_age_days(bucket.get('CreationDate'))
+                }
+                resources['cost_categories']['s3']['resources'].append(bucket_info)
+                resources['cost_categories']['s3']['count'] += 1
+                
+                # Also add to raw_resources
+                if 's3_buckets' not in resources['raw_resources']:
+                    resources['raw_resources']['s3_buckets'] = []
+                resources['raw_resources']['s3_buckets'].append(bucket_info)
+    except Exception as e:
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown') if hasattr(e, 'response') else 'Unknown'
+        if error_code == 'AccessDenied':
+            resources['permissions_issues'].append('S3: Access denied')
+            print(f"⚠️ S3 Access Denied: Missing s3:ListAllMyBuckets permission")
+        else:
+            print(f"S3 Error: {e}")
+    
+    # CloudFront Distributions
+    try:
+        cloudfront = get_aws_client('cloudfront', creds)
+        if cloudfront:
+            for dist in paginate(cloudfront, 'list_distributions', 'DistributionList.Items'):
+                cf_info = {
+                    'id': dist.get('Id'),
+                    'domain_name': dist.get('DomainName'),
+                    'status': dist.get('Status'),
+                    'enabled': dist.get('Enabled', False),
+                    'price_class': dist.get('PriceClass', 'PriceClass_All')
+                }
+                resources['cost_categories']['cloudfront']['resources'].append(cf_info)
+                resources['cost_categories']['cloudfront']['count'] += 1
+                
+                # Also add to raw_resources
+                if 'cloudfront_distributions' not in resources['raw_resources']:
+                    resources['raw_resources']['cloudfront_distributions'] = []
+                resources['raw_resources']['cloudfront_distributions'].append(cf_info)
+    except Exception as e:
+        print(f"CloudFront Error: {e}")
+    
+    return resources
+
+def merge_paid_resources(resources, partial):
+    """Add the resources found by one scan task to the account totals"""
+    for category_key, category in partial['cost_categories'].items():
+        target = resources['cost_categories'][category_key]
+        target['resources'].extend(category['resources'])
+        target['count'] += category['count']
+    for key, items in partial['raw_resources'].items():
+        resources['raw_resources'].setdefault(key, []).extend(items)
+    for issue in partial['permissions_issues']:
+        if issue not in resources['permissions_issues']:
+            resources['permissions_issues'].append(issue)
+
+
 def get_all_paid_resources(account_id, use_cache=True):
     """Get all AWS resources that can incur charges, categorized by cost impact"""
     try:
@@ -309,425 +725,31 @@ def get_all_paid_resources(account_id, use_cache=True):
         if not creds:
             return None
         
+        regions = get_scan_regions(account, creds)
+        
         # Initialize resources structure with cost categories
-        resources = {
-            'cost_categories': {},
-            'summary': {
-                'total_paid_resources': 0,
-                'high_cost_resources': 0,
-                'medium_cost_resources': 0,
-                'low_cost_resources': 0,
-                'categories_found': 0,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            },
-            'raw_resources': {},
-            'permissions_issues': []
+        resources = _empty_paid_resources()
+        resources['summary'] = {
+            'total_paid_resources': 0,
+            'high_cost_resources': 0,
+            'medium_cost_resources': 0,
+            'low_cost_resources': 0,
+            'categories_found': 0,
+            'regions_scanned': regions,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'scan_id': uuid.uuid4().hex  # identifies this scan in everything derived from it
         }
         
-        # Initialize all cost categories
-        for category_key, category_info in COST_CATEGORIES.items():
-            resources['cost_categories'][category_key] = {
-                'name': category_info['name'],
-                'description': category_info['description'],
-                'cost_level': category_info['cost_level'],
-                'cost_driver': category_info['cost_driver'],
-                'resources': [],
-                'count': 0,
-                'estimated_monthly_cost': 0
-            }
-        
-        # EC2 Instances (Most common cost driver)
-        try:
-            ec2 = get_aws_client('ec2', creds)
-            if ec2:
-                ec2_response = ec2.describe_instances()
-                for reservation in ec2_response.get('Reservations', []):
-                    for instance in reservation.get('Instances', []):
-                        instance_info = {
-                            'id': instance.get('InstanceId'),
-                            'type': instance.get('InstanceType'),
-                            'state': instance.get('State', {}).get('Name'),
-                            'launch_time': instance.get('LaunchTime'),
-                            'running_hours': calculate_running_hours(instance.get('LaunchTime')),
-                            'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', []) if 'Key' in tag and 'Value' in tag}
-                        }
-                        resources['cost_categories']['ec2']['resources'].append(instance_info)
-                        resources['cost_categories']['ec2']['count'] += 1
-                        
-                        # Also add to raw_resources for backward compatibility
-                        if 'ec2_instances' not in resources['raw_resources']:
-                            resources['raw_resources']['ec2_instances'] = []
-                        resources['raw_resources']['ec2_instances'].append(instance_info)
-        except Exception as e:
-            error_code = e.response.get('Error', {}).get('Code', 'Unknown') if hasattr(e, 'response') else 'Unknown'
-            if error_code == 'AccessDenied':
-                resources['permissions_issues'].append('EC2: Access denied')
-                print(f"⚠️ EC2 Access Denied: Missing ec2:DescribeInstances permission")
-            else:
-                print(f"EC2 Error: {e}")
-        
-        # S3 Buckets
-        try:
-            s3 = get_aws_client('s3', creds)
-            if s3:
-                s3_response = s3.list_buckets()
-                for bucket in s3_response.get('Buckets', []):
-                    bucket_info = {
-                        'name': bucket.get('Name'),
-                        'creation_date': bucket.get('CreationDate'),
-                        'age_days': calculate_age_days(bucket.get('CreationDate'))
-                    }
-                    resources['cost_categories']['s3']['resources'].append(bucket_info)
-                    resources['cost_categories']['s3']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 's3_buckets' not in resources['raw_resources']:
-                        resources['raw_resources']['s3_buckets'] = []
-                    resources['raw_resources']['s3_buckets'].append(bucket_info)
-        except Exception as e:
-            error_code = e.response.get('Error', {}).get('Code', 'Unknown') if hasattr(e, 'response') else 'Unknown'
-            if error_code == 'AccessDenied':
-                resources['permissions_issues'].append('S3: Access denied')
-                print(f"⚠️ S3 Access Denied: Missing s3:ListAllMyBuckets permission")
-            else:
-                print(f"S3 Error: {e}")
-        
-        # Lambda Functions
-        try:
-            lambda_client = get_aws_client('lambda', creds)
-            if lambda_client:
-                lambda_response = lambda_client.list_functions()
-                for function in lambda_response.get('Functions', []):
-                    function_info = {
-                        'name': function.get('FunctionName'),
-                        'runtime': function.get('Runtime'),
-                        'memory_size': function.get('MemorySize'),
-                        'timeout': function.get('Timeout'),
-                        'last_modified': function.get('LastModified'),
-                        'code_size': function.get('CodeSize')
-                    }
-                    resources['cost_categories']['lambda']['resources'].append(function_info)
-                    resources['cost_categories']['lambda']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'lambda_functions' not in resources['raw_resources']:
-                        resources['raw_resources']['lambda_functions'] = []
-                    resources['raw_resources']['lambda_functions'].append(function_info)
-        except Exception as e:
-            error_code = e.response.get('Error', {}).get('Code', 'Unknown') if hasattr(e, 'response') else 'Unknown'
-            if error_code == 'AccessDenied':
-                resources['permissions_issues'].append('Lambda: Access denied')
-                print(f"⚠️ Lambda Access Denied: Missing lambda:ListFunctions permission")
-            else:
-                print(f"Lambda Error: {e}")
-        
-        # RDS Instances
-        try:
-            rds = get_aws_client('rds', creds)
-            if rds:
-                rds_response = rds.describe_db_instances()
-                for db_instance in rds_response.get('DBInstances', []):
-                    db_info = {
-                        'id': db_instance.get('DBInstanceIdentifier'),
-                        'engine': db_instance.get('Engine'),
-                        'instance_class': db_instance.get('DBInstanceClass'),
-                        'status': db_instance.get('DBInstanceStatus'),
-                        'allocated_storage': db_instance.get('AllocatedStorage'),
-                        'multi_az': db_instance.get('MultiAZ', False),
-                        'created_time': db_instance.get('InstanceCreateTime')
-                    }
-                    resources['cost_categories']['rds']['resources'].append(db_info)
-                    resources['cost_categories']['rds']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'rds_instances' not in resources['raw_resources']:
-                        resources['raw_resources']['rds_instances'] = []
-                    resources['raw_resources']['rds_instances'].append(db_info)
-        except Exception as e:
-            print(f"RDS Error: {e}")
-        
-        # DynamoDB Tables
-        try:
-            dynamodb = get_aws_client('dynamodb', creds)
-            if dynamodb:
-                ddb_response = dynamodb.list_tables()
-                for table_name in ddb_response.get('TableNames', []):
-                    try:
-                        table_info = dynamodb.describe_table(TableName=table_name)['Table']
-                        ddb_info = {
-                            'name': table_name,
-                            'status': table_info.get('TableStatus'),
-                            'creation_date': table_info.get('CreationDateTime'),
-                            'item_count': table_info.get('ItemCount', 0),
-                            'billing_mode': table_info.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED')
-                        }
-                        resources['cost_categories']['dynamodb']['resources'].append(ddb_info)
-                        resources['cost_categories']['dynamodb']['count'] += 1
-                        
-                        # Also add to raw_resources
-                        if 'dynamodb_tables' not in resources['raw_resources']:
-                            resources['raw_resources']['dynamodb_tables'] = []
-                        resources['raw_resources']['dynamodb_tables'].append(ddb_info)
-                    except Exception as e:
-                        print(f"DynamoDB table {table_name} error: {e}")
-        except Exception as e:
-            print(f"DynamoDB Error: {e}")
-        
-        # ElastiCache Clusters
-        try:
-            elasticache = get_aws_client('elasticache', creds)
-            if elasticache:
-                ec_response = elasticache.describe_cache_clusters()
-                for cluster in ec_response.get('CacheClusters', []):
-                    ec_info = {
-                        'id': cluster.get('CacheClusterId'),
-                        'engine': cluster.get('Engine'),
-                        'status': cluster.get('CacheClusterStatus'),
-                        'node_type': cluster.get('CacheNodeType'),
-                        'num_nodes': cluster.get('NumCacheNodes', 0)
-                    }
-                    resources['cost_categories']['elasticache']['resources'].append(ec_info)
-                    resources['cost_categories']['elasticache']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'elasticache_clusters' not in resources['raw_resources']:
-                        resources['raw_resources']['elasticache_clusters'] = []
-                    resources['raw_resources']['elasticache_clusters'].append(ec_info)
-        except Exception as e:
-            print(f"ElastiCache Error: {e}")
-        
-        # EKS Clusters
-        try:
-            eks = get_aws_client('eks', creds)
-            if eks:
-                eks_response = eks.list_clusters()
-                for cluster_name in eks_response.get('clusters', []):
-                    try:
-                        cluster_info_resp = eks.describe_cluster(name=cluster_name)
-                        cluster_info = cluster_info_resp.get('cluster', {})
-                        eks_info = {
-                            'name': cluster_name,
-                            'status': cluster_info.get('status'),
-                            'version': cluster_info.get('version'),
-                            'created_at': cluster_info.get('createdAt')
-                        }
-                        resources['cost_categories']['eks']['resources'].append(eks_info)
-                        resources['cost_categories']['eks']['count'] += 1
-                        
-                        # Also add to raw_resources
-                        if 'eks_clusters' not in resources['raw_resources']:
-                            resources['raw_resources']['eks_clusters'] = []
-                        resources['raw_resources']['eks_clusters'].append(eks_info)
-                    except Exception as e:
-                        print(f"EKS cluster {cluster_name} error: {e}")
-        except Exception as e:
-            print(f"EKS Error: {e}")
-        
-        # CloudFront Distributions
-        try:
-            cloudfront = get_aws_client('cloudfront', creds)
-            if cloudfront:
-                cf_response = cloudfront.list_distributions()
-                if cf_response.get('DistributionList', {}).get('Items'):
-                    for dist in cf_response['DistributionList']['Items']:
-                        cf_info = {
-                            'id': dist.get('Id'),
-                            'domain_name': dist.get('DomainName'),
-                            'status': dist.get('Status'),
-                            'enabled': dist.get('Enabled', False),
-                            'price_class': dist.get('PriceClass', 'PriceClass_All')
-                        }
-                        resources['cost_categories']['cloudfront']['resources'].append(cf_info)
-                        resources['cost_categories']['cloudfront']['count'] += 1
-                        
-                        # Also add to raw_resources
-                        if 'cloudfront_distributions' not in resources['raw_resources']:
-                            resources['raw_resources']['cloudfront_distributions'] = []
-                        resources['raw_resources']['cloudfront_distributions'].append(cf_info)
-        except Exception as e:
-            print(f"CloudFront Error: {e}")
-        
-        # Load Balancers
-        try:
-            elbv2 = get_aws_client('elbv2', creds)
-            if elbv2:
-                elb_response = elbv2.describe_load_balancers()
-                for lb in elb_response.get('LoadBalancers', []):
-                    lb_info = {
-                        'arn': lb.get('LoadBalancerArn'),
-                        'name': lb.get('LoadBalancerName'),
-                        'type': lb.get('Type'),
-                        'scheme': lb.get('Scheme'),
-                        'state': lb.get('State', {}).get('Code'),
-                        'created_time': lb.get('CreatedTime')
-                    }
-                    resources['cost_categories']['load_balancers']['resources'].append(lb_info)
-                    resources['cost_categories']['load_balancers']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'load_balancers' not in resources['raw_resources']:
-                        resources['raw_resources']['load_balancers'] = []
-                    resources['raw_resources']['load_balancers'].append(lb_info)
-        except Exception as e:
-            error_code = e.response.get('Error', {}).get('Code', 'Unknown') if hasattr(e, 'response') else 'Unknown'
-            if error_code == 'AccessDenied':
-                resources['permissions_issues'].append('ELB: Access denied')
-                print(f"⚠️ ELB Access Denied: Missing elasticloadbalancing:DescribeLoadBalancers permission")
-            else:
-                print(f"ELB Error: {e}")
-        
-        # API Gateway
-        try:
-            apigateway = get_aws_client('apigateway', creds)
-            if apigateway:
-                api_response = apigateway.get_rest_apis()
-                for api in api_response.get('items', []):
-                    api_info = {
-                        'id': api.get('id'),
-                        'name': api.get('name'),
-                        'created_date': api.get('createdDate'),
-                        'description': api.get('description', '')
-                    }
-                    resources['cost_categories']['api_gateway']['resources'].append(api_info)
-                    resources['cost_categories']['api_gateway']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'api_gateway_apis' not in resources['raw_resources']:
-                        resources['raw_resources']['api_gateway_apis'] = []
-                    resources['raw_resources']['api_gateway_apis'].append(api_info)
-        except Exception as e:
-            print(f"API Gateway Error: {e}")
-        
-        # SQS Queues
-        try:
-            sqs = get_aws_client('sqs', creds)
-            if sqs:
-                sqs_response = sqs.list_queues()
-                if sqs_response.get('QueueUrls'):
-                    for queue_url in sqs_response['QueueUrls']:
-                        queue_name = queue_url.split('/')[-1]
-                        sqs_info = {
-                            'name': queue_name,
-                            'url': queue_url
-                        }
-                        resources['cost_categories']['sqs']['resources'].append(sqs_info)
-                        resources['cost_categories']['sqs']['count'] += 1
-                        
-                        # Also add to raw_resources
-                        if 'sqs_queues' not in resources['raw_resources']:
-                            resources['raw_resources']['sqs_queues'] = []
-                        resources['raw_resources']['sqs_queues'].append(sqs_info)
-        except Exception as e:
-            print(f"SQS Error: {e}")
-        
-        # SNS Topics
-        try:
-            sns = get_aws_client('sns', creds)
-            if sns:
-                sns_response = sns.list_topics()
-                for topic in sns_response.get('Topics', []):
-                    topic_arn = topic.get('TopicArn', '')
-                    topic_name = topic_arn.split(':')[-1]
-                    sns_info = {
-                        'name': topic_name,
-                        'arn': topic_arn
-                    }
-                    resources['cost_categories']['sns']['resources'].append(sns_info)
-                    resources['cost_categories']['sns']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'sns_topics' not in resources['raw_resources']:
-                        resources['raw_resources']['sns_topics'] = []
-                    resources['raw_resources']['sns_topics'].append(sns_info)
-        except Exception as e:
-            print(f"SNS Error: {e}")
-        
-        # ECR Repositories
-        try:
-            ecr = get_aws_client('ecr', creds)
-            if ecr:
-                ecr_response = ecr.describe_repositories()
-                for repo in ecr_response.get('repositories', []):
-                    ecr_info = {
-                        'name': repo.get('repositoryName'),
-                        'arn': repo.get('repositoryArn'),
-                        'created_at': repo.get('createdAt'),
-                        'image_tag_mutability': repo.get('imageTagMutability')
-                    }
-                    resources['cost_categories']['ecr']['resources'].append(ecr_info)
-                    resources['cost_categories']['ecr']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'ecr_repositories' not in resources['raw_resources']:
-                        resources['raw_resources']['ecr_repositories'] = []
-                    resources['raw_resources']['ecr_repositories'].append(ecr_info)
-        except Exception as e:
-            print(f"ECR Error: {e}")
-        
-        # Redshift Clusters
-        try:
-            redshift = get_aws_client('redshift', creds)
-            if redshift:
-                redshift_response = redshift.describe_clusters()
-                for cluster in redshift_response.get('Clusters', []):
-                    redshift_info = {
-                        'id': cluster.get('ClusterIdentifier'),
-                        'node_type': cluster.get('NodeType'),
-                        'status': cluster.get('ClusterStatus'),
-                        'created_time': cluster.get('ClusterCreateTime'),
-                        'number_of_nodes': cluster.get('NumberOfNodes', 0)
-                    }
-                    resources['cost_categories']['redshift']['resources'].append(redshift_info)
-                    resources['cost_categories']['redshift']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'redshift_clusters' not in resources['raw_resources']:
-                        resources['raw_resources']['redshift_clusters'] = []
-                    resources['raw_resources']['redshift_clusters'].append(redshift_info)
-        except Exception as e:
-            print(f"Redshift Error: {e}")
-        
-        # EFS File Systems
-        try:
-            efs = get_aws_client('efs', creds)
-            if efs:
-                efs_response = efs.describe_file_systems()
-                for fs in efs_response.get('FileSystems', []):
-                    efs_info = {
-                        'id': fs.get('FileSystemId'),
-                        'creation_time': fs.get('CreationTime'),
-                        'lifecycle_state': fs.get('LifeCycleState'),
-                        'size_bytes': fs.get('SizeInBytes', {}).get('Value', 0)
-                    }
-                    resources['cost_categories']['efs']['resources'].append(efs_info)
-                    resources['cost_categories']['efs']['count'] += 1
-                    
-                    # Also add to raw_resources
-                    if 'efs_file_systems' not in resources['raw_resources']:
-                        resources['raw_resources']['efs_file_systems'] = []
-                    resources['raw_resources']['efs_file_systems'].append(efs_info)
-        except Exception as e:
-            print(f"EFS Error: {e}")
-        
-        # EBS Volumes (important cost driver)
-        try:
-            ec2 = get_aws_client('ec2', creds)
-            if ec2:
-                ebs_response = ec2.describe_volumes()
-                for volume in ebs_response.get('Volumes', []):
-                    ebs_info = {
-                        'id': volume.get('VolumeId'),
-                        'size_gb': volume.get('Size'),
-                        'type': volume.get('VolumeType'),
-                        'state': volume.get('State'),
-                        'iops': volume.get('Iops'),
-                        'throughput': volume.get('Throughput'),
-                        'created_time': volume.get('CreateTime')
-                    }
-                    resources['cost_categories']['ebs']['resources'].append(ebs_info)
-                    resources['cost_categories']['ebs']['count'] += 1
-        except Exception as e:
-            print(f"EBS Error: {e}")
+        # Regional services in every enabled region at once, global services once
+        tasks = [(region, scan_regional_paid_resources, (creds, region)) for region in regions]
+        tasks.append(('global', scan_global_paid_resources, (creds,)))
+        # Every paginated call in this scan counts against one API call budget,
+        # and its retries feed back into each region's concurrency limit
+        budget = ScanBudget()
+        for partial in run_region_tasks(tasks, budget=budget):
+            merge_paid_resources(resources, partial)
+        resources['summary']['api_calls'] = budget.calls
+        resources['summary']['truncated_operations'] = sorted(budget.truncated)
         
         # Update summary statistics
         total_paid_resources = 0
@@ -770,9 +792,10 @@ def get_all_paid_resources(account_id, use_cache=True):
         print(f"Error getting paid resources: {e}")
         return None
 
-def analyze_cost_impact(account_id):
-    """Analyze potential cost impact of resources"""
-    resources = get_all_paid_resources(account_id)
+def analyze_cost_impact(account_id, resources=None):
+    """Analyze potential cost impact of resources (``resources``: an inventory already scanned)"""
+    if resources is None:
+        resources = get_all_paid_resources(account_id)
     
     if not resources or 'cost_categories' not in resources:
         return None
@@ -878,7 +901,10 @@ def get_all_aws_resources(account_id, use_cache=True):
     if not paid_resources:
         return None
     
-    # Convert to old format for backward compatibility
+    return format_legacy_resources(paid_resources)
+
+def format_legacy_resources(paid_resources):
+    """Convert paid resources to the old per-service list format"""
     resources = {
         'ec2_instances': paid_resources.get('raw_resources', {}).get('ec2_instances', []),
         'rds_instances': paid_resources.get('raw_resources', {}).get('rds_instances', []),
@@ -917,8 +943,14 @@ get_aws_resources = get_all_aws_resources
 # RESOURCE SUMMARY FUNCTIONS
 # ============================================================
 
-def get_resource_usage_summary(account_id, use_cache=True):
-    """Get summary of resource usage - with caching and database storage"""
+def get_resource_usage_summary(account_id, use_cache=True, resources=None):
+    """Get summary of resource usage - with caching and database storage
+    
+    ``resources`` is an inventory from ``get_all_paid_resources`` that was
+    already scanned (e.g. by the resource fetch job); without it the account
+    is scanned once and that one inventory feeds the summary, the cost
+    impact analysis and the database row.
+    """
     try:
         # Try cache first
         if use_cache:
@@ -927,7 +959,8 @@ def get_resource_usage_summary(account_id, use_cache=True):
                 return cached_summary
         
         account = AWSAccountConnection.objects.get(id=account_id)
-        resources = get_all_paid_resources(account_id, use_cache=False)
+        if not resources or 'cost_categories' not in resources:
+            resources = get_all_paid_resources(account_id, use_cache=False)
         
         if not resources:
             # Try to get from database if available
@@ -986,7 +1019,8 @@ def get_resource_usage_summary(account_id, use_cache=True):
                 'total': resources['cost_categories'].get('sns', {}).get('count', 0)
             },
             'permissions_issues': resources.get('permissions_issues', []),
-            'cost_analysis': analyze_cost_impact(account_id)
+            'cost_analysis': analyze_cost_impact(account_id, resources),
+            'scan_id': resources['summary'].get('scan_id')
         }
         
         # Calculate average running hours for EC2
@@ -1,17 +1,24 @@
 # scheduler.py
 from apscheduler.schedulers.background import BackgroundScheduler
+import functools
 import logging
 from datetime import datetime
 
+from django.db import transaction
+from django.utils import timezone
+
 from .tasks import (
     fetch_aws_costs,
     update_monthly_summary,
     update_cost_forecast,
     update_recent_daily_spend
 )
-from .models import AWSAccountConnection
-from .resource_tracker import get_all_aws_resources, get_resource_usage_summary
+from .models import AWSAccountConnection, JobRun
+from .resource_tracker import format_legacy_resources, get_all_paid_resources, get_resource_usage_summary
 from .cache_utils import ResourceCache
+from .cost_queries import DailySpendWindow
+from .jobs import enqueue, purge_finished_jobs
+from .locks import Lease, LeaderElector
 
 logger = logging.getLogger(__name__)
 
@@ -19,117 +26,146 @@ logger = logging.getLogger(__name__)
 # GLOBAL scheduler reference (CRITICAL)
 # --------------------------------------------------
 scheduler = None
+leader = None
 
 # --------------------------------------------------
-# Job functions
+# Per-account job handlers (run by `manage.py run_worker`)
+#
+# Handlers take the account and a context dict shared by every job of one
+# graph run, so downstream jobs reuse what upstream jobs already loaded.
 # --------------------------------------------------
 
-def fetch_all_aws_costs():
-    print("🔥 fetch_all_aws_costs triggered")
-    
-    accounts = AWSAccountConnection.objects.filter(is_active=True)
-    print(f"🔥 Active AWS accounts: {accounts.count()}")
-    
-    for account in accounts:
-        try:
-            fetch_aws_costs(str(account.id))
-            print(f"✅ Fetched AWS costs for {account.aws_account_id}")
-        except Exception as e:
-            print(f"❌ Error fetching AWS costs for {account.aws_account_id}: {e}")
+def get_spend_window(account, context):
+    """DailySpend rows loaded once per graph run, after the cost sync wrote them"""
+    if 'spend_window' not in context:
+        context['spend_window'] = DailySpendWindow(account, timezone.now().date())
+    return context['spend_window']
 
-def update_all_monthly_summaries():
-    print("🔥 update_all_monthly_summaries triggered")
-    
-    accounts = AWSAccountConnection.objects.filter(is_active=True)
-    print(f"🔥 Active AWS accounts: {accounts.count()}")
-    
-    for account in accounts:
-        try:
-            update_monthly_summary(str(account.id))
-            print(f"✅ Updated monthly summary for {account.aws_account_id}")
-        except Exception as e:
-            print(f"❌ Error updating monthly summary for {account.aws_account_id}: {e}")
+def fetch_account_costs(account, context):
+    if not fetch_aws_costs(str(account.id)):
+        raise RuntimeError("Cost sync failed")
+    print(f"✅ Fetched AWS costs for {account.aws_account_id}")
+
+def update_account_monthly_summary(account, context):
+    if not update_monthly_summary(str(account.id), get_spend_window(account, context)):
+        raise RuntimeError("Monthly summary update failed")
+    print(f"✅ Updated monthly summary for {account.aws_account_id}")
 
-def update_all_cost_forecasts():
-    print("🔥 update_all_cost_forecasts triggered")
+def update_account_cost_forecast(account, context):
+    # None means too little data yet, which retrying does not fix
+    if update_cost_forecast(str(account.id), get_spend_window(account, context)) is False:
+        raise RuntimeError("Cost forecast update failed")
+    print(f"✅ Updated cost forecast for {account.aws_account_id}")
+
+def update_account_recent_spend(account, context):
+    if not update_recent_daily_spend(str(account.id), get_spend_window(account, context)):
+        raise RuntimeError("Recent spend update failed")
+    print(f"✅ Updated recent 7-day spend for {account.aws_account_id}")
+
+def fetch_account_resources(account, context):
+    print(f"📊 Fetching resources for account: {account.aws_account_id}")
     
-    accounts = AWSAccountConnection.objects.filter(is_active=True)
-    print(f"🔥 Active AWS accounts: {accounts.count()}")
+    # Fetch detailed resources; downstream jobs reuse this inventory instead of rescanning
+    paid_resources = get_all_paid_resources(str(account.id), use_cache=False)
+    if not paid_resources:
+        raise RuntimeError("No resources fetched")
+    context['paid_resources'] = paid_resources
+    resources = format_legacy_resources(paid_resources)
+    print(f"✅ Fetched {resources['summary']['total_resources']} resources for {account.aws_account_id}")
     
-    for account in accounts:
-        try:
-            update_cost_forecast(str(account.id))
-            print(f"✅ Updated cost forecast for {account.aws_account_id}")
-        except Exception as e:
-            print(f"❌ Error updating cost forecast for {account.aws_account_id}: {e}")
+    # Update last resource sync time
+    account.last_resource_sync = datetime.now()
+    account.save(update_fields=['last_resource_sync'])
 
-def update_all_recent_spends():
-    print("🔥 update_all_recent_spends triggered - 7 DAYS")
+def update_account_resource_summary(account, context):
+    print(f"📈 Updating resource summary for account: {account.aws_account_id}")
     
-    accounts = AWSAccountConnection.objects.filter(is_active=True)
-    print(f"🔥 Active AWS accounts: {accounts.count()}")
+    # Summarize the inventory fetched upstream (scans only when run on its own), cache and save to DB
+    summary = get_resource_usage_summary(
+        str(account.id), use_cache=False, resources=context.get('paid_resources')
+    )
+    if not summary:
+        raise RuntimeError("No resource summary")
     
-    for account in accounts:
-        try:
-            update_recent_daily_spend(str(account.id))
-            print(f"✅ Updated recent 7-day spend for {account.aws_account_id}")
-        except Exception as e:
-            print(f"❌ Error updating recent spend for {account.aws_account_id}: {e}")
+    print(f"✅ Updated resource summary for {account.aws_account_id}")
+    print(f"   - Total resources: {summary.get('total_resources', 0)}")
+    print(f"   - EC2 instances: {summary.get('ec2', {}).get('total', 0)}")
+    print(f"   - S3 buckets: {summary.get('s3', {}).get('total_buckets', 0)}")
+    
+    # Update last resource sync time
+    account.last_resource_sync = datetime.now()
+    account.save(update_fields=['last_resource_sync'])
 
-def fetch_all_aws_resources():
-    """Fetch and cache AWS resources for all active accounts"""
-    print("🔄 fetch_all_aws_resources triggered")
+# Job name -> (handler, rate-limited AWS service or None)
+JOB_HANDLERS = {
+    'fetch_aws_costs': (fetch_account_costs, 'ce'),
+    'update_monthly_summary': (update_account_monthly_summary, None),
+    'update_cost_forecast': (update_account_cost_forecast, None),
+    'update_recent_daily_spend': (update_account_recent_spend, None),
+    'fetch_aws_resources': (fetch_account_resources, 'discovery'),
+    'update_resource_summary': (update_account_resource_summary, 'discovery'),
+}
+
+# Job name -> jobs that run right after it for the same account, in order
+JOB_GRAPH = {
+    'fetch_aws_costs': ['update_recent_daily_spend', 'update_monthly_summary', 'update_cost_forecast'],
+    'fetch_aws_resources': ['update_resource_summary'],
+}
+
+def run_job_graph(name, account, context=None):
+    """Run job ``name`` for the account, then its downstream jobs (depth first).
     
-    accounts = AWSAccountConnection.objects.filter(is_active=True)
-    print(f"🔄 Active AWS accounts for resource tracking: {accounts.count()}")
+    A failed job skips its own downstream jobs; the other branches still run
+    and the failures are raised together at the end.
+    """
+    context = {} if context is None else context
+    handler, _ = JOB_HANDLERS[name]
+    handler(account, context)
     
-    for account in accounts:
+    errors = []
+    for downstream in JOB_GRAPH.get(name, []):
         try:
-            print(f"📊 Fetching resources for account: {account.aws_account_id}")
-            
-            # Fetch detailed resources
-            resources = get_all_aws_resources(str(account.id), use_cache=False)
-            if resources:
-                print(f"✅ Fetched {resources['summary']['total_resources']} resources for {account.aws_account_id}")
-                
-                # Update last resource sync time
-                account.last_resource_sync = datetime.now()
-                account.save(update_fields=['last_resource_sync'])
-            else:
-                print(f"⚠️ No resources fetched for {account.aws_account_id}")
-                
+            run_job_graph(downstream, account, context)
         except Exception as e:
-            print(f"❌ Error fetching resources for {account.aws_account_id}: {e}")
+            print(f"❌ {downstream} failed for {account.aws_account_id}: {e}")
+            errors.append(f"{downstream}: {e}")
+    if errors:
+        raise RuntimeError("; ".join(errors))
 
-# scheduler.py - Update the update_all_resource_summaries function
+# Worker entry points: every queued job runs together with its downstream jobs
+WORKER_HANDLERS = {
+    name: (functools.partial(run_job_graph, name), service)
+    for name, (_, service) in JOB_HANDLERS.items()
+}
 
-def update_all_resource_summaries():
-    """Update resource summaries for all active accounts and save to database"""
-    print("📈 update_all_resource_summaries triggered")
-    accounts = AWSAccountConnection.objects.filter(is_active=True)
-    print(f"📈 Active AWS accounts for resource summaries: {accounts.count()}")
-    
-    for account in accounts:
-        try:
-            print(f"📈 Updating resource summary for account: {account.aws_account_id}")
-            
-            # Fetch and cache resource summary (this will automatically save to DB)
-            summary = get_resource_usage_summary(str(account.id), use_cache=False)
-            
-            if summary:
-                print(f"✅ Updated resource summary for {account.aws_account_id}")
-                print(f"   - Total resources: {summary.get('total_resources', 0)}")
-                print(f"   - EC2 instances: {summary.get('ec2', {}).get('total', 0)}")
-                print(f"   - S3 buckets: {summary.get('s3', {}).get('total_buckets', 0)}")
-                
-                # Update last resource sync time
-                account.last_resource_sync = datetime.now()
-                account.save(update_fields=['last_resource_sync'])
-            else:
-                print(f"⚠️ No resource summary for {account.aws_account_id}")
-                
-        except Exception as e:
-            print(f"❌ Error updating resource summary for {account.aws_account_id}: {e}")
+# --------------------------------------------------
+# Scheduled jobs (enqueue one job graph per active account)
+# --------------------------------------------------
+
+def enqueue_for_accounts(name):
+    """Queue ``name`` for every active account as one JobRun; accounts with the job already pending are skipped"""
+    accounts = list(AWSAccountConnection.objects.filter(is_active=True))
+    # One transaction, so no worker can finish the run before all of its jobs are queued
+    with transaction.atomic():
+        run = JobRun.objects.create(name=name)
+        queued = sum(1 for account in accounts if enqueue(name, account, run=run))
+    if queued:
+        run.total_jobs = queued
+        run.save(update_fields=['total_jobs'])
+    else:
+        run.delete()
+    print(f"📥 {name}: queued {queued} of {len(accounts)} active AWS accounts")
+    return queued
+
+def fetch_all_aws_costs():
+    """Sync costs for all active accounts; summaries, forecasts and recent spend follow per account"""
+    print("🔥 fetch_all_aws_costs triggered")
+    return enqueue_for_accounts('fetch_aws_costs')
+
+def fetch_all_aws_resources():
+    """Fetch AWS resources for all active accounts; the resource summary follows per account"""
+    print("🔄 fetch_all_aws_resources triggered")
+    return enqueue_for_accounts('fetch_aws_resources')
 
 def refresh_all_cache():
     """Refresh all cache for all accounts"""
@@ -146,17 +182,43 @@ def refresh_all_cache():
         except Exception as e:
             print(f"❌ Error clearing cache for {account.aws_account_id}: {e}")
 
+def purge_old_jobs():
+    deleted = purge_finished_jobs()
+    print(f"🧹 Purged {deleted} finished jobs")
+
+# --------------------------------------------------
+# Cluster coordination
+# --------------------------------------------------
+
+def cluster_job(job_id, fn, interval_seconds):
+    """Run ``fn`` only on the leader, and at most once per interval across all replicas"""
+    @functools.wraps(fn)
+    def run():
+        if leader is None or not leader.is_leader:
+            return None
+        # Deliberately not released: it marks the job as done for (most of) this interval,
+        # so a new leader does not immediately repeat it after a failover
+        if not Lease(f"scheduled:{job_id}", interval_seconds * 0.9).acquire():
+            print(f"⏭️ {job_id} already ran this interval on another replica")
+            return None
+        return fn()
+    return run
+
 # --------------------------------------------------
 # Scheduler startup
 # --------------------------------------------------
 
 def start_scheduler():
-    global scheduler
+    global scheduler, leader
     
     if scheduler and scheduler.running:
         print("⚠️ Scheduler already running — skipping")
         return
     
+    # Every replica runs the scheduler; only the elected leader queues jobs
+    leader = LeaderElector("scheduler")
+    leader.start()
+    
     scheduler = BackgroundScheduler(daemon=True)
     
     # 🔁 AWS Cost jobs (optimized intervals)
@@ -170,36 +232,6 @@ def start_scheduler():
         misfire_grace_time=30,
     )
     
-    scheduler.add_job(
-        update_all_monthly_summaries,
-        'interval',
-        minutes=120,  # Update monthly summary every 2 hours
-        id="monthly_summary_job",
-        replace_existing=True,
-        coalesce=True,
-        misfire_grace_time=30,
-    )
-    
-    scheduler.add_job(
-        update_all_cost_forecasts,
-        'interval',
-        minutes=180,  # Update forecasts every 3 hours
-        id="cost_forecast_job",
-        replace_existing=True,
-        coalesce=True,
-        misfire_grace_time=60,
-    )
-    
-    scheduler.add_job(
-        update_all_recent_spends,
-        'interval',
-        minutes=60,  # Update recent spends every hour
-        id="recent_spends_job",
-        replace_existing=True,
-        coalesce=True,
-        misfire_grace_time=60,
-    )
-    
     # 🔁 AWS Resource jobs (less frequent - resources don't change as often)
     scheduler.add_job(
         fetch_all_aws_resources,
@@ -209,45 +241,38 @@ def start_scheduler():
         replace_existing=True,
         coalesce=True,
         misfire_grace_time=300,
+        next_run_time=datetime.now(),  # 🚀 queue an initial fetch on startup
     )
     
+    # 🔁 Cache refresh job (keep cache fresh)
     scheduler.add_job(
-        update_all_resource_summaries,
+        refresh_all_cache,
         'interval',
-        hours=6,  # Update summaries every 2 hours
-        id="resource_summary_job",
+        hours=24,  # Refresh cache daily
+        id="refresh_cache_job",
         replace_existing=True,
         coalesce=True,
-        misfire_grace_time=300,
+        misfire_grace_time=600,
     )
     
-    # 🔁 Cache refresh job (keep cache fresh)
+    # 🧹 Job queue housekeeping
     scheduler.add_job(
-        refresh_all_cache,
+        purge_old_jobs,
         'interval',
-        hours=24,  # Refresh cache daily
-        id="refresh_cache_job",
+        hours=24,
+        id="purge_jobs_job",
         replace_existing=True,
         coalesce=True,
         misfire_grace_time=600,
     )
     
-    # 🚀 Start all jobs immediately on first run
-    print("🚀 Running initial resource fetch...")
-    try:
-        fetch_all_aws_resources()
-    except Exception as e:
-        print(f"⚠️ Initial resource fetch failed: {e}")
-    
-    print("🚀 Running initial resource summary update...")
-    try:
-        update_all_resource_summaries()
-    except Exception as e:
-        print(f"⚠️ Initial resource summary update failed: {e}")
+    for job in scheduler.get_jobs():
+        job.modify(func=cluster_job(job.id, job.func, job.trigger.interval.total_seconds()))
     
     scheduler.start()
     print("🕒 AWS scheduler started successfully!")
-    print("   - Cost data: hourly")
-    print("   - Resource data: every 6 hours")
+    print("   - Cost data: hourly (summaries, forecasts and recent spend right after each sync)")
+    print("   - Resource data: every 6 hours (resource summary right after each fetch)")
     print("   - Cache refresh: daily")
-    print("   - All data cached for fast API responses")
\ No newline at end of file
+    print("   - All data cached for fast API responses")
+    print("   - Jobs are queued for `manage.py run_worker` processes")
\ No newline at end of file
@@ -20,7 +20,8 @@ class AWSAccountConnectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = AWSAccountConnection
         fields = ['id', 'user', 'aws_account_id', 'role_arn', 'external_id', 
-                  'is_active', 'created_at', 'last_synced']
+                  'is_active', 'created_at', 'last_synced', 'region_allowlist',
+                  'discovery_backend', 'config_aggregator_name', 'config_aggregator_region']
         read_only_fields = ['id', 'user', 'created_at', 'last_synced']
 
 class CostAnalyticsSerializer(serializers.Serializer):
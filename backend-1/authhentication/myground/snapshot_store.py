@@ -0,0 +1,205 @@
+# snapshot_store.py
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .low_level_tracker import get_service_entry
+from .models import (
+    LowLevelServiceCategory,
+    LowLevelServiceCostHistory,
+    LowLevelServiceDefinition,
+    LowLevelServiceResource,
+    LowLevelServiceSnapshot,
+)
+
+# Pricing fields copied from LOW_LEVEL_SERVICES into LowLevelServiceDefinition
+PRICE_FIELDS = [
+    'price_per_hour',
+    'price_per_gb',
+    'price_per_gb_month',
+    'price_per_gb_second',
+    'price_per_million',
+    'price_per_10k',
+    'price_per_vcpu_hour',
+    'price_per_iops_hour',
+    'price_per_month',
+]
+
+RESOURCE_UPDATE_FIELDS = [
+    'resource_name', 'count', 'estimated_monthly_cost', 'details',
+    'discovered_at', 'last_seen_at', 'is_active',
+]
+
+
+def _decimal(value):
+    return Decimal(str(value or 0))
+
+
+def _category_key(category_name):
+    return category_name.lower().replace(' ', '_')
+
+
+def _load_categories(entries):
+    """category key -> LowLevelServiceCategory, creating missing ones in one insert"""
+    names = {_category_key(entry.category_name): entry.category_name for entry in entries}
+
+    categories = {c.key: c for c in LowLevelServiceCategory.objects.filter(key__in=names)}
+    missing = [
+        LowLevelServiceCategory(key=key, name=name)
+        for key, name in names.items() if key not in categories
+    ]
+    if missing:
+        LowLevelServiceCategory.objects.bulk_create(missing, ignore_conflicts=True)
+        categories = {c.key: c for c in LowLevelServiceCategory.objects.filter(key__in=names)}
+    return categories
+
+
+def _load_definitions(service_ids):
+    """service_id -> LowLevelServiceDefinition for every known id, creating missing ones in bulk"""
+    entries = {}
+    for service_id in service_ids:
+        entry = get_service_entry(service_id)
+        if entry is None:
+            print(f"⚠️ Skipping unknown low-level service: {service_id}")
+            continue
+        entries[service_id] = entry
+
+    definitions = {
+        d.service_id: d for d in LowLevelServiceDefinition.objects.filter(service_id__in=entries)
+    }
+    missing_ids = [service_id for service_id in entries if service_id not in definitions]
+    if missing_ids:
+        categories = _load_categories(entries[service_id] for service_id in missing_ids)
+        new_definitions = []
+        for service_id in missing_ids:
+            entry = entries[service_id]
+            service_info = entry.definition
+            new_definitions.append(LowLevelServiceDefinition(
+                service_id=service_id,
+                name=service_info['name'],
+                description=service_info['description'],
+                category=categories[_category_key(entry.category_name)],
+                unit=service_info.get('unit', ''),
+                **{
+                    field: Decimal(str(service_info[field])) if service_info.get(field) else None
+                    for field in PRICE_FIELDS
+                }
+            ))
+        LowLevelServiceDefinition.objects.bulk_create(new_definitions, ignore_conflicts=True)
+        definitions = {
+            d.service_id: d for d in LowLevelServiceDefinition.objects.filter(service_id__in=entries)
+        }
+    return definitions
+
+
+def store_low_level_services_snapshot(account, services_data):
+    """Store low-level services data in database using bulk upserts.
+
+    Definitions and categories are preloaded once, resources and daily cost
+    history are written with INSERT ... ON CONFLICT DO UPDATE on their
+    unique_together keys, and resources not seen in this scan are
+    deactivated with a single UPDATE. Scans that only cover some services
+    (summary 'covered_service_ids', e.g. AWS Config) only deactivate
+    resources of those services, and scans cut short by the API call or
+    retry budget (summary 'truncated_operations' / 'throttled_operations')
+    deactivate nothing, since any resource may simply not have been reached.
+    """
+    if services_data['summary'].get('partial_inventory'):
+        raise ValueError("Partial inventories (e.g. quick scans) cannot be stored as snapshots")
+
+    batch_size = settings.SNAPSHOT_BULK_BATCH_SIZE
+    services_by_category = services_data['services_by_category']
+
+    with transaction.atomic():
+
+        # 1. Create snapshot record
+        snapshot = LowLevelServiceSnapshot.objects.create(
+            account=account,
+            total_services=services_data['summary']['total_services'],
+            estimated_monthly_cost=Decimal(str(services_data['summary']['estimated_monthly_cost'])),
+            unique_service_types=services_data['summary']['unique_service_types'],
+            unique_services_discovered=services_data['summary'].get('unique_services_discovered', 0),
+            regions_scanned=services_data['summary'].get('regions_scanned', []),
+            # Derived/static fields are rebuilt on read, not stored per snapshot
+            snapshot_data={
+                key: value for key, value in services_data.items()
+                if key not in ('all_resources', 'pricing_reference')
+            },
+            scan_duration_seconds=services_data.get('scan_duration')
+        )
+
+        # 2. Preload service definitions (and categories)
+        definitions = _load_definitions(services_by_category.keys())
+
+        # 3. Upsert resources and daily cost history
+        resources = {}
+        cost_history = []
+        today = timezone.now().date()
+
+        for service_id, service_data in services_by_category.items():
+            service_def = definitions.get(service_id)
+            if service_def is None:
+                continue
+
+            region_breakdown = {}
+            for resource in service_data['resources']:
+                cost = resource.get('estimated_monthly_cost', 0)
+                region_breakdown[resource['region']] = round(region_breakdown.get(resource['region'], 0) + cost, 2)
+
+                # ON CONFLICT cannot touch the same row twice in one statement
+                resources[(service_def.id, resource['resource_id'], resource['region'])] = LowLevelServiceResource(
+                    account=account,
+                    service_definition=service_def,
+                    resource_id=resource['resource_id'],
+                    region=resource['region'],
+                    resource_name=resource['resource_name'],
+                    count=resource['count'],
+                    estimated_monthly_cost=_decimal(cost),
+                    details=resource.get('details', {}),
+                    discovered_at=snapshot.created_at,
+                    is_active=True
+                )
+
+            cost_history.append(LowLevelServiceCostHistory(
+                account=account,
+                service_definition=service_def,
+                date=today,
+                monthly_cost=_decimal(service_data['total_monthly_cost']),
+                resource_count=service_data['total_count'],
+                region_breakdown=region_breakdown
+            ))
+
+        LowLevelServiceResource.objects.bulk_create(
+            resources.values(),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['account', 'service_definition', 'resource_id', 'region'],
+            update_fields=RESOURCE_UPDATE_FIELDS,
+        )
+
+        # 4. Deactivate resources that were not seen in this scan
+        summary = services_data['summary']
+        if summary.get('truncated_operations') or summary.get('throttled_operations'):
+            print(f"⚠️ Scan of {account.aws_account_id} was cut short, keeping unseen resources active")
+        else:
+            unseen = LowLevelServiceResource.objects.filter(
+                account=account,
+                is_active=True
+            ).exclude(discovered_at=snapshot.created_at)
+            covered_service_ids = summary.get('covered_service_ids')
+            if covered_service_ids is not None:
+                unseen = unseen.filter(service_definition__service_id__in=covered_service_ids)
+            unseen.update(is_active=False)
+
+        # 5. Update cost history (daily aggregation)
+        LowLevelServiceCostHistory.objects.bulk_create(
+            cost_history,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['account', 'service_definition', 'date'],
+            update_fields=['monthly_cost', 'resource_count', 'region_breakdown'],
+        )
+
+        return snapshot
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -11,16 +12,64 @@ from .models import (
 
 # Import AWS client functions
 from .aws_client import assume_role, fetch_monthly_cost, fetch_daily_costs
+from .cost_queries import DailySpendWindow, monthly_change_percent
 
-def fetch_aws_costs(account_id):
-    """Fetch REAL AWS costs from Cost Explorer API"""
+def get_cost_sync_start(account, today, full=False):
+    """First day to request from Cost Explorer for an incremental sync.
+    
+    Starts a few days before the watermark because Cost Explorer keeps
+    revising recent days; without a watermark (or on a full resync) the
+    whole backfill window is fetched.
+    """
+    backfill_start = today - timedelta(days=settings.COST_SYNC_BACKFILL_DAYS)
+    latest_start = today - timedelta(days=settings.COST_SYNC_RESTATEMENT_DAYS)
+    
+    if full or not account.cost_sync_watermark:
+        return backfill_start
+    
+    start = account.cost_sync_watermark - timedelta(days=settings.COST_SYNC_RESTATEMENT_DAYS)
+    return min(max(start, backfill_start), latest_start)
+
+def sync_daily_costs(account, ce_client, full=False):
+    """Fetch the open cost window and bulk upsert it into DailySpend.
+    
+    Returns the list of days fetched (empty if Cost Explorer returned nothing).
+    """
+    today = timezone.now().date()
+    start = get_cost_sync_start(account, today, full=full)
+    
+    aws_daily_costs = fetch_daily_costs(ce_client, start=start, cache_scope=account.role_arn)
+    if not aws_daily_costs:
+        return []
+    
+    spends = [
+        DailySpend(
+            account=account,
+            date=datetime.strptime(day_data['date'], '%Y-%m-%d').date(),
+            amount=Decimal(str(day_data['amount']))
+        )
+        for day_data in aws_daily_costs
+    ]
+    DailySpend.objects.bulk_create(
+        spends,
+        update_conflicts=True,
+        unique_fields=['account', 'date'],
+        update_fields=['amount'],
+    )
+    
+    account.cost_sync_watermark = max(spend.date for spend in spends)
+    account.last_synced = timezone.now()
+    account.save(update_fields=['cost_sync_watermark', 'last_synced'])
+    
+    print(f"📊 Synced {len(spends)} days ({start} → {account.cost_sync_watermark}) for {account.aws_account_id}")
+    return aws_daily_costs
+
+def fetch_aws_costs(account_id, full=False):
+    """Fetch REAL AWS costs from Cost Explorer API (incrementally from the account's watermark)"""
     try:
         account = AWSAccountConnection.objects.get(id=account_id)
         print(f"🌐 Connecting to AWS for account: {account.aws_account_id}")
         
-        # Clear old cache
-        ResourceCache.invalidate_account_cache(account_id)
-        
         # Get AWS client using STS AssumeRole
         try:
             from .aws_client import assume_role, fetch_daily_costs
@@ -29,36 +78,15 @@ def fetch_aws_costs(account_id):
             print(f"❌ Failed to assume role: {e}")
             return False
         
-        # Fetch REAL daily costs from AWS
-        aws_daily_costs = fetch_daily_costs(ce_client, days=100)
+        # Fetch and store REAL daily costs from AWS (open window only)
+        aws_daily_costs = sync_daily_costs(account, ce_client, full=full)
         
         if not aws_daily_costs:
             print("⚠️ No cost data returned from AWS")
             return False
-        
-        print(f"📊 Received {len(aws_daily_costs)} days of REAL data from AWS")
-        
-        # Process and save REAL AWS data
-        for day_data in aws_daily_costs:
-            date_str = day_data['date']
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-            amount = Decimal(str(day_data['amount']))
-            
-            # Save REAL daily spend from AWS
-            DailySpend.objects.update_or_create(
-                account=account,
-                date=date_obj,
-                defaults={'amount': amount}
-            )
-        
-        # Update sync time
-        account.last_synced = timezone.now()
-        account.save()
 
-        ResourceCache.cache_resources(account_id, {
-            'last_sync': account.last_synced,
-            'status': 'success'
-        })
+        # Only cost data changed; cached resource inventories stay valid
+        ResourceCache.invalidate(account_id, 'cost_analytics')
         
         print(f"✅ Stored REAL AWS data for {account.aws_account_id}")
         print(f"   - Days processed: {len(aws_daily_costs)}")
@@ -70,20 +98,23 @@ def fetch_aws_costs(account_id):
         print(f"❌ Error in fetch_aws_costs: {str(e)}")
         return False
 
-def update_monthly_summary(account_id):
+def get_spend_window(account_id, spend_window=None):
+    """The shared DailySpendWindow, or a freshly loaded one for standalone runs"""
+    if spend_window is not None:
+        return spend_window
+    account = AWSAccountConnection.objects.get(id=account_id)
+    return DailySpendWindow(account, timezone.now().date())
+
+def update_monthly_summary(account_id, spend_window=None):
     """Update monthly summary with real data"""
     try:
-        account = AWSAccountConnection.objects.get(id=account_id)
-        today = timezone.now().date()
+        spend_window = get_spend_window(account_id, spend_window)
+        account = spend_window.account
         
-        # Get current month data
-        current_month_start = today.replace(day=1)
-        current_month_spends = DailySpend.objects.filter(
-            account=account,
-            date__gte=current_month_start
-        )
+        # Current and previous month totals from the shared DailySpend window
+        totals = spend_window.totals()
         
-        if not current_month_spends.exists():
+        if not totals['current_month_days']:
             print(f"⚠️ No current month spends found for {account.aws_account_id}")
             MonthlyCostSummary.objects.update_or_create(
                 account=account,
@@ -96,23 +127,11 @@ def update_monthly_summary(account_id):
             return True
         
         # Calculate REAL totals from database
-        total_spend = sum([spend.amount for spend in current_month_spends])
-        daily_average = total_spend / len(current_month_spends) if current_month_spends else Decimal('0')
-        
-        # Get last month for comparison
-        last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-        last_month_spends = DailySpend.objects.filter(
-            account=account,
-            date__gte=last_month_start,
-            date__lt=current_month_start
-        )
+        total_spend = totals['current_month']
+        daily_average = total_spend / totals['current_month_days']
         
         # Calculate monthly change based on REAL data
-        monthly_change = None
-        if last_month_spends.exists():
-            last_month_total = sum([spend.amount for spend in last_month_spends])
-            if last_month_total > 0:
-                monthly_change = ((float(total_spend) - float(last_month_total)) / float(last_month_total)) * 100
+        monthly_change = monthly_change_percent(total_spend, totals['previous_month'])
         
         # Create or update monthly summary with REAL data
         MonthlyCostSummary.objects.update_or_create(
@@ -133,35 +152,30 @@ def update_monthly_summary(account_id):
         print(f"❌ Error in update_monthly_summary: {str(e)}")
         return False
 
-def update_cost_forecast(account_id):
-    """Update cost forecast based on REAL data"""
+def update_cost_forecast(account_id, spend_window=None):
+    """Update cost forecast based on REAL data
+    
+    Returns True when updated, None while there are fewer than 7 days of
+    data to forecast from, and False on errors.
+    """
     try:
-        account = AWSAccountConnection.objects.get(id=account_id)
-        today = timezone.now().date()
+        spend_window = get_spend_window(account_id, spend_window)
+        account = spend_window.account
         
-        # Get last 30 days of REAL data
-        start_date = today - timedelta(days=30)
-        daily_spends = DailySpend.objects.filter(
-            account=account,
-            date__gte=start_date
-        ).order_by('date')
+        # Last 30 days of REAL data with a trailing 7-day average
+        start_date = spend_window.today - timedelta(days=30)
+        daily_spends = spend_window.moving_averages(start_date, window=7)
         
-        if not daily_spends.exists() or len(daily_spends) < 7:
+        if len(daily_spends) < 7:
             print(f"⚠️ Not enough data for forecast for {account.aws_account_id}")
-            return False
-        
-        # Convert to REAL amounts list
-        amounts = [float(spend.amount) for spend in daily_spends]
+            return None
         
         # Simple moving average for forecast
-        def moving_average(data, window=7):
-            if len(data) < window:
-                return data[-1] if data else 0
-            return sum(data[-window:]) / window
+        moving_average = float(daily_spends[-1]['moving_average'])
         
         # Calculate forecasts based on REAL data
-        forecast_7d = moving_average(amounts, 7) * 7  # Weekly forecast
-        forecast_30d = moving_average(amounts, 7) * 30  # Monthly forecast
+        forecast_7d = moving_average * 7  # Weekly forecast
+        forecast_30d = moving_average * 30  # Monthly forecast
         
         # Save forecasts
         monthly_summary = MonthlyCostSummary.objects.filter(account=account).first()
@@ -179,29 +193,16 @@ def update_cost_forecast(account_id):
         print(f"❌ Error in update_cost_forecast: {str(e)}")
         return False
 
-def update_recent_daily_spend(account_id):
+def update_recent_daily_spend(account_id, spend_window=None):
     """Update recent 7 days for bar chart with REAL data"""
     try:
-        account = AWSAccountConnection.objects.get(id=account_id)
-        today = timezone.now().date()
-        
-        # Get last 7 days of REAL data (including today)
-        daily_spends = []
-        date_labels = []
-        
-        # Get spends for last 7 days (6 days ago to today)
-        for i in range(6, -1, -1):  # From 6 days ago to today
-            target_date = today - timedelta(days=i)
-            
-            # Find spend for this date
-            spend = DailySpend.objects.filter(
-                account=account,
-                date=target_date
-            ).first()
-            
-            amount = spend.amount if spend else Decimal('0')
-            daily_spends.append(amount)
-            date_labels.append(target_date.strftime('%a'))  # Short day name
+        spend_window = get_spend_window(account_id, spend_window)
+        account = spend_window.account
+        
+        # Get last 7 days of REAL data (6 days ago to today)
+        last_days = spend_window.last_days(days=7)
+        daily_spends = [day['amount'] for day in last_days]
+        date_labels = [day['date'] for day in last_days]  # Short day name
         
         # Create or update RecentDailySpend with REAL data
         RecentDailySpend.objects.update_or_create(
@@ -1,3 +1,569 @@
-from django.test import TestCase
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import boto3
+from botocore.stub import Stubber
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import low_level_tracker, resource_tracker, scheduler
+from .cache_codec import PICKLE, ZSTD, decode, decode_sized, encode, encode_sized
+from .cache_utils import ResourceCache
+from .Discovery.cloudtrail_discovery import get_cloudtrail_tags
+from .Discovery.config_discovery import (
+    CONFIG_QUERY_PAGE_SIZE,
+    build_config_query,
+    config_item_to_resource,
+    discover_config_aggregate_inventory,
+    discover_config_inventory,
+)
+from .Discovery.ecs_discovery import _discover_cluster_resources
+from .Discovery import quick_inventory
+from .Discovery.pagination import ScanBudget, paginate
+from .Discovery.quick_inventory import discover_quick_inventory, parse_arn
+from .Discovery.tags import cloudtrail_tags
+from .jobs import claim_job, complete_job, enqueue, fail_job
+from .models import AWSAccountConnection, Job, LowLevelServiceResource
+from .snapshot_store import store_low_level_services_snapshot
+
+
+def config_client(region='eu-west-1'):
+    return boto3.client(
+        'config', region_name=region,
+        aws_access_key_id='testing', aws_secret_access_key='testing'
+    )
+
+
+INSTANCE = {
+    'resourceId': 'i-0123', 'resourceType': 'AWS::EC2::Instance', 'awsRegion': 'eu-west-1',
+    'arn': 'arn:aws:ec2:eu-west-1:111111111111:instance/i-0123',
+    'tags': [{'key': 'Name', 'value': 'web'}],
+    'configuration': {'instanceType': 't3.micro', 'state': {'name': 'running'}},
+}
+TERMINATED_INSTANCE = {
+    'resourceId': 'i-0456', 'resourceType': 'AWS::EC2::Instance', 'awsRegion': 'eu-west-1',
+    'configuration': {'instanceType': 't3.micro', 'state': {'name': 'terminated'}},
+}
+VOLUME = {
+    'resourceId': 'vol-0123', 'resourceType': 'AWS::EC2::Volume', 'awsRegion': 'eu-west-1',
+    'configuration': {'volumeType': 'gp3', 'size': 100, 'iops': 3000},
+}
+LOAD_BALANCER = {
+    'resourceId': 'net/api/abc', 'resourceName': 'api', 'awsRegion': 'eu-west-1',
+    'resourceType': 'AWS::ElasticLoadBalancingV2::LoadBalancer',
+    'arn': 'arn:aws:elasticloadbalancing:eu-west-1:111111111111:loadbalancer/net/api/abc',
+    'configuration': {'type': 'network'},
+}
+
+
+def snapshot_data(service_id, resource_id, **summary):
+    """Low-level services result with one resource, as stored by snapshot_store"""
+    return {
+        'services_by_category': {service_id: {
+            'resources': [{
+                'service_id': service_id, 'resource_id': resource_id, 'resource_name': resource_id,
+                'region': 'eu-west-1', 'estimated_monthly_cost': 1, 'count': 1,
+            }],
+            'total_monthly_cost': 1, 'total_count': 1,
+        }},
+        'summary': dict({'total_services': 1, 'estimated_monthly_cost': 1, 'unique_service_types': 1}, **summary),
+    }
+
+
+class ConfigItemToResourceTests(SimpleTestCase):
+
+    def test_instance_is_priced_from_its_configuration(self):
+        resource = config_item_to_resource(INSTANCE)
+        self.assertEqual(resource['service_id'], 'ec2_instance')
+        self.assertEqual(resource['resource_id'], 'i-0123')
+        self.assertEqual(resource['resource_name'], 'web')
+        self.assertEqual(resource['details']['instance_type'], 't3.micro')
+        self.assertEqual(resource['details']['tags'], [{'Key': 'Name', 'Value': 'web'}])
+        self.assertGreater(resource['estimated_monthly_cost'], 0)
+
+    def test_terminated_instance_is_dropped(self):
+        self.assertIsNone(config_item_to_resource(TERMINATED_INSTANCE))
+
+    def test_volume_maps_to_its_volume_type(self):
+        resource = config_item_to_resource(VOLUME)
+        self.assertEqual(resource['service_id'], 'ebs_volume_gp3')
+        self.assertEqual(resource['details']['size_gb'], 100)
+        self.assertGreater(resource['estimated_monthly_cost'], 0)
+
+    def test_only_unattached_elastic_ips_are_charged(self):
+        address = {'resourceId': 'eipalloc-1', 'resourceType': 'AWS::EC2::EIP', 'configuration': {}}
+        attached = dict(address, configuration={'instanceId': 'i-0123'})
+        self.assertEqual(config_item_to_resource(address)['estimated_monthly_cost'], 3.65)
+        self.assertEqual(config_item_to_resource(attached)['estimated_monthly_cost'], 0)
+
+    def test_elbv2_type_selects_the_load_balancer_service(self):
+        resource = config_item_to_resource(LOAD_BALANCER)
+        self.assertEqual(resource['service_id'], 'network_load_balancer')
+        self.assertEqual(resource['resource_id'], LOAD_BALANCER['arn'])
+        self.assertIsNone(resource['estimated_monthly_cost'])  # flat rate, filled in by the tracker
+
+    def test_unmapped_types_are_skipped(self):
+        self.assertIsNone(config_item_to_resource({'resourceId': 'x', 'resourceType': 'AWS::Glue::Job'}))
+
+
+class ConfigInventoryTests(SimpleTestCase):
+
+    def test_region_query_reads_every_page(self):
+        client = config_client()
+        expected = {'Expression': build_config_query(), 'Limit': CONFIG_QUERY_PAGE_SIZE}
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                'select_resource_config',
+                {'Results': [json.dumps(INSTANCE), json.dumps(TERMINATED_INSTANCE)], 'NextToken': 'page-2'},
+                expected
+            )
+            stubber.add_response(
+                'select_resource_config',
+                {'Results': [json.dumps(VOLUME), json.dumps(LOAD_BALANCER)]},
+                dict(expected, NextToken='page-2')
+            )
+            resources = discover_config_inventory({}, 'eu-west-1', client=client)
+            stubber.assert_no_pending_responses()
+
+        self.assertEqual(
+            [resource['service_id'] for resource in resources],
+            ['ec2_instance', 'ebs_volume_gp3', 'network_load_balancer']
+        )
+
+    def test_aggregate_query_is_scoped_to_account_and_regions(self):
+        client = config_client('eu-central-1')
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                'select_aggregate_resource_config',
+                {'Results': [json.dumps(INSTANCE)]},
+                {
+                    'ConfigurationAggregatorName': 'org',
+                    'Expression': build_config_query(['eu-west-1'], '111111111111'),
+                    'Limit': CONFIG_QUERY_PAGE_SIZE,
+                }
+            )
+            resources = discover_config_aggregate_inventory(
+                {}, 'org', 'eu-central-1', '111111111111', ['eu-west-1'], client=client
+            )
+            stubber.assert_no_pending_responses()
+
+        self.assertEqual(len(resources), 1)
+        self.assertIn("accountId = '111111111111'", build_config_query(['eu-west-1'], '111111111111'))
+
+    def test_query_errors_return_no_resources(self):
+        client = config_client()
+        with Stubber(client) as stubber:
+            stubber.add_client_error('select_resource_config', 'AccessDeniedException')
+            self.assertEqual(discover_config_inventory({}, 'eu-west-1', client=client), [])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ConfigBackendFallbackTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create(username='config-backend')
+        self.account = AWSAccountConnection.objects.create(
+            user=user, aws_account_id='111111111111', role_arn='arn:aws:iam::111111111111:role/r',
+            discovery_backend=AWSAccountConnection.BACKEND_CONFIG
+        )
+        full_backend = low_level_tracker.DISCOVERY_BACKENDS[AWSAccountConnection.BACKEND_FULL]
+        full_scan = mock.Mock(return_value=iter([{'service_id': 'vpc', 'estimated_monthly_cost': 0}]))
+        patches = [
+            mock.patch.object(low_level_tracker, 'assume_role_for_account', return_value={'AccessKeyId': 'AK'}),
+            mock.patch.object(low_level_tracker, 'get_scan_regions', return_value=['eu-west-1', 'us-east-1']),
+            mock.patch.dict(low_level_tracker.DISCOVERY_BACKENDS, {
+                AWSAccountConnection.BACKEND_FULL: full_backend._replace(iter_resources=full_scan)
+            }),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.full_scan = full_scan
+
+    def test_falls_back_to_full_scan_when_a_region_is_not_recording(self):
+        recording = {'eu-west-1': True, 'us-east-1': False}
+        with mock.patch.object(low_level_tracker, 'is_config_recording', side_effect=lambda creds, region: (region, recording[region])):
+            result = low_level_tracker.discover_low_level_services(self.account.id, use_cache=False)
+
+        self.full_scan.assert_called_once()
+        self.assertEqual(result['summary']['scan_mode'], AWSAccountConnection.BACKEND_FULL)
+        # Cached under the requested backend, so the next request does not probe again
+        self.assertIsNotNone(ResourceCache.get_cached_dataset('low_level_services_config', self.account.id))
+
+    def test_config_scan_covers_only_mapped_services(self):
+        with mock.patch.object(low_level_tracker, 'is_config_recording', side_effect=lambda creds, region: (region, True)), \
+                mock.patch.object(low_level_tracker, 'discover_config_inventory', return_value=[config_item_to_resource(VOLUME)]):
+            result = low_level_tracker.discover_low_level_services(self.account.id, use_cache=False)
+
+        self.full_scan.assert_not_called()
+        self.assertEqual(result['summary']['scan_mode'], AWSAccountConnection.BACKEND_CONFIG)
+        self.assertFalse(result['summary']['partial_inventory'])
+        self.assertIn('ebs_volume_gp3', result['summary']['covered_service_ids'])
+        self.assertNotIn('ecs_service', result['summary']['covered_service_ids'])
+
+    def test_config_snapshot_keeps_resources_of_uncovered_services(self):
+        store_low_level_services_snapshot(self.account, snapshot_data('ecs_capacity_provider', 'cp-1'))
+        store_low_level_services_snapshot(
+            self.account, snapshot_data('ebs_volume_gp3', 'vol-0123', covered_service_ids=['ebs_volume_gp3'])
+        )
+
+        active = LowLevelServiceResource.objects.filter(account=self.account, is_active=True)
+        self.assertEqual(sorted(active.values_list('resource_id', flat=True)), ['cp-1', 'vol-0123'])
+
+
+class TagBatchFallbackTests(SimpleTestCase):
+
+    def test_failed_batch_falls_back_to_one_call_per_resource(self):
+        client = boto3.client(
+            'cloudtrail', region_name='eu-west-1',
+            aws_access_key_id='testing', aws_secret_access_key='testing'
+        )
+        good = 'arn:aws:cloudtrail:eu-west-1:111111111111:trail/good'
+        bad = 'arn:aws:cloudtrail:eu-west-1:111111111111:trail/bad'
+        batch = cloudtrail_tags(client, fallback=lambda arn: get_cloudtrail_tags(client, arn))
+        with Stubber(client) as stubber:
+            stubber.add_client_error('list_tags', 'InvalidTrailNameException',
+                                     expected_params={'ResourceIdList': [good, bad]})
+            stubber.add_response('list_tags', {'ResourceTagList': [
+                {'ResourceId': good, 'TagsList': [{'Key': 'team', 'Value': 'core'}]}
+            ]}, {'ResourceIdList': [good]})
+            stubber.add_client_error('list_tags', 'InvalidTrailNameException',
+                                     expected_params={'ResourceIdList': [bad]})
+            good_tags, bad_tags = batch.defer(good), batch.defer(bad)
+            batch.resolve()
+            stubber.assert_no_pending_responses()
+
+        self.assertEqual(good_tags, [{'Key': 'team', 'Value': 'core'}])
+        self.assertEqual(bad_tags, [])
+
+
+class Opaque:
+    # msgpack has no encoding for arbitrary objects, so values holding one are pickled
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Opaque) and other.name == self.name
+
+
+class CacheCodecTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        value = {
+            'cost': Decimal('12.3400'),
+            'aware': datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=dt_timezone.utc),
+            'naive': datetime(2026, 1, 2, 3, 4, 5),
+            'day': date(2026, 1, 2),
+            'nested': {'by_service': {'ec2': [{'amount': Decimal('1.5'), 'period': date(2026, 1, 1)}]}, 1: None},
+        }
+        decoded = decode(encode(value))
+        self.assertEqual(decoded, value)
+        self.assertEqual(decoded['aware'].tzinfo, dt_timezone.utc)
+        self.assertIsNone(decoded['naive'].tzinfo)
+
+    def test_large_payloads_are_compressed(self):
+        value = {'resources': [{'resource_id': f"i-{index:08d}", 'state': 'running'} for index in range(500)]}
+        payload, size = encode_sized(value)
+        self.assertEqual(payload[1:2], ZSTD)
+        self.assertLess(len(payload), size)
+        self.assertEqual(decode_sized(payload), (value, size))
+
+    def test_tuples_and_sets_come_back_as_lists(self):
+        decoded = decode(encode({'pair': ('a', 1), 'ids': {'x'}}))
+        self.assertEqual(decoded, {'pair': ['a', 1], 'ids': ['x']})
+
+    def test_unsupported_types_fall_back_to_pickle(self):
+        value = {'owner': Opaque('ops'), 'pair': ('a', 1)}
+        payload = encode(value)
+        self.assertEqual(payload[:1], PICKLE)
+        self.assertEqual(decode(payload), value)
+
+    def test_non_encoded_values_pass_through(self):
+        self.assertEqual(decode('plain'), 'plain')
+        self.assertEqual(decode(b'xx-raw'), b'xx-raw')
+
+    def test_raw_resource_refs_survive_encoding(self):
+        resources = [{'resource_id': 'i-1', 'cost': Decimal('3.2')}]
+        value = {
+            'cost_categories': {'compute': {'resources': resources}},
+            'raw_resources': {'ec2': resources, 'other': [{'resource_id': 'x'}]},
+        }
+        decoded = ResourceCache._unpack(decode(encode(ResourceCache._pack(value))))
+        self.assertEqual(decoded, value)
+
+
+class PaginationTests(SimpleTestCase):
+
+    def aws_client(self, service):
+        return boto3.client(
+            service, region_name='us-east-1',
+            aws_access_key_id='testing', aws_secret_access_key='testing'
+        )
+
+    def test_page_size_is_dropped_for_operations_without_one(self):
+        client = self.aws_client('route53')
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                'list_vpc_association_authorizations',
+                {'HostedZoneId': 'Z1', 'VPCs': [{'VPCId': 'vpc-1'}]},
+                {'HostedZoneId': 'Z1'}
+            )
+            vpcs = list(paginate(client, 'list_vpc_association_authorizations', 'VPCs', page_size=50, HostedZoneId='Z1'))
+
+        self.assertEqual(vpcs, [{'VPCId': 'vpc-1'}])
+
+    @override_settings(DISCOVERY_MAX_PAGES_PER_OPERATION=2)
+    def test_page_limit_only_warns_when_more_pages_exist(self):
+        client = self.aws_client('ec2')
+        with Stubber(client) as stubber:
+            stubber.add_response('describe_volumes', {'Volumes': [{'VolumeId': 'vol-1'}], 'NextToken': 'page-2'})
+            stubber.add_response('describe_volumes', {'Volumes': [{'VolumeId': 'vol-2'}]})
+            with mock.patch('builtins.print') as printed:
+                volumes = list(paginate(client, 'describe_volumes', 'Volumes'))
+            printed.assert_not_called()
+
+            stubber.add_response('describe_volumes', {'Volumes': [{'VolumeId': 'vol-1'}], 'NextToken': 'page-2'})
+            stubber.add_response('describe_volumes', {'Volumes': [{'VolumeId': 'vol-2'}], 'NextToken': 'page-3'})
+            stubber.add_response('describe_volumes', {'Volumes': [{'VolumeId': 'vol-3'}]})
+            budget = ScanBudget()
+            with mock.patch('builtins.print') as printed:
+                truncated = budget.run(list, paginate(client, 'describe_volumes', 'Volumes'))
+            printed.assert_called_once()
+
+        self.assertEqual([volume['VolumeId'] for volume in volumes], ['vol-1', 'vol-2'])
+        self.assertEqual([volume['VolumeId'] for volume in truncated], ['vol-1', 'vol-2'])
+        self.assertEqual(budget.truncated, {'describe_volumes'})
+        self.assertEqual(budget.calls, 3)
+
+    @override_settings(DISCOVERY_MAX_PAGES_PER_OPERATION=1)
+    def test_page_limit_look_ahead_respects_the_budget(self):
+        client = self.aws_client('ec2')
+        budget = ScanBudget(max_calls=1)
+        with Stubber(client) as stubber:
+            stubber.add_response('describe_volumes', {'Volumes': [{'VolumeId': 'vol-1'}], 'NextToken': 'page-2'})
+            volumes = budget.run(list, paginate(client, 'describe_volumes', 'Volumes'))
+            stubber.assert_no_pending_responses()
+
+        self.assertEqual(len(volumes), 1)
+        self.assertEqual(budget.calls, 1)
+        self.assertEqual(budget.truncated, {'describe_volumes'})
+
+
+class QuickInventoryTests(SimpleTestCase):
+
+    def test_parse_arn(self):
+        cases = [
+            ('arn:aws:ec2:eu-west-1:111111111111:instance/i-0123',
+             ('ec2', 'instance', 'i-0123', 'eu-west-1')),
+            ('arn:aws:wafv2:us-east-1:111111111111:regional/webacl/main/a1b2',
+             ('wafv2', 'webacl', 'a1b2', 'us-east-1')),
+            ('arn:aws:wafv2:us-east-1:111111111111:global/webacl/edge/c3d4',
+             ('wafv2', 'webacl', 'c3d4', 'us-east-1')),
+            ('arn:aws:elasticloadbalancing:eu-west-1:111111111111:loadbalancer/app/web/50dc6c495c0c9188',
+             ('elasticloadbalancing', 'loadbalancer/app', '50dc6c495c0c9188', 'eu-west-1')),
+            ('arn:aws:elasticloadbalancing:eu-west-1:111111111111:loadbalancer/net/tcp/60dc6c495c0c9188',
+             ('elasticloadbalancing', 'loadbalancer/net', '60dc6c495c0c9188', 'eu-west-1')),
+            ('arn:aws:elasticloadbalancing:eu-west-1:111111111111:loadbalancer/gwy/fw/70dc6c495c0c9188',
+             ('elasticloadbalancing', 'loadbalancer/gwy', '70dc6c495c0c9188', 'eu-west-1')),
+            ('arn:aws:elasticloadbalancing:eu-west-1:111111111111:loadbalancer/classic',
+             ('elasticloadbalancing', 'loadbalancer', 'classic', 'eu-west-1')),
+            ('arn:aws:rds:eu-west-1:111111111111:db:orders',
+             ('rds', 'db', 'orders', 'eu-west-1')),
+            ('arn:aws:logs:eu-west-1:111111111111:log-group:/aws/lambda/fn',
+             ('logs', 'log-group', '/aws/lambda/fn', 'eu-west-1')),
+            ('arn:aws:states:eu-west-1:111111111111:stateMachine:orders',
+             ('states', 'stateMachine', 'orders', 'eu-west-1')),
+            ('arn:aws:s3:::my-bucket', ('s3', '', 'my-bucket', '')),
+            ('arn:aws:sns:eu-west-1:111111111111:alerts', ('sns', '', 'alerts', 'eu-west-1')),
+            ('not-an-arn', (None, None, 'not-an-arn', None)),
+        ]
+        for arn, expected in cases:
+            with self.subTest(arn=arn):
+                self.assertEqual(parse_arn(arn), expected)
+
+    def test_instances_missing_from_describe_are_dropped(self):
+        clients = {
+            service: boto3.client(
+                service, region_name='eu-west-1',
+                aws_access_key_id='testing', aws_secret_access_key='testing'
+            )
+            for service in ('resourcegroupstaggingapi', 'ec2')
+        }
+        tagging, ec2 = clients['resourcegroupstaggingapi'], clients['ec2']
+
+        with Stubber(tagging) as tagging_stub, Stubber(ec2) as ec2_stub:
+            tagging_stub.add_response('get_resources', {'ResourceTagMappingList': [
+                {'ResourceARN': 'arn:aws:ec2:eu-west-1:111111111111:instance/i-live', 'Tags': [{'Key': 'Name', 'Value': 'web'}]},
+                {'ResourceARN': 'arn:aws:ec2:eu-west-1:111111111111:instance/i-gone', 'Tags': []},
+            ]})
+            ec2_stub.add_response(
+                'describe_instances',
+                {'Reservations': [{'Instances': [
+                    {'InstanceId': 'i-live', 'InstanceType': 't3.micro', 'State': {'Name': 'running'}}
+                ]}]},
+                {'Filters': [{'Name': 'instance-id', 'Values': ['i-live', 'i-gone']}]}
+            )
+            with mock.patch.object(quick_inventory, 'get_client', side_effect=lambda service, creds, region: clients[service]):
+                services = discover_quick_inventory({}, 'eu-west-1')
+            ec2_stub.assert_no_pending_responses()
+
+        self.assertEqual([resource['resource_id'] for resource in services], ['i-live'])
+        self.assertEqual(services[0]['resource_name'], 'web')
+        self.assertEqual(services[0]['details']['instance_type'], 't3.micro')
+        self.assertGreater(services[0]['estimated_monthly_cost'], 0)
+
+
+class EcsClusterResourcesTests(SimpleTestCase):
+
+    def test_tasks_are_described_in_batches(self):
+        client = boto3.client(
+            'ecs', region_name='eu-west-1',
+            aws_access_key_id='testing', aws_secret_access_key='testing'
+        )
+        prefix = 'arn:aws:ecs:eu-west-1:111111111111'
+        task_arns = [f"{prefix}:task/main/{index:032x}" for index in range(150)]
+        definitions = [f"{prefix}:task-definition/api:{revision}" for revision in (1, 2)]
+
+        def task(index):
+            # The last task was started by RunTask, not by a service
+            group = 'family:migrate' if index == 149 else 'service:api'
+            return {
+                'taskArn': task_arns[index], 'launchType': 'FARGATE', 'group': group,
+                'taskDefinitionArn': definitions[index % 2], 'lastStatus': 'RUNNING',
+            }
+
+        with Stubber(client) as stubber:
+            stubber.add_response('list_services', {'serviceArns': [f"{prefix}:service/main/api"]})
+            stubber.add_response('describe_services', {'services': [{
+                'serviceArn': f"{prefix}:service/main/api", 'serviceName': 'api', 'launchType': 'FARGATE',
+            }]})
+            stubber.add_response('list_tasks', {'taskArns': task_arns[:100], 'nextToken': 'page-2'})
+            stubber.add_response(
+                'describe_tasks', {'tasks': [task(index) for index in range(100)]},
+                {'cluster': 'main', 'tasks': task_arns[:100]}
+            )
+            for definition in definitions:  # once each, not once per task
+                stubber.add_response(
+                    'describe_task_definition',
+                    {'taskDefinition': {'taskDefinitionArn': definition, 'cpu': '256', 'memory': '512'}},
+                    {'taskDefinition': definition}
+                )
+            stubber.add_response('list_tasks', {'taskArns': task_arns[100:]})
+            stubber.add_response(
+                'describe_tasks', {'tasks': [task(index) for index in range(100, 150)]},
+                {'cluster': 'main', 'tasks': task_arns[100:]}
+            )
+            stubber.add_response('list_container_instances', {'containerInstanceArns': []})
+
+            resources = _discover_cluster_resources(client, 'eu-west-1', f"{prefix}:cluster/main", 'main', {})
+            stubber.assert_no_pending_responses()
+
+        tasks = [resource for resource in resources if resource['service_id'] == 'ecs_fargate_task']
+        self.assertEqual(len(tasks), 149)
+        self.assertEqual({resource['details']['service_name'] for resource in tasks}, {'api'})
+        self.assertNotIn(task_arns[149], {resource['resource_id'] for resource in tasks})
+        self.assertGreater(tasks[0]['estimated_monthly_cost'], 0)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ResourceJobGraphTests(TestCase):
+
+    def test_one_graph_run_scans_the_account_once(self):
+        user = User.objects.create(username='resource-graph')
+        account = AWSAccountConnection.objects.create(
+            user=user, aws_account_id='222222222222', role_arn='arn:aws:iam::222222222222:role/r'
+        )
+        inventory = resource_tracker._empty_paid_resources()
+        inventory['summary'] = {'total_paid_resources': 0, 'scan_id': 'scan-1'}
+        scan = mock.Mock(return_value=inventory)
+        context = {}
+
+        with mock.patch.object(scheduler, 'get_all_paid_resources', scan), \
+                mock.patch.object(resource_tracker, 'get_all_paid_resources', scan):
+            scheduler.fetch_account_resources(account, context)
+            scheduler.update_account_resource_summary(account, context)
+
+        scan.assert_called_once()
+        self.assertEqual(ResourceCache.get_cached_resource_summary(account.id)['scan_id'], 'scan-1')
+
+
+class SnapshotStoreTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create(username='snapshot-store')
+        self.account = AWSAccountConnection.objects.create(
+            user=user, aws_account_id='333333333333', role_arn='arn:aws:iam::333333333333:role/r'
+        )
+        store_low_level_services_snapshot(self.account, snapshot_data('nat_gateway', 'nat-1'))
+
+    def active_resource_ids(self):
+        return sorted(LowLevelServiceResource.objects.filter(
+            account=self.account, is_active=True
+        ).values_list('resource_id', flat=True))
+
+    def test_complete_scan_deactivates_unseen_resources(self):
+        store_low_level_services_snapshot(self.account, snapshot_data('nat_gateway', 'nat-2'))
+        self.assertEqual(self.active_resource_ids(), ['nat-2'])
+
+    def test_budget_truncated_scan_keeps_unseen_resources(self):
+        for summary in ({'truncated_operations': ['describe_nat_gateways']}, {'throttled_operations': ['describe_nat_gateways']}):
+            store_low_level_services_snapshot(self.account, snapshot_data('nat_gateway', 'nat-2', **summary))
+        self.assertEqual(self.active_resource_ids(), ['nat-1', 'nat-2'])
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create(username='job-queue')
+        self.account = AWSAccountConnection.objects.create(
+            user=user, aws_account_id='444444444444', role_arn='arn:aws:iam::444444444444:role/r'
+        )
+
+    def expire_lease(self, job):
+        Job.objects.filter(id=job.id).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_claim_leases_the_next_due_job_once(self):
+        job = enqueue('fetch_aws_costs', self.account, max_attempts=3)
+        enqueue('fetch_aws_resources', self.account, run_at=timezone.now() + timedelta(hours=1))
+        self.assertIsNone(enqueue('fetch_aws_costs', self.account))  # deduplicated
+
+        claimed = claim_job('worker-1')
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual((claimed.status, claimed.attempts, claimed.worker_id), (Job.STATUS_RUNNING, 1, 'worker-1'))
+        self.assertIsNone(claim_job('worker-2'))  # leased, and the other job is not due yet
+
+        complete_job(claimed)
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.STATUS_DONE)
+        self.assertIsNotNone(enqueue('fetch_aws_costs', self.account))
+
+    def test_expired_lease_is_reclaimed_until_attempts_run_out(self):
+        job = enqueue('fetch_aws_costs', self.account, max_attempts=2)
+        claim_job('worker-1')
+        self.expire_lease(job)
+
+        reclaimed = claim_job('worker-2')
+        self.assertEqual((reclaimed.id, reclaimed.attempts, reclaimed.worker_id), (job.id, 2, 'worker-2'))
+
+        self.expire_lease(job)
+        self.assertIsNone(claim_job('worker-3'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn('worker-2', job.last_error)
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = enqueue('fetch_aws_costs', self.account, max_attempts=2)
+
+        fail_job(claim_job('worker-1'), 'boom')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIsNone(claim_job('worker-1'))  # backing off
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        fail_job(claim_job('worker-1'), 'boom again')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), (Job.STATUS_FAILED, 2, 'boom again'))
@@ -24,23 +24,25 @@ from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
-import boto3
-from django.db import transaction
 import time
 import json
 from .serializers import AWSAccountConnectionSerializer, CostAnalyticsSerializer, ResourceSummarySerializer
-from .models import VerificationCode, MFAConfiguration, BackupCode, MFALog, AWSAccountConnection, MonthlyCostSummary, DailySpend, RecentDailySpend, ResourceSummary, LowLevelServiceSnapshot, LowLevelServiceCategory, LowLevelServiceCostHistory, LowLevelServiceDefinition, LowLevelServiceResource 
+from .models import VerificationCode, MFAConfiguration, BackupCode, MFALog, AWSAccountConnection, MonthlyCostSummary, DailySpend, RecentDailySpend, ResourceSummary
 import uuid
-from .resource_tracker import get_all_paid_resources, analyze_cost_impact, COST_CATEGORIES
-from .low_level_tracker import discover_global_services, discover_low_level_services, discover_region_services  
+from .resource_tracker import get_all_paid_resources, analyze_cost_impact, format_legacy_resources, COST_CATEGORIES
+from .low_level_tracker import discover_global_services, discover_low_level_services, discover_region_services, get_category_service_ids  
+from .snapshot_store import store_low_level_services_snapshot
+from .cost_queries import DailySpendWindow, get_cost_totals, get_last_days, month_bounds, monthly_change_percent
 
 # AWS Client imports
-from .aws_client import assume_role, fetch_monthly_cost, fetch_daily_costs, fetch_service_breakdown
+from .aws_client import assume_role, compose_cost_analytics
+from .client_pool import client_pool
+from .credential_broker import credential_broker
 
 # Tasks imports
 from .tasks import (
     fetch_aws_costs, update_monthly_summary, 
-    update_cost_forecast, update_recent_daily_spend
+    update_cost_forecast, update_recent_daily_spend, sync_daily_costs
 )
 
 # Serializers imports
@@ -771,7 +773,7 @@ def connect_aws_account(request):
         return Response({"error": "External ID not found"}, status=400)
 
     # 🔁 STS AssumeRole
-    sts = boto3.client("sts")
+    sts = client_pool.get_client("sts")
     try:
         sts.assume_role(
             RoleArn=role_arn,
@@ -806,152 +808,17 @@ class AWSAccountViewSet(viewsets.ModelViewSet):
             account = self.get_object()
             today = timezone.now().date()
             
-            # Try cache first
+            # Cache first: one AWS query per burst of misses, stale data served while refreshing
             use_cache = request.GET.get('no_cache') != 'true'
             if use_cache:
-                cached_analytics = ResourceCache.get_cached_cost_analytics(account.id)
-                if cached_analytics:
-                    print(f"📦 Serving cached analytics for account {account.id}")
-                    serializer = CostAnalyticsSerializer(data=cached_analytics)
-                    serializer.is_valid(raise_exception=True)
-                    return Response(serializer.data)
-            
-            print(f"🔍 Fetching fresh analytics for account {account.aws_account_id}")
-            
-            # TRY TO GET REAL-TIME DATA FROM AWS API
-            try:
-                # Get AWS client
-                ce_client = assume_role(account.role_arn, str(account.external_id))
-                
-                print(f"🔍 Fetching REAL-TIME data from AWS for account {account.aws_account_id}")
-                
-                # 1. Get CURRENT MONTH spend from AWS (REAL-TIME)
-                current_month_total = Decimal(str(fetch_monthly_cost(ce_client)))
-                print(f"   - Current month from AWS: ${current_month_total}")
-                
-                # 2. Get DAILY COSTS from AWS (last 90 days)
-                aws_daily_costs = fetch_daily_costs(ce_client, days=90)
-                print(f"   - Fetched {len(aws_daily_costs)} days of data from AWS")
-                
-                # 3. Calculate TOTAL HISTORICAL from AWS daily data
-                total_historical_amount = Decimal('0')
-                for day_cost in aws_daily_costs:
-                    total_historical_amount += Decimal(str(day_cost['amount']))
-                print(f"   - Total historical from AWS: ${total_historical_amount}")
-                
-                # 4. Get YESTERDAY'S spend from AWS (since today might not have data yet)
-                yesterday = today - timedelta(days=1)
-                yesterday_str = yesterday.strftime('%Y-%m-%d')
-                yesterday_spend = Decimal('0')
-                for day_cost in aws_daily_costs:
-                    if day_cost['date'] == yesterday_str:
-                        yesterday_spend = Decimal(str(day_cost['amount']))
-                        break
-                print(f"   - Yesterday's spend from AWS: ${yesterday_spend}")
-                
-                # 5. Get LAST 7 DAYS from AWS
-                last_7_days = []
-                for i in range(6, -1, -1):
-                    target_date = today - timedelta(days=i)
-                    target_date_str = target_date.strftime('%Y-%m-%d')
-                    
-                    amount = Decimal('0')
-                    for day_cost in aws_daily_costs:
-                        if day_cost['date'] == target_date_str:
-                            amount = Decimal(str(day_cost['amount']))
-                            break
-                    
-                    last_7_days.append({
-                        'date': target_date.strftime('%a'),
-                        'amount': amount,
-                        'full_date': target_date_str,
-                        'day_name': target_date.strftime('%A')
-                    })
-                
-                # 6. Get month name
-                month_name = today.strftime('%B')
-                
-                # 7. Calculate MONTHLY CHANGE
-                monthly_change = Decimal('0')
-                
-                # Try to calculate from AWS daily data
-                current_month_start = today.replace(day=1)
-                current_month_aws_total = Decimal('0')
-                last_month_aws_total = Decimal('0')
-                
-                # Calculate current month from AWS data
-                for day_cost in aws_daily_costs:
-                    day_date = datetime.strptime(day_cost['date'], '%Y-%m-%d').date()
-                    amount = Decimal(str(day_cost['amount']))
-                    
-                    if day_date >= current_month_start:
-                        current_month_aws_total += amount
-                    elif day_date >= (current_month_start - timedelta(days=31)).replace(day=1):
-                        last_month_aws_total += amount
-                
-                if last_month_aws_total > 0:
-                    monthly_change = ((current_month_aws_total - last_month_aws_total) / last_month_aws_total) * 100
-                    monthly_change = Decimal(str(round(float(monthly_change), 2)))
-                
-                # 8. Get FORECAST from database (or calculate simple one)
-                monthly_summary = MonthlyCostSummary.objects.filter(account=account).first()
-                if monthly_summary:
-                    forecast_data = {
-                        'thirtyDay': monthly_summary.forecast_30d or Decimal('0'),
-                        'sevenDay': monthly_summary.forecast_7d or Decimal('0')
-                    }
-                else:
-                    # Simple forecast based on current month average
-                    days_passed = (today - current_month_start).days + 1
-                    if days_passed > 0:
-                        daily_avg = current_month_total / days_passed
-                        forecast_data = {
-                            'thirtyDay': daily_avg * 30,
-                            'sevenDay': daily_avg * 7
-                        }
-                    else:
-                        forecast_data = {
-                            'thirtyDay': Decimal('0'),
-                            'sevenDay': Decimal('0')
-                        }
-                
-                # 9. Get SERVICE BREAKDOWN
-                service_breakdown = []
-                try:
-                    service_breakdown = fetch_service_breakdown(ce_client, current_month_start, today)
-                except Exception as e:
-                    print(f"Service breakdown error: {e}")        
-                                
-                # Use AWS REAL-TIME data
-                analytics_data = {
-                    'total_spend': total_historical_amount.quantize(Decimal('0.01')),  # Round to 2 decimals
-                    'current_month_spend': current_month_total.quantize(Decimal('0.01')),  # Round to 2 decimals
-                    'current_month_name': month_name,
-                    'today_spend': yesterday_spend.quantize(Decimal('0.01')),  # Round to 2 decimals
-                    'monthly_change': monthly_change.quantize(Decimal('0.1')),  # Round to 1 decimal
-                    'forecast': forecast_data,
-                    'daily_spend': last_7_days,
-                    'service_breakdown': service_breakdown,
-                    'cached': False,
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-                # Also round forecast values
-                analytics_data['forecast']['thirtyDay'] = analytics_data['forecast']['thirtyDay'].quantize(Decimal('0.01')) if analytics_data['forecast']['thirtyDay'] else Decimal('0')
-                analytics_data['forecast']['sevenDay'] = analytics_data['forecast']['sevenDay'].quantize(Decimal('0.01')) if analytics_data['forecast']['sevenDay'] else Decimal('0')
-                
-                # Round daily spend amounts for display
-                for day in analytics_data['daily_spend']:
-                    day['amount'] = day['amount'].quantize(Decimal('0.01'))
-                
-            except Exception as aws_error:
-                print(f"❌ AWS API failed: {aws_error}")
-                print("⚠️ Falling back to database data...")
-                # Fallback to database if AWS API fails
-                analytics_data = self._get_analytics_from_database(account, today)
-            
-            # Cache the results
-            ResourceCache.cache_cost_analytics(account.id, analytics_data)
+                analytics_data = ResourceCache.get_or_compute_cost_analytics(
+                    account.id, lambda: self._compute_analytics(account, today)
+                )
+            else:
+                analytics_data = self._compute_analytics(account, today)
+                ResourceCache.cache_cost_analytics(account.id, analytics_data)
+            if not analytics_data:
+                return Response({'error': 'Analytics are being computed, please retry shortly'}, status=503)
             
             serializer = CostAnalyticsSerializer(data=analytics_data)
             serializer.is_valid(raise_exception=True)
@@ -961,65 +828,131 @@ class AWSAccountViewSet(viewsets.ModelViewSet):
             print(f"❌ Error in analytics view: {str(e)}")
             return Response({'error': str(e)}, status=500)
         
+    def _compute_analytics(self, account, today):
+        """Dashboard analytics from AWS, falling back to the database"""
+        print(f"🔍 Fetching fresh analytics for account {account.aws_account_id}")
+        
+        # TRY TO GET REAL-TIME DATA FROM AWS API
+        try:
+            # Get AWS client
+            ce_client = assume_role(account.role_arn, str(account.external_id))
+            
+            print(f"🔍 Fetching REAL-TIME data from AWS for account {account.aws_account_id}")
+            
+            # 1-3. One DAILY query grouped by SERVICE (last 90 days)
+            cost_analytics = compose_cost_analytics(ce_client, today, days=90, cache_scope=account.role_arn)
+            daily_totals = cost_analytics['daily_totals']
+            print(f"   - Fetched {len(daily_totals)} days of data from AWS")
+            
+            current_month_total = Decimal(str(cost_analytics['current_month_total']))
+            print(f"   - Current month from AWS: ${current_month_total}")
+            
+            total_historical_amount = Decimal(str(cost_analytics['total']))
+            print(f"   - Total historical from AWS: ${total_historical_amount}")
+            
+            # 4. Get YESTERDAY'S spend from AWS (since today might not have data yet)
+            yesterday = today - timedelta(days=1)
+            yesterday_spend = Decimal(str(daily_totals.get(yesterday, 0)))
+            print(f"   - Yesterday's spend from AWS: ${yesterday_spend}")
+            
+            # 5. Get LAST 7 DAYS from AWS
+            last_7_days = []
+            for i in range(6, -1, -1):
+                target_date = today - timedelta(days=i)
+                last_7_days.append({
+                    'date': target_date.strftime('%a'),
+                    'amount': Decimal(str(daily_totals.get(target_date, 0))),
+                    'full_date': target_date.strftime('%Y-%m-%d'),
+                    'day_name': target_date.strftime('%A')
+                })
+            
+            # 6. Get month name
+            month_name = today.strftime('%B')
+            
+            # 7. Calculate MONTHLY CHANGE
+            monthly_change = Decimal('0')
+            current_month_start = today.replace(day=1)
+            last_month_aws_total = Decimal(str(cost_analytics['last_month_total']))
+            
+            if last_month_aws_total > 0:
+                monthly_change = ((current_month_total - last_month_aws_total) / last_month_aws_total) * 100
+                monthly_change = Decimal(str(round(float(monthly_change), 2)))
+            
+            # 8. Get FORECAST from database (or calculate simple one)
+            monthly_summary = MonthlyCostSummary.objects.filter(account=account).first()
+            if monthly_summary:
+                forecast_data = {
+                    'thirtyDay': monthly_summary.forecast_30d or Decimal('0'),
+                    'sevenDay': monthly_summary.forecast_7d or Decimal('0')
+                }
+            else:
+                # Simple forecast based on current month average
+                days_passed = (today - current_month_start).days + 1
+                if days_passed > 0:
+                    daily_avg = current_month_total / days_passed
+                    forecast_data = {
+                        'thirtyDay': daily_avg * 30,
+                        'sevenDay': daily_avg * 7
+                    }
+                else:
+                    forecast_data = {
+                        'thirtyDay': Decimal('0'),
+                        'sevenDay': Decimal('0')
+                    }
+            
+            # 9. SERVICE BREAKDOWN (from the same query)
+            service_breakdown = cost_analytics['service_breakdown']
+                            
+            # Use AWS REAL-TIME data
+            analytics_data = {
+                'total_spend': total_historical_amount.quantize(Decimal('0.01')),  # Round to 2 decimals
+                'current_month_spend': current_month_total.quantize(Decimal('0.01')),  # Round to 2 decimals
+                'current_month_name': month_name,
+                'today_spend': yesterday_spend.quantize(Decimal('0.01')),  # Round to 2 decimals
+                'monthly_change': monthly_change.quantize(Decimal('0.1')),  # Round to 1 decimal
+                'forecast': forecast_data,
+                'daily_spend': last_7_days,
+                'service_breakdown': service_breakdown,
+                'cached': False,
+                'timestamp': datetime.now().isoformat()
+            }
+            
+            # Also round forecast values
+            analytics_data['forecast']['thirtyDay'] = analytics_data['forecast']['thirtyDay'].quantize(Decimal('0.01')) if analytics_data['forecast']['thirtyDay'] else Decimal('0')
+            analytics_data['forecast']['sevenDay'] = analytics_data['forecast']['sevenDay'].quantize(Decimal('0.01')) if analytics_data['forecast']['sevenDay'] else Decimal('0')
+            
+            # Round daily spend amounts for display
+            for day in analytics_data['daily_spend']:
+                day['amount'] = day['amount'].quantize(Decimal('0.01'))
+            
+        except Exception as aws_error:
+            print(f"❌ AWS API failed: {aws_error}")
+            print("⚠️ Falling back to database data...")
+            # Fallback to database if AWS API fails
+            analytics_data = self._get_analytics_from_database(account, today)
+
+        return analytics_data
+
     def _get_analytics_from_database(self, account, today):
         """Fallback: Get analytics from database if AWS API fails"""
-        # 1. TOTAL HISTORICAL SPEND
-        total_historical_spends = DailySpend.objects.filter(account=account)
-        total_historical_amount = Decimal('0')
-        for spend in total_historical_spends:
-            total_historical_amount += spend.amount
-
-        # 2. CURRENT MONTH SPEND
-        current_month_start = today.replace(day=1)
-        current_month_spends = DailySpend.objects.filter(
-            account=account,
-            date__gte=current_month_start
-        )
-        current_month_total = Decimal('0')
-        for spend in current_month_spends:
-            current_month_total += spend.amount
-
-        # 3. YESTERDAY'S SPEND
-        yesterday = today - timedelta(days=1)
-        yesterday_spend_obj = DailySpend.objects.filter(
-            account=account,
-            date=yesterday
-        ).first()
-        yesterday_spend = yesterday_spend_obj.amount if yesterday_spend_obj else Decimal('0')
+        # 1-3. TOTAL, CURRENT MONTH, LAST MONTH AND YESTERDAY (one aggregate query)
+        totals = get_cost_totals(account, today)
+        total_historical_amount = totals['total']
+        current_month_total = totals['current_month']
+        yesterday_spend = totals['yesterday']
 
         # 4. LAST 7 DAYS
-        last_7_days = []
-        for i in range(6, -1, -1):
-            target_date = today - timedelta(days=i)
-            spend = DailySpend.objects.filter(
-                account=account,
-                date=target_date
-            ).first()
-            amount = spend.amount if spend else Decimal('0')
-            last_7_days.append({
-                'date': target_date.strftime('%a'),
-                'amount': amount,
-                'full_date': target_date.strftime('%Y-%m-%d'),
-                'day_name': target_date.strftime('%A')
-            })
+        last_7_days = get_last_days(account, today, days=7)
 
         # 5. MONTHLY CHANGE
         monthly_change = Decimal('0')
-        last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-        last_month_spends = DailySpend.objects.filter(
-            account=account,
-            date__gte=last_month_start,
-            date__lt=current_month_start
-        )
-
-        if last_month_spends.exists():
-            last_month_total = sum([spend.amount for spend in last_month_spends])
-            if last_month_total > 0 and current_month_total > 0:
-                try:
-                    monthly_change = ((current_month_total - Decimal(str(last_month_total))) / Decimal(str(last_month_total))) * 100
-                    monthly_change = Decimal(str(round(float(monthly_change), 2)))
-                except (ZeroDivisionError, OverflowError):
-                    monthly_change = Decimal('0')
+        if totals['previous_month_days'] and current_month_total > 0:
+            try:
+                change = monthly_change_percent(current_month_total, totals['previous_month'])
+                if change is not None:
+                    monthly_change = Decimal(str(round(float(change), 2)))
+            except (ZeroDivisionError, OverflowError):
+                monthly_change = Decimal('0')
 
         # 6. FORECAST
         monthly_summary = MonthlyCostSummary.objects.filter(account=account).first()
@@ -1058,28 +991,23 @@ class AWSAccountViewSet(viewsets.ModelViewSet):
                 update_recent_daily_spend
             )
             
-            # IMPORTANT: Clear old data first to ensure fresh sync
-            from .models import DailySpend, MonthlyCostSummary, RecentDailySpend
-            print("🧹 Clearing old data to ensure fresh sync...")
-            
-            # Clear data for this account only
-            DailySpend.objects.filter(account=account).delete()
-            MonthlyCostSummary.objects.filter(account=account).delete()
-            RecentDailySpend.objects.filter(account=account).delete()
-            
-            print("✅ Old data cleared")
+            # Existing rows are upserted in place; ?full=true refetches the whole backfill window
+            full = request.GET.get('full') == 'true'
             
             # Run tasks sequentially with progress tracking
             print("1️⃣ Fetching AWS costs from Cost Explorer API...")
-            if not fetch_aws_costs(str(account.id)):
+            if not fetch_aws_costs(str(account.id), full=full):
                 return Response({
                     'status': 'error',
                     'message': 'Failed to fetch AWS costs. Check AWS credentials and permissions.'
                 }, status=500)
             print("✅ AWS costs fetched")
             
+            # The derived updates share one read of the freshly synced DailySpend rows
+            spend_window = DailySpendWindow(account, timezone.now().date())
+            
             print("2️⃣ Updating monthly summary...")
-            if not update_monthly_summary(str(account.id)):
+            if not update_monthly_summary(str(account.id), spend_window):
                 return Response({
                     'status': 'warning',
                     'message': 'Monthly summary updated but some calculations may be incomplete'
@@ -1087,7 +1015,7 @@ class AWSAccountViewSet(viewsets.ModelViewSet):
             print("✅ Monthly summary updated")
             
             print("3️⃣ Updating cost forecasts...")
-            if not update_cost_forecast(str(account.id)):
+            if not update_cost_forecast(str(account.id), spend_window):
                 return Response({
                     'status': 'warning',
                     'message': 'Cost forecasts updated but may be based on limited data'
@@ -1095,7 +1023,7 @@ class AWSAccountViewSet(viewsets.ModelViewSet):
             print("✅ Cost forecasts updated")
             
             print("4️⃣ Updating recent daily spends...")
-            if not update_recent_daily_spend(str(account.id)):
+            if not update_recent_daily_spend(str(account.id), spend_window):
                 return Response({
                     'status': 'warning',
                     'message': 'Recent daily spends updated but may have incomplete data'
@@ -1141,24 +1069,14 @@ class FetchAWSCostsView(generics.GenericAPIView):
             # 2. AWS credentials file (~/.aws/credentials)
             # 3. IAM role (if running on EC2)
             
-            # Use STS to assume role
-            sts_client = boto3.client('sts', region_name='us-east-1')
-            
-            # Assume the role with external ID
-            assumed_role = sts_client.assume_role(
-                RoleArn=account.role_arn,
-                RoleSessionName=f"CloudCostApp_{account.aws_account_id}",
-                ExternalId=str(account.external_id)
+            # Assumed-role credentials are shared through the credential broker
+            creds = credential_broker.get_account_credentials(
+                account,
+                session_name=f"CloudCostApp_{account.aws_account_id}"
             )
             
-            # Create Cost Explorer client
-            ce_client = boto3.client(
-                'ce',
-                aws_access_key_id=assumed_role['Credentials']['AccessKeyId'],
-                aws_secret_access_key=assumed_role['Credentials']['SecretAccessKey'],
-                aws_session_token=assumed_role['Credentials']['SessionToken'],
-                region_name='us-east-1'
-            )
+            # Get pooled Cost Explorer client
+            ce_client = client_pool.get_client('ce', creds, 'us-east-1')
             
             return ce_client
         except Exception as e:
@@ -1177,37 +1095,8 @@ class FetchAWSCostsView(generics.GenericAPIView):
             if not ce_client:
                 return Response({'error': 'Failed to connect to AWS'}, status=400)
             
-            # Calculate date ranges
-            today = timezone.now().date()
-            start_date = today - timedelta(days=90)  # Get last 90 days
-            
-            # Fetch cost data
-            response = ce_client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': today.strftime('%Y-%m-%d')
-                },
-                Granularity='DAILY',
-                Metrics=['UnblendedCost']
-            )
-            
-            # Process and save daily costs
-            results = response.get('ResultsByTime', [])
-            for day_result in results:
-                date_str = day_result['TimePeriod']['Start']
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-                amount = Decimal(day_result['Total']['UnblendedCost']['Amount'])
-                
-                # Save daily spend
-                DailySpend.objects.update_or_create(
-                    account=account,
-                    date=date_obj,
-                    defaults={'amount': amount}
-                )
-            
-            # Update last sync time
-            account.last_synced = timezone.now()
-            account.save()
+            # Fetch the open window since the last sync and upsert it
+            results = sync_daily_costs(account, ce_client)
             
             return Response({
                 'status': 'success',
@@ -1243,8 +1132,7 @@ def debug_monthly_change(request, account_id):
         account = AWSAccountConnection.objects.get(id=account_id, user=request.user)
         
         today = timezone.now().date()
-        current_month_start = today.replace(day=1)
-        last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+        current_month_start, last_month_start = month_bounds(today)
         
         # Get spends
         current_spends = DailySpend.objects.filter(
@@ -1257,25 +1145,24 @@ def debug_monthly_change(request, account_id):
             date__lt=current_month_start
         )
         
-        current_total = sum([float(s.amount) for s in current_spends])
-        last_total = sum([float(s.amount) for s in last_spends])
+        totals = get_cost_totals(account, today)
+        current_total = float(totals['current_month'])
+        last_total = float(totals['previous_month'])
         
-        monthly_change = 0
-        if last_total > 0:
-            monthly_change = ((current_total - last_total) / last_total) * 100
+        monthly_change = float(monthly_change_percent(current_total, last_total) or 0)
         
         return Response({
             'account_id': account_id,
             'current_month': {
                 'start_date': current_month_start,
                 'total': current_total,
-                'days_count': current_spends.count(),
+                'days_count': totals['current_month_days'],
                 'sample_amounts': [float(s.amount) for s in current_spends[:3]]
             },
             'last_month': {
                 'start_date': last_month_start,
                 'total': last_total,
-                'days_count': last_spends.count(),
+                'days_count': totals['previous_month_days'],
                 'sample_amounts': [float(s.amount) for s in last_spends[:3]]
             },
             'monthly_change': {
@@ -1308,16 +1195,16 @@ class ResourceViewSet(viewsets.ViewSet):
         try:
             account = self.get_account(pk, request.user)
             
-            # Try cache first
+            # Cache first: one scan per burst of misses, stale data served while refreshing
             use_cache = request.GET.get('no_cache') != 'true'
             if use_cache:
-                cached_resources = ResourceCache.get_cached_resources(account.id)
-                if cached_resources:
-                    print(f"📦 Serving cached resources for account {account.id}")
-                    return Response(cached_resources)
-            
-            # Fetch fresh resources
-            resources = get_aws_resources(account.id, use_cache=use_cache)
+                paid_resources = ResourceCache.get_or_compute_resources(
+                    account.id, lambda: get_all_paid_resources(account.id, use_cache=False)
+                )
+                resources = format_legacy_resources(paid_resources) if paid_resources else None
+            else:
+                # Fetch fresh resources
+                resources = get_aws_resources(account.id, use_cache=False)
             if not resources:
                 return Response({
                     'error': 'Failed to fetch resources'
@@ -1335,16 +1222,18 @@ class ResourceViewSet(viewsets.ViewSet):
         try:
             account = self.get_account(pk, request.user)
             
-            # Try cache first
+            # Cache first: one scan per burst of misses, stale data served while refreshing
             use_cache = request.GET.get('no_cache') != 'true'
             if use_cache:
-                cached_summary = ResourceCache.get_cached_resource_summary(account.id)
-                if cached_summary:
-                    print(f"📦 Serving cached resource summary for account {account.id}")
-                    return Response(cached_summary)
-            
-            # Fetch fresh summary
-            summary = get_resource_usage_summary(account.id, use_cache=use_cache)
+                # A summary miss reuses the cached inventory scan when there is one
+                summary = ResourceCache.get_or_compute_resource_summary(
+                    account.id, lambda: get_resource_usage_summary(
+                        account.id, use_cache=False, resources=ResourceCache.get_cached_resources(account.id)
+                    )
+                )
+            else:
+                # Fetch fresh summary
+                summary = get_resource_usage_summary(account.id, use_cache=False)
             if not summary:
                 # Try to get from database
                 try:
@@ -1395,16 +1284,15 @@ class ResourceViewSet(viewsets.ViewSet):
         try:
             account = AWSAccountConnection.objects.get(id=pk, user=request.user)
             
-            # Try cache first
+            # Cache first: one scan per burst of misses, stale data served while refreshing
             use_cache = request.GET.get('no_cache') != 'true'
             if use_cache:
-                cached_resources = ResourceCache.get_cached_resources(account.id)
-                if cached_resources:
-                    print(f"📦 Serving cached paid resources for account {account.id}")
-                    return Response(cached_resources)
-            
-            # Fetch fresh resources
-            resources = get_all_paid_resources(account.id, use_cache=use_cache)
+                resources = ResourceCache.get_or_compute_resources(
+                    account.id, lambda: get_all_paid_resources(account.id, use_cache=False)
+                )
+            else:
+                # Fetch fresh resources
+                resources = get_all_paid_resources(account.id, use_cache=False)
             if not resources:
                 return Response({
                     'error': 'Failed to fetch paid resources'
@@ -1580,12 +1468,23 @@ def low_level_services(request, account_id):
         
         # Check if we should use cache or force refresh
         use_cache = request.GET.get('no_cache') != 'true'
-        store_in_db = request.GET.get('store') != 'false'  # Default to True
+        # ?mode=full|quick|config overrides the account's discovery backend
+        backend = request.GET.get('mode')
         
         start_time = time.time()
         
         # Discover low-level services using Version 1
-        services_data = discover_low_level_services(account_id, use_cache=use_cache)
+        services_data = discover_low_level_services(account_id, use_cache=use_cache, backend=backend)
+        
+        # Add scan duration
+        services_data['scan_duration'] = time.time() - start_time
+        
+        store_in_db = request.GET.get('store') != 'false'  # Default to True
+        
+        # Partial (tagged resources only) inventories would deactivate every resource they miss
+        if store_in_db and services_data.get('summary', {}).get('partial_inventory'):
+            store_in_db = False
+            services_data['snapshot_skipped'] = 'Partial inventories are not stored as snapshots; run a full scan to store one'
         
         # Store in database if requested
         if store_in_db and 'error' not in services_data:
@@ -1595,9 +1494,6 @@ def low_level_services(request, account_id):
                 print(f"Error storing in database: {db_error}")
                 # Continue even if DB storage fails
         
-        # Add scan duration
-        services_data['scan_duration'] = time.time() - start_time
-        
         return Response(services_data)
         
     except AWSAccountConnection.DoesNotExist:
@@ -1605,98 +1501,6 @@ def low_level_services(request, account_id):
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
-def store_low_level_services_snapshot(account, services_data):
-    """Store low-level services data in database"""
-    with transaction.atomic():
-        
-        # 1. Create snapshot record
-        snapshot = LowLevelServiceSnapshot.objects.create(
-            account=account,
-            total_services=services_data['summary']['total_services'],
-            estimated_monthly_cost=Decimal(str(services_data['summary']['estimated_monthly_cost'])),
-            unique_service_types=services_data['summary']['unique_service_types'],
-            unique_services_discovered=services_data['summary'].get('unique_services_discovered', 0),
-            regions_scanned=services_data['summary'].get('regions_scanned', []),
-            snapshot_data=services_data,
-            scan_duration_seconds=services_data.get('scan_duration')
-        )
-        
-        # 2. Deactivate old resources
-        LowLevelServiceResource.objects.filter(
-            account=account, 
-            is_active=True
-        ).update(is_active=False)
-        
-        # 3. Store/update service definitions and resources
-        for service_id, service_data in services_data['services_by_category'].items():
-            
-            # Get or create category
-            category, _ = LowLevelServiceCategory.objects.get_or_create(
-                key=service_data['category'].lower().replace(' ', '_'),
-                defaults={'name': service_data['category']}
-            )
-            
-            # Get or create service definition
-            service_def, _ = LowLevelServiceDefinition.objects.get_or_create(
-                service_id=service_id,
-                defaults={
-                    'name': service_data['service_info']['name'],
-                    'description': service_data['service_info']['description'],
-                    'category': category,
-                    'unit': service_data['service_info'].get('unit', ''),
-                    
-                    # Map all pricing fields
-                    'price_per_hour': Decimal(str(service_data['service_info'].get('price_per_hour', 0))) if service_data['service_info'].get('price_per_hour') else None,
-                    'price_per_gb': Decimal(str(service_data['service_info'].get('price_per_gb', 0))) if service_data['service_info'].get('price_per_gb') else None,
-                    'price_per_gb_month': Decimal(str(service_data['service_info'].get('price_per_gb_month', 0))) if service_data['service_info'].get('price_per_gb_month') else None,
-                    'price_per_gb_second': Decimal(str(service_data['service_info'].get('price_per_gb_second', 0))) if service_data['service_info'].get('price_per_gb_second') else None,
-                    'price_per_million': Decimal(str(service_data['service_info'].get('price_per_million', 0))) if service_data['service_info'].get('price_per_million') else None,
-                    'price_per_10k': Decimal(str(service_data['service_info'].get('price_per_10k', 0))) if service_data['service_info'].get('price_per_10k') else None,
-                    'price_per_vcpu_hour': Decimal(str(service_data['service_info'].get('price_per_vcpu_hour', 0))) if service_data['service_info'].get('price_per_vcpu_hour') else None,
-                    'price_per_iops_hour': Decimal(str(service_data['service_info'].get('price_per_iops_hour', 0))) if service_data['service_info'].get('price_per_iops_hour') else None,
-                    'price_per_month': Decimal(str(service_data['service_info'].get('price_per_month', 0))) if service_data['service_info'].get('price_per_month') else None,
-                }
-            )
-            
-            # Create or update resources
-            for resource in service_data['resources']:
-                LowLevelServiceResource.objects.update_or_create(
-                    account=account,
-                    service_definition=service_def,
-                    resource_id=resource['resource_id'],
-                    region=resource['region'],
-                    defaults={
-                        'resource_name': resource['resource_name'],
-                        'count': resource['count'],
-                        'estimated_monthly_cost': Decimal(str(resource['estimated_monthly_cost'])),
-                        'details': resource.get('details', {}),
-                        'discovered_at': snapshot.created_at,
-                        'is_active': True
-                    }
-                )
-            
-            # 4. Update cost history (daily aggregation)
-            today = timezone.now().date()
-            total_cost = Decimal(str(service_data['total_monthly_cost']))
-            resource_count = service_data['total_count']
-            
-            LowLevelServiceCostHistory.objects.update_or_create(
-                account=account,
-                service_definition=service_def,
-                date=today,
-                defaults={
-                    'monthly_cost': total_cost,
-                    'resource_count': resource_count,
-                    'region_breakdown': {
-                        resource['region']: Decimal(str(resource['estimated_monthly_cost']))
-                        for resource in service_data['resources']
-                    }
-                }
-            )
-        
-        return snapshot  
-
-
 @api_view(['GET'])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
@@ -1707,15 +1511,24 @@ def low_level_services_by_category(request, account_id, category):
         
         services_data = discover_low_level_services(
             account_id, 
-            use_cache=request.GET.get('no_cache') != 'true'
+            use_cache=request.GET.get('no_cache') != 'true',
+            backend=request.GET.get('mode')
         )
         
         # Filter by category if specified
         if category and 'services_by_category' in services_data:
-            filtered_services = {
-                k: v for k, v in services_data['services_by_category'].items()
-                if v.get('category', '').lower() == category.lower()
-            }
+            service_ids = get_category_service_ids(category)
+            if service_ids is not None:
+                filtered_services = {
+                    k: v for k, v in services_data['services_by_category'].items()
+                    if k in service_ids
+                }
+            else:
+                # e.g. 'other': services without a definition
+                filtered_services = {
+                    k: v for k, v in services_data['services_by_category'].items()
+                    if v.get('category', '').lower() == category.lower()
+                }
             services_data['services_by_category'] = filtered_services
             
         return Response(services_data)
@@ -1733,7 +1546,8 @@ def low_level_cost_summary(request, account_id):
         
         services_data = discover_low_level_services(
             account_id, 
-            use_cache=request.GET.get('no_cache') != 'true'
+            use_cache=request.GET.get('no_cache') != 'true',
+            backend=request.GET.get('mode')
         )
         
         summary = services_data.get('summary', {})
@@ -1773,7 +1587,8 @@ def export_low_level_services(request, account_id, format='json'):
         
         services_data = discover_low_level_services(
             account_id, 
-            use_cache=request.GET.get('no_cache') != 'true'
+            use_cache=request.GET.get('no_cache') != 'true',
+            backend=request.GET.get('mode')
         )
         
         if format == 'csv':
@@ -1789,18 +1604,17 @@ def export_low_level_services(request, account_id, format='json'):
                            'Monthly Cost', 'Category', 'Details'])
             
             # Write rows
-            for resource in services_data.get('all_resources', []):
-                writer.writerow([
-                    resource.get('service_id', ''),
-                    resource.get('resource_id', ''),
-                    resource.get('resource_name', ''),
-                    resource.get('region', ''),
-                    resource.get('estimated_monthly_cost', 0),
-                    services_data.get('services_by_category', {})
-                        .get(resource.get('service_id'), {})
-                        .get('category', ''),
-                    str(resource.get('details', {}))
-                ])
+            for service_data in services_data.get('services_by_category', {}).values():
+                for resource in service_data['resources']:
+                    writer.writerow([
+                        resource.get('service_id', ''),
+                        resource.get('resource_id', ''),
+                        resource.get('resource_name', ''),
+                        resource.get('region', ''),
+                        resource.get('estimated_monthly_cost', 0),
+                        service_data.get('category', ''),
+                        str(resource.get('details', {}))
+                    ])
             
             response = Response(output.getvalue(), content_type='text/csv')
             response['Content-Disposition'] = f'attachment; filename="low_level_services_{account_id}.csv"'
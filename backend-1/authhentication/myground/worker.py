@@ -0,0 +1,160 @@
+# worker.py
+import itertools
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from .fanout import get_service_bucket
+from .jobs import claim_job, complete_job, fail_job, postpone_job, renew_leases
+from .locks import Lease
+
+# A job a worker thread is running, and when it times out
+RunningJob = namedtuple('RunningJob', ['job', 'lease', 'deadline', 'thread'])
+
+
+class Worker:
+    """Pulls jobs from the durable queue and runs them on a pool of threads.
+
+    Every claimed job is leased to this worker; a heartbeat thread renews the
+    leases of running jobs so only jobs of a dead worker are picked up again.
+    On top of the queue lease, each account/job pair holds a Redis lease while
+    it runs, so the same pair never runs twice at once across the cluster.
+
+    Leases are only renewed until the job's JOB_TIMEOUT_SECONDS deadline.
+    A job past it is failed (and retried per its attempts), its thread is
+    abandoned and replaced, and its Redis lease is left to expire so the
+    retry cannot overlap the hung run.
+    """
+
+    def __init__(self, handlers, concurrency=None, names=None):
+        self.handlers = handlers
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.names = names
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stop_event = threading.Event()
+        self.running = {}  # job id -> RunningJob
+        self.threads = []
+        self._thread_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        """Run until ``stop`` is called; returns after in-flight jobs finish"""
+        print(f"👷 Worker {self.worker_id} started with {self.concurrency} threads")
+        heartbeat = threading.Thread(target=self._heartbeat, name="worker-heartbeat", daemon=True)
+        heartbeat.start()
+        for _ in range(self.concurrency):
+            self._start_thread()
+
+        # Threads abandoned in a timed-out job are dropped from self.threads and not waited for
+        while True:
+            with self._lock:
+                alive = [thread for thread in self.threads if thread.is_alive()]
+            if not alive:
+                break
+            alive[0].join()
+        heartbeat.join()
+        print(f"👋 Worker {self.worker_id} stopped")
+
+    def _start_thread(self):
+        thread = threading.Thread(target=self._work, name=f"worker-{next(self._thread_ids)}", daemon=True)
+        with self._lock:
+            self.threads.append(thread)
+        thread.start()
+
+    def _work(self):
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                try:
+                    job = claim_job(self.worker_id, self.names)
+                except Exception as e:
+                    print(f"❌ Failed to claim job: {e}")
+                    job = None
+                if job is None:
+                    self.stop_event.wait(settings.JOB_POLL_INTERVAL_SECONDS)
+                    continue
+                if not self._execute(job):
+                    return  # timed out: a replacement thread already took over
+        finally:
+            connection.close()
+
+    def _execute(self, job):
+        """Run one claimed job; False when it ran past its deadline and was failed by the heartbeat"""
+        handler = self.handlers.get(job.name)
+        if handler is None:
+            fail_job(job, f"Unknown job: {job.name}", retry=False)
+            return True
+
+        lease = Lease(f"job:{job.dedupe_key}", settings.JOB_LEASE_SECONDS)
+        if not lease.acquire():
+            # e.g. a timed-out run of the same job is still going; try again later
+            print(f"⏭️ {job.dedupe_key} is already running on another worker, requeued")
+            postpone_job(job, settings.JOB_BUSY_RETRY_SECONDS)
+            return True
+
+        fn, service = handler
+        bucket = get_service_bucket(service)
+        deadline = time.monotonic() + settings.JOB_TIMEOUT_SECONDS
+        with self._lock:
+            self.running[job.id] = RunningJob(job, lease, deadline, threading.current_thread())
+        error = None
+        try:
+            if bucket:
+                bucket.acquire()
+            print(f"▶️ Running {job.dedupe_key} (attempt {job.attempts}/{job.max_attempts})")
+            fn(job.account)
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                # The job may have timed out and been claimed again by another thread
+                running = self.running.get(job.id)
+                on_time = running is not None and running.thread is threading.current_thread()
+                if on_time:
+                    del self.running[job.id]
+            if on_time:
+                if error is None:
+                    complete_job(job)
+                else:
+                    fail_job(job, error)
+            else:
+                print(f"⏱️ {job.dedupe_key} finished after its timeout, result discarded")
+            lease.release()
+        return on_time
+
+    def _heartbeat(self):
+        interval = min(settings.JOB_LEASE_SECONDS / 3, 60)
+        try:
+            while not self.stop_event.wait(interval):
+                now = time.monotonic()
+                with self._lock:
+                    timed_out = [running for running in self.running.values() if now >= running.deadline]
+                    for running in timed_out:
+                        del self.running[running.job.id]
+                        self.threads.remove(running.thread)
+                    running_jobs = dict(self.running)
+
+                try:
+                    for running in timed_out:
+                        print(f"⏱️ {running.job.dedupe_key} timed out after {settings.JOB_TIMEOUT_SECONDS}s")
+                        fail_job(running.job, f"Timed out after {settings.JOB_TIMEOUT_SECONDS}s")
+                        if not self.stop_event.is_set():
+                            self._start_thread()
+
+                    for running in running_jobs.values():
+                        running.lease.renew()
+                    renew_leases(self.worker_id, list(running_jobs))
+                except Exception as e:
+                    print(f"⚠️ Failed to renew job leases: {e}")
+                finally:
+                    close_old_connections()
+        finally:
+            connection.close()